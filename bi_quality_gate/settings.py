@@ -113,6 +113,9 @@ QUALITY_GATE_CONFIG = {
     # API OpenAI
     'OPENAI_API_KEY': os.getenv('OPENAI_API_KEY', ''),
     'OPENAI_MODEL': 'gpt-3.5-turbo',
+    'OPENAI_BASE_URL': os.getenv('OPENAI_BASE_URL', ''),   # Ex: serveur local http://127.0.0.1:8001/v1
+    'OPENAI_TIMEOUT': 60,           # Secondes par appel
+    'OPENAI_MAX_RETRIES': 2,        # Nouvelles tentatives du client (429, 5xx)
     
     # Seuils de qualité
     'SCORE_MINIMUM': 70,
@@ -126,4 +129,75 @@ QUALITY_GATE_CONFIG = {
     
     # Configuration Bandit
     'BANDIT_SEVERITY': 'LOW',
+    
+    # Exécution de Flake8/Bandit
+    'LINT_MOTEUR': 'flake8',        # 'flake8' (Flake8 + Bandit) ou 'ruff' (mêmes familles de règles, un seul passage)
+    'RUFF_PREVIEW': True,           # Règles pycodestyle en préversion dans Ruff (E1, E2, E3...)
+    'LINT_TIMEOUT': 30,             # Secondes max par outil et par analyse
+    'LINT_POOL_ACTIF': True,        # Travailleurs "chauds" au lieu d'un sous-processus par outil
+    'LINT_POOL_TAILLE': 4,          # Nombre max de travailleurs (pas moins que LINT_MAX_PROCESSUS)
+    'LINT_POOL_MAX_JOBS': 200,      # Recyclage d'un travailleur après N analyses
+    'LINT_LOT_JOBS': 'auto',        # Processus Flake8 (--jobs) quand un lot de fichiers est analysé en une fois
+    'LINT_LOT_TIMEOUT_FICHIER': 2,  # Secondes ajoutées à LINT_TIMEOUT par fichier du lot
+    
+    # Bac à sable des outils de lint
+    'LINT_MAX_PROCESSUS': 4,        # Outils lancés en même temps (par processus serveur)
+    'LINT_FILE_ATTENTE': 16,        # Analyses qui attendent une place; au-delà, refus immédiat
+    'LINT_ATTENTE_MAX': 10,         # Secondes d'attente max d'une place avant refus
+    'LINT_LIMITE_CPU': None,        # Secondes CPU par outil (None: son timeout)
+    'LINT_LIMITE_MEMOIRE_MO': 2048, # Espace d'adressage max d'un outil (Mo)
+    'LINT_LIMITE_FICHIERS': 256,    # Fichiers ouverts max d'un outil
+    'LINT_ESPACE_TRAVAIL': None,    # Dossier des fichiers de travail (None: /dev/shm si disponible, sinon dossier temporaire)
+    'LINT_ESPACE_EMPLACEMENTS': 4,  # Dossiers préalloués pour les lots analysés en une fois
+    
+    # Exécution parallèle des étapes (règles, Flake8, Bandit, IA)
+    'MAX_THREADS_ETAPES': 8,
+    
+    # Règles SQL sur les gros scripts (instructions réparties entre processus)
+    'SQL_PARALLELE_SEUIL': 512 * 1024,  # Taille (caractères) au-delà de laquelle on parallélise
+    'SQL_PARALLELE_PROCESSUS': os.cpu_count() or 1,  # Processus du pool, au plus un par CPU (1 = toujours séquentiel)
+    
+    # Fichiers SQL / Power Query trop gros pour la mémoire (analysés au fil de la lecture)
+    'FLUX_TAILLE_MORCEAU': 1024 * 1024,         # Caractères lus à la fois
+    'FLUX_TAILLE_MAX_BLOC': 8 * 1024 * 1024,    # Au-delà, une instruction ou étape est coupée
+    'FLUX_TAILLE_MAX_FICHIER': 2 * 1024 ** 3,   # Upload max (octets); 1 Mo pour Python et DAX
+    
+    # Règles DAX (arbre de chaque mesure gardé en cache, ~1,6 Ko par mesure)
+    'DAX_CACHE_MESURES': 20000,         # Mesures gardées en mémoire par processus
+    
+    # Règles Power Query (analyse et problèmes de chaque étape en cache)
+    'M_CACHE_ETAPES': 20000,            # Étapes gardées en mémoire par processus
+    
+    # Règles Python (arbre ast de chaque code en cache, ~35 fois la taille du code)
+    'PYTHON_CACHE_ARBRES': 32,          # Arbres gardés en mémoire par processus
+    
+    # Cache des résultats (même code + mêmes options = mêmes problèmes)
+    'CACHE_ACTIF': True,
+    'CACHE_TAILLE_MEMOIRE': 256,        # Entrées gardées en mémoire par processus
+    'CACHE_TAILLE_PERSISTANTE': 5000,   # Entrées gardées en base (éviction LRU)
+    'CACHE_INTERVALLE_ACCES': 60,       # Secondes entre deux mises à jour de la date d'accès en base (hits en mémoire)
+    
+    # Sauvegarde des problèmes (INSERT groupés dans une seule transaction)
+    'TAILLE_LOT_PROBLEMES': 500,
+    
+    # Analyses asynchrones (python manage.py worker_analyses)
+    'WORKER_CONCURRENCE': 2,        # Analyses traitées en parallèle par worker
+    'WORKER_INTERVALLE': 1.0,       # Secondes entre deux vérifications de la file vide
+    'TACHE_DUREE_MAX': 600,         # Au-delà, une tâche 'en_cours' est remise en attente
+    
+    # API batch (/api/analyser/batch/)
+    'LOT_MAX_FICHIERS': 200,        # Fichiers max par requête
+    'MAX_ANALYSES_LOT': 4,          # Fichiers analysés en parallèle
+    
+    # Mode incrémental (analyse limitée aux lignes modifiées par un diff)
+    'DIFF_CONTEXTE': 3,             # Lignes autour de chaque modification montrées à l'IA
+    
+    # Percentiles des temps par étape (get_statistiques_globales)
+    'STATS_FENETRE_TEMPS': 1000,    # Analyses les plus récentes prises en compte
+    
+    # Benchmarks (python manage.py benchmark --reference ...)
+    'BENCHMARK_SEUIL_REGRESSION': 20,   # Dégradation tolérée (%)
+    
+    # Test de charge (python manage.py charge_api)
+    'CHARGE_URL': 'http://127.0.0.1:8000/api/analyser/',
 }
\ No newline at end of file
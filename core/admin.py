@@ -5,7 +5,7 @@ Permet de gérer les données via /admin/
 """
 
 from django.contrib import admin
-from .models import AnalyseCode, Probleme
+from .models import AnalyseCode, Probleme, ResultatCache, TacheAnalyse
 
 
 class ProblemeInline(admin.TabularInline):
@@ -50,6 +50,8 @@ class AnalyseCodeAdmin(admin.ModelAdmin):
         'score',
         'est_approuve',
         'temps_analyse',
+        'temps_persistance',
+        'temps_etapes',
         'nb_problemes_total',
         'nb_critiques',
         'nb_warnings',
@@ -75,6 +77,8 @@ class AnalyseCodeAdmin(admin.ModelAdmin):
                 'score',
                 'est_approuve',
                 'temps_analyse',
+                'temps_persistance',
+                'temps_etapes',
                 'nb_problemes_total'
             )
         }),
@@ -115,4 +119,32 @@ class ProblemeAdmin(admin.ModelAdmin):
     
     def message_court(self, obj):
         return obj.message[:50] + "..." if len(obj.message) > 50 else obj.message
-    message_court.short_description = "Message"
\ No newline at end of file
+    message_court.short_description = "Message"
+
+
+@admin.register(ResultatCache)
+class ResultatCacheAdmin(admin.ModelAdmin):
+    """
+    Configuration de l'admin pour le cache des résultats
+    """
+    
+    list_display = ['cle', 'nb_hits', 'date_creation', 'date_acces']
+    
+    readonly_fields = ['cle', 'resultats', 'nb_hits', 'date_creation', 'date_acces']
+    
+    search_fields = ['cle']
+
+
+@admin.register(TacheAnalyse)
+class TacheAnalyseAdmin(admin.ModelAdmin):
+    """
+    Configuration de l'admin pour la file des analyses asynchrones
+    """
+    
+    list_display = ['pk', 'nom_fichier', 'outil', 'statut', 'date_creation', 'date_fin']
+    
+    list_filter = ['statut', 'outil']
+    
+    search_fields = ['nom_fichier']
+    
+    readonly_fields = ['analyse', 'erreur', 'date_creation', 'date_debut', 'date_fin']
\ No newline at end of file
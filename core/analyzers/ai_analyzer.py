@@ -5,17 +5,33 @@ Utilise ChatGPT pour une analyse intelligente du code.
 """
 
 import json
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, NamedTuple, Optional
 
 from django.conf import settings
 
+from .lignes_modifiees import LignesModifiees
+from ..metriques import Metriques
+
 try:
-    from openai import OpenAI
+    from openai import OpenAI, AsyncOpenAI
     OPENAI_DISPONIBLE = True
 except ImportError:
     OPENAI_DISPONIBLE = False
 
 
+class ResultatIA(NamedTuple):
+    """
+    Problèmes trouvés par l'IA, et si elle n'a pas pu répondre
+    
+    Sur incident (client non initialisé, erreur d'API, JSON illisible),
+    les problèmes restent ceux de toujours (aucun, ou la simulation) mais
+    le résultat ne doit pas être mis en cache: une panne passagère ne doit
+    pas masquer les remarques de l'IA sur ce code pour toujours.
+    """
+    problemes: List[Dict[str, Any]]
+    incident: bool = False
+
+
 class AnalyseurIA:
     """
     Analyseur utilisant l'API OpenAI (ChatGPT)
@@ -26,20 +42,43 @@ class AnalyseurIA:
     def __init__(self):
         """Initialise la connexion OpenAI"""
         self.client = None
+        self.client_async = None
         self.actif = False
+        self.erreur_initialisation = False
         
         config = settings.QUALITY_GATE_CONFIG
+        self.contexte = config.get('DIFF_CONTEXTE', 3)
         api_key = config.get('OPENAI_API_KEY', '')
+        base_url = config.get('OPENAI_BASE_URL', '')
+        
+        # Serveur compatible (ex: python manage.py serveur_openai): la clé est facultative
+        if base_url and not api_key:
+            api_key = 'local'
         
         if OPENAI_DISPONIBLE and api_key:
+            parametres = {
+                'api_key': api_key,
+                'base_url': base_url or None,
+                'timeout': config.get('OPENAI_TIMEOUT', 60),
+                'max_retries': config.get('OPENAI_MAX_RETRIES', 2),
+            }
             try:
-                self.client = OpenAI(api_key=api_key)
+                self.client = OpenAI(**parametres)
+                self.client_async = AsyncOpenAI(**parametres)
                 self.actif = True
                 self.model = config.get('OPENAI_MODEL', 'gpt-3.5-turbo')
             except Exception as e:
+                Metriques.compter_erreur_openai('initialisation')
                 print(f"Erreur initialisation OpenAI: {e}")
+                self.erreur_initialisation = True
     
-    def analyser(self, contenu: str, outil: str, description: str = "") -> List[Dict[str, Any]]:
+    def analyser(
+        self,
+        contenu: str,
+        outil: str,
+        description: str = "",
+        lignes_modifiees: LignesModifiees = None
+    ) -> List[Dict[str, Any]]:
         """
         Analyse le code avec l'IA
         
@@ -47,24 +86,120 @@ class AnalyseurIA:
             contenu: Le code source
             outil: Le langage (SQL, Python, etc.)
             description: Description de ce que fait le code
+            lignes_modifiees: Si fourni, seules ces lignes (et DIFF_CONTEXTE
+                lignes autour) sont envoyées au modèle
         
         Returns:
             Liste des problèmes détectés
         """
+        return self.analyser_detaille(contenu, outil, description, lignes_modifiees).problemes
+    
+    def analyser_detaille(
+        self,
+        contenu: str,
+        outil: str,
+        description: str = "",
+        lignes_modifiees: LignesModifiees = None
+    ) -> ResultatIA:
+        """Comme analyser, en indiquant aussi si l'IA a pu répondre (voir ResultatIA)"""
+        if lignes_modifiees is not None and not lignes_modifiees:
+            return ResultatIA([])
+        
+        if not self.actif:
+            return self._simulation(contenu, outil, lignes_modifiees)
+        
+        return self._analyse_openai(contenu, outil, description, lignes_modifiees)
+    
+    async def analyser_async(
+        self,
+        contenu: str,
+        outil: str,
+        description: str = "",
+        lignes_modifiees: LignesModifiees = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Version asynchrone de analyser (vues ASGI)
+        
+        Utilise le client AsyncOpenAI: l'attente de la réponse ne bloque
+        pas la boucle d'événements.
+        """
+        return (await self.analyser_detaille_async(contenu, outil, description, lignes_modifiees)).problemes
+    
+    async def analyser_detaille_async(
+        self,
+        contenu: str,
+        outil: str,
+        description: str = "",
+        lignes_modifiees: LignesModifiees = None
+    ) -> ResultatIA:
+        """Version asynchrone de analyser_detaille"""
+        if lignes_modifiees is not None and not lignes_modifiees:
+            return ResultatIA([])
+        
         if not self.actif:
-            return self._simulation_analyse(contenu, outil)
+            return self._simulation(contenu, outil, lignes_modifiees)
+        
+        try:
+            response = await self.client_async.chat.completions.create(
+                **self._parametres_requete(contenu, outil, description, lignes_modifiees)
+            )
+            return ResultatIA(self._parser_reponse(response.choices[0].message.content))
         
-        return self._analyse_openai(contenu, outil, description)
+        except json.JSONDecodeError as e:
+            Metriques.compter_erreur_openai('json')
+            print(f"Erreur parsing JSON OpenAI: {e}")
+            return ResultatIA([], incident=True)
+        except Exception as e:
+            Metriques.compter_erreur_openai('api')
+            print(f"Erreur API OpenAI: {e}")
+            return ResultatIA([], incident=True)
     
-    def _analyse_openai(self, contenu: str, outil: str, description: str) -> List[Dict[str, Any]]:
+    def _analyse_openai(
+        self,
+        contenu: str,
+        outil: str,
+        description: str,
+        lignes_modifiees: LignesModifiees = None
+    ) -> ResultatIA:
         """Appelle réellement l'API OpenAI"""
+        try:
+            response = self.client.chat.completions.create(
+                **self._parametres_requete(contenu, outil, description, lignes_modifiees)
+            )
+            return ResultatIA(self._parser_reponse(response.choices[0].message.content))
+        
+        except json.JSONDecodeError as e:
+            Metriques.compter_erreur_openai('json')
+            print(f"Erreur parsing JSON OpenAI: {e}")
+            return ResultatIA([], incident=True)
+        except Exception as e:
+            Metriques.compter_erreur_openai('api')
+            print(f"Erreur API OpenAI: {e}")
+            return ResultatIA([], incident=True)
+    
+    def _parametres_requete(
+        self,
+        contenu: str,
+        outil: str,
+        description: str,
+        lignes_modifiees: LignesModifiees = None
+    ) -> Dict[str, Any]:
+        """Construit les paramètres de chat.completions.create"""
+        consigne_diff = ""
+        if lignes_modifiees is not None:
+            contenu = lignes_modifiees.extraits(contenu, self.contexte)
+            consigne_diff = (
+                "\nSeules les lignes modifiées et quelques lignes autour sont montrées, "
+                "chacune précédée de son numéro (\"12| \"). Signale uniquement les problèmes "
+                "des lignes modifiées, avec ce numéro dans \"ligne\".\n"
+            )
         
         prompt = f"""Tu es un expert en Business Intelligence et qualité de code.
 Analyse le code {outil} suivant et identifie les problèmes potentiels.
 
 DESCRIPTION DU CODE:
 {description if description else "Non fournie"}
-
+{consigne_diff}
 CODE À ANALYSER:
 ```{outil.lower()}
 {contenu[:3000]}
@@ -93,58 +228,69 @@ Maximum 5 problèmes les plus importants.
 Si le code est bon, retourne une liste vide.
 """
         
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "Tu es un expert BI. Réponds toujours en JSON valide sans markdown."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,
-                max_tokens=1500
-            )
-            
-            reponse_texte = response.choices[0].message.content.strip()
-            
-            # Nettoyer le JSON (enlever ```json si présent)
-            if reponse_texte.startswith('```'):
-                lignes = reponse_texte.split('\n')
-                reponse_texte = '\n'.join(lignes[1:-1])
-            
-            data = json.loads(reponse_texte)
-            
-            problemes = []
-            for p in data.get('problemes', []):
-                problemes.append({
-                    'severite': self._normaliser_severite(p.get('severite', 'info')),
-                    'categorie': self._normaliser_categorie(p.get('categorie', 'lisibilite')),
-                    'source': 'openai',
-                    'message': f"🤖 {p.get('message', 'Problème détecté')}",
-                    'suggestion': p.get('suggestion', ''),
-                    'ligne': p.get('ligne'),
-                    'code_erreur': 'AI'
-                })
-            
-            return problemes
+        return {
+            'model': self.model,
+            'messages': [
+                {
+                    "role": "system",
+                    "content": "Tu es un expert BI. Réponds toujours en JSON valide sans markdown."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            'temperature': 0.3,
+            'max_tokens': 1500
+        }
+    
+    def _parser_reponse(self, reponse_texte: str) -> List[Dict[str, Any]]:
+        """
+        Convertit la réponse JSON du modèle en problèmes
         
-        except json.JSONDecodeError as e:
-            print(f"Erreur parsing JSON OpenAI: {e}")
-            return []
-        except Exception as e:
-            print(f"Erreur API OpenAI: {e}")
-            return []
+        Raises:
+            json.JSONDecodeError: si la réponse n'est pas du JSON valide
+        """
+        reponse_texte = reponse_texte.strip()
+        
+        # Nettoyer le JSON (enlever ```json si présent)
+        if reponse_texte.startswith('```'):
+            lignes = reponse_texte.split('\n')
+            reponse_texte = '\n'.join(lignes[1:-1])
+        
+        data = json.loads(reponse_texte)
+        
+        problemes = []
+        for p in data.get('problemes', []):
+            problemes.append({
+                'severite': self._normaliser_severite(p.get('severite', 'info')),
+                'categorie': self._normaliser_categorie(p.get('categorie', 'lisibilite')),
+                'source': 'openai',
+                'message': f"🤖 {p.get('message', 'Problème détecté')}",
+                'suggestion': p.get('suggestion', ''),
+                'ligne': self._normaliser_ligne(p.get('ligne')),
+                'code_erreur': 'AI'
+            })
+        
+        return problemes
+    
+    def _simulation(self, contenu: str, outil: str, lignes_modifiees: Optional[LignesModifiees]) -> ResultatIA:
+        """Simulation sans client (un client qui n'a pas pu être créé est un incident)"""
+        problemes = self._simulation_analyse(self._code_simulation(contenu, lignes_modifiees), outil)
+        return ResultatIA(problemes, incident=self.erreur_initialisation)
+    
+    def _code_simulation(self, contenu: str, lignes_modifiees: Optional[LignesModifiees]) -> str:
+        """Code vu par la simulation: les mêmes extraits que le modèle, sans numéros"""
+        if lignes_modifiees is None:
+            return contenu
+        return lignes_modifiees.extraits(contenu, self.contexte, numeroter=False)
     
     def _simulation_analyse(self, contenu: str, outil: str) -> List[Dict[str, Any]]:
         """
         Mode simulation quand l'API n'est pas disponible
         Utile pour les tests sans consommer de crédits
         """
+        Metriques.compter_simulation_openai()
         problemes = []
         contenu_upper = contenu.upper()
         
@@ -221,6 +367,16 @@ Si le code est bon, retourne une liste vide.
         }
         return mapping.get(categorie.lower(), 'lisibilite')
     
+    def _normaliser_ligne(self, ligne: Any) -> Optional[int]:
+        """Numéro de ligne du modèle (12, "12", 12.0) en entier, None s'il est absent ou invalide"""
+        if isinstance(ligne, bool):
+            return None
+        try:
+            numero = int(str(ligne).strip()) if isinstance(ligne, str) else int(ligne)
+        except (TypeError, ValueError, OverflowError):
+            return None
+        return numero if numero >= 1 else None
+    
     def est_actif(self) -> bool:
         """Retourne True si l'API est configurée"""
         return self.actif
\ No newline at end of file
@@ -0,0 +1,292 @@
+"""
+Bac à Sable des Outils de Lint
+==============================
+Tout lancement de Flake8, Bandit ou Ruff (sous-processus ou job du pool)
+passe par ici:
+
+- Guichet: au plus LINT_MAX_PROCESSUS outils à la fois dans le processus.
+  Au-delà, LINT_FILE_ATTENTE appelants au plus attendent une place
+  (LINT_ATTENTE_MAX secondes); les suivants sont refusés tout de suite
+  (SurchargeLint) au lieu d'écrouler la machine.
+- Limites: temps CPU, espace d'adressage et fichiers ouverts de chaque
+  processus d'outil (rlimits). Un code pathologique est arrêté par le
+  noyau au lieu de consommer CPU et mémoire jusqu'au timeout.
+
+Les limites sont posées sur le processus enfant juste après son
+lancement (prlimit, Linux): preexec_fn n'est pas sûr dans un serveur
+multi-thread. Sans le module resource (Windows), seul le guichet s'applique.
+"""
+
+import asyncio
+import math
+import signal
+import subprocess
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+# Secondes entre deux essais d'une attente asynchrone de place
+INTERVALLE_ATTENTE = 0.05
+
+# Signaux d'un processus arrêté par ses limites (SIGXCPU, puis SIGKILL à la limite dure)
+SIGNAUX_LIMITES = {-getattr(signal, 'SIGXCPU', 24), -signal.SIGKILL}
+
+
+class SurchargeLint(Exception):
+    """Trop d'outils en cours et file d'attente pleine (ou attente trop longue)"""
+
+
+class Limites(NamedTuple):
+    """Limites d'un processus d'outil (None: pas de limite)"""
+    cpu: Optional[int]          # Secondes de temps CPU
+    memoire: Optional[int]      # Octets d'espace d'adressage
+    fichiers: Optional[int]     # Descripteurs de fichiers ouverts
+
+
+def limites_config(config: Dict[str, Any], timeout: float = None) -> Limites:
+    """
+    Limites de QUALITY_GATE_CONFIG
+    
+    Sans LINT_LIMITE_CPU, un processus a droit à autant de secondes CPU que
+    son timeout: au-delà, il aurait de toute façon été arrêté.
+    """
+    cpu = config.get('LINT_LIMITE_CPU') or (math.ceil(timeout) if timeout else None)
+    memoire = config.get('LINT_LIMITE_MEMOIRE_MO', 2048)
+    fichiers = config.get('LINT_LIMITE_FICHIERS', 256)
+    
+    return Limites(
+        cpu=cpu or None,
+        memoire=memoire * 1024 * 1024 if memoire else None,
+        fichiers=fichiers or None
+    )
+
+
+def appliquer_limites(limites: Limites, pid: int = 0):
+    """
+    Pose les limites sur un processus (0: le processus courant)
+    
+    Une limite ne peut que baisser: celles déjà plus basses sont gardées.
+    """
+    if resource is None or (pid and not hasattr(resource, 'prlimit')):
+        return
+    
+    demandes = (
+        (resource.RLIMIT_CPU, limites.cpu, 1),
+        (resource.RLIMIT_AS, limites.memoire, 0),
+        (resource.RLIMIT_NOFILE, limites.fichiers, 0),
+    )
+    
+    for ressource, valeur, marge in demandes:
+        if not valeur:
+            continue
+        try:
+            souple, dure = resource.prlimit(pid, ressource) if pid else resource.getrlimit(ressource)
+            # Limite dure un peu au-dessus: SIGXCPU d'abord, SIGKILL ensuite
+            nouvelle_dure = _plus_basse(dure, valeur + marge)
+            nouvelle = (_plus_basse(souple, valeur, nouvelle_dure), nouvelle_dure)
+            if pid:
+                resource.prlimit(pid, ressource, nouvelle)
+            else:
+                resource.setrlimit(ressource, nouvelle)
+        except (OSError, ValueError):
+            # Processus déjà terminé, ou limite refusée par le système
+            pass
+
+
+def limiter_cpu(secondes: int):
+    """
+    Donne au processus courant `secondes` de CPU de plus que ce qu'il a déjà utilisé
+    
+    Pour un travailleur du pool, avant chaque job: seule la limite souple
+    bouge (un processus ne peut pas remonter sa limite dure).
+    """
+    if resource is None or not secondes:
+        return
+    
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    _, dure = resource.getrlimit(resource.RLIMIT_CPU)
+    souple = math.ceil(usage.ru_utime + usage.ru_stime) + secondes
+    try:
+        resource.setrlimit(resource.RLIMIT_CPU, (_plus_basse(souple, dure), dure))
+    except (OSError, ValueError):
+        pass
+
+
+def _plus_basse(*valeurs: int) -> int:
+    """Plus basse des limites (RLIM_INFINITY n'en est pas une)"""
+    finies = [v for v in valeurs if v != resource.RLIM_INFINITY]
+    return min(finies) if finies else resource.RLIM_INFINITY
+
+
+class Guichet:
+    """
+    Contrôle d'admission des outils de lint, partagé par tout le processus
+    
+    Un sémaphore borne les outils en cours, un compteur borne la file
+    d'attente. Avec plusieurs processus serveur, chacun a son guichet.
+    """
+    
+    _instance = None
+    _verrou_instance = threading.Lock()
+    
+    def __init__(self, max_processus: int = 4, file_attente: int = 16, attente_max: float = 10):
+        self.semaphore = threading.BoundedSemaphore(max(1, max_processus))
+        self.file_attente = file_attente
+        self.attente_max = attente_max
+        self.en_attente = 0
+        self.verrou = threading.Lock()
+    
+    @classmethod
+    def get_instance(cls, config: Dict[str, Any]) -> 'Guichet':
+        """Retourne le guichet partagé par tout le processus"""
+        if cls._instance is None:
+            with cls._verrou_instance:
+                if cls._instance is None:
+                    cls._instance = cls(
+                        max_processus=config.get('LINT_MAX_PROCESSUS', 4),
+                        file_attente=config.get('LINT_FILE_ATTENTE', 16),
+                        attente_max=config.get('LINT_ATTENTE_MAX', 10)
+                    )
+        return cls._instance
+    
+    def acquerir(self):
+        """
+        Prend une place, en attendant au besoin
+        
+        Raises:
+            SurchargeLint: file d'attente pleine, ou pas de place après attente_max
+        """
+        if self.semaphore.acquire(blocking=False):
+            return
+        
+        self._entrer_file()
+        try:
+            if not self.semaphore.acquire(timeout=self.attente_max):
+                raise SurchargeLint(f'aucune place libérée en {self.attente_max}s')
+        finally:
+            self._sortir_file()
+    
+    async def acquerir_async(self):
+        """
+        Équivalent de acquerir() qui attend dans la boucle d'événements
+        
+        Aucun thread n'est bloqué pendant l'attente, et une annulation
+        (client déconnecté) ne peut pas laisser une place prise: la place
+        est obtenue sans await entre la prise et le retour.
+        """
+        if self.semaphore.acquire(blocking=False):
+            return
+        
+        self._entrer_file()
+        try:
+            boucle = asyncio.get_running_loop()
+            limite = boucle.time() + self.attente_max
+            while not self.semaphore.acquire(blocking=False):
+                if boucle.time() >= limite:
+                    raise SurchargeLint(f'aucune place libérée en {self.attente_max}s')
+                await asyncio.sleep(INTERVALLE_ATTENTE)
+        finally:
+            self._sortir_file()
+    
+    def _entrer_file(self):
+        """Réserve une place dans la file d'attente (SurchargeLint si elle est pleine)"""
+        with self.verrou:
+            if self.en_attente >= self.file_attente:
+                raise SurchargeLint(f'{self.en_attente} analyses déjà en attente')
+            self.en_attente += 1
+    
+    def _sortir_file(self):
+        """Libère la place réservée dans la file d'attente"""
+        with self.verrou:
+            self.en_attente -= 1
+    
+    def liberer(self):
+        """Rend une place"""
+        self.semaphore.release()
+    
+    @contextmanager
+    def place(self) -> Iterator[None]:
+        """Bloc exécuté avec une place prise"""
+        self.acquerir()
+        try:
+            yield
+        finally:
+            self.liberer()
+
+
+def lancer(commande: List[str], timeout: float, config: Dict[str, Any], entree: str = None) -> Optional[str]:
+    """
+    Lance un outil dans le bac à sable et retourne sa sortie standard
+    
+    Returns:
+        La sortie, ou None si l'outil a dépassé son timeout ou ses limites
+    
+    Raises:
+        SurchargeLint: si le guichet refuse le lancement
+    """
+    with Guichet.get_instance(config).place():
+        processus = subprocess.Popen(
+            commande,
+            stdin=subprocess.PIPE if entree is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            errors='replace'
+        )
+        appliquer_limites(limites_config(config, timeout), processus.pid)
+        
+        try:
+            stdout, stderr = processus.communicate(entree, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            processus.kill()
+            processus.communicate()
+            return None
+    
+    return None if _limite_atteinte(processus.returncode, stderr) else stdout
+
+
+async def lancer_async(
+    commande: List[str],
+    timeout: float,
+    config: Dict[str, Any],
+    entree: str = None
+) -> Optional[str]:
+    """Équivalent de lancer() avec asyncio (la boucle d'événements reste libre)"""
+    guichet = Guichet.get_instance(config)
+    await guichet.acquerir_async()
+    
+    try:
+        processus = await asyncio.create_subprocess_exec(
+            *commande,
+            stdin=asyncio.subprocess.PIPE if entree is not None else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        appliquer_limites(limites_config(config, timeout), processus.pid)
+        
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                processus.communicate(entree.encode('utf-8') if entree is not None else None),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            processus.kill()
+            await processus.wait()
+            return None
+    finally:
+        guichet.liberer()
+    
+    stderr = stderr.decode('utf-8', errors='replace')
+    return None if _limite_atteinte(processus.returncode, stderr) else stdout.decode('utf-8', errors='replace')
+
+
+def _limite_atteinte(code_retour: int, stderr: str) -> bool:
+    """Vrai si l'outil a été arrêté par un signal (limite CPU...) ou a manqué de mémoire"""
+    return code_retour < 0 or 'MemoryError' in stderr
\ No newline at end of file
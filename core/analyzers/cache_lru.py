@@ -0,0 +1,62 @@
+"""
+Caches LRU des Analyseurs
+=========================
+Petits caches en mémoire (par processus) pour les résultats intermédiaires
+des règles: arbres des mesures DAX, étapes Power Query...
+
+Contrairement à core/cache.py, qui garde le résultat d'une soumission
+entière, ces caches servent quand seule une partie du code a changé.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+from django.conf import settings
+
+
+def empreinte(*textes: str) -> bytes:
+    """Empreinte courte (blake2b, 16 octets) d'un ou plusieurs textes"""
+    h = hashlib.blake2b(digest_size=16)
+    for texte in textes:
+        h.update(texte.encode('utf-8'))
+        h.update(b'\0')
+    return h.digest()
+
+
+class CacheLRU:
+    """
+    Cache LRU thread-safe
+    
+    La taille maximale est lue dans QUALITY_GATE_CONFIG[cle_config] à
+    chaque écriture (modifiable sans redémarrage, comme en test).
+    """
+    
+    def __init__(self, cle_config: str, taille_defaut: int):
+        self.cle_config = cle_config
+        self.taille_defaut = taille_defaut
+        self.entrees: 'OrderedDict[bytes, Any]' = OrderedDict()
+        self.verrou = threading.Lock()
+    
+    def lire(self, cle: bytes) -> Optional[Any]:
+        """Valeur en cache (None si absente)"""
+        with self.verrou:
+            valeur = self.entrees.get(cle)
+            if valeur is not None:
+                self.entrees.move_to_end(cle)
+            return valeur
+    
+    def ecrire(self, cle: bytes, valeur: Any):
+        """Ajoute une valeur, en évinçant les plus anciennes au-delà de la taille"""
+        taille = settings.QUALITY_GATE_CONFIG.get(self.cle_config, self.taille_defaut)
+        
+        with self.verrou:
+            self.entrees[cle] = valeur
+            self.entrees.move_to_end(cle)
+            while len(self.entrees) > taille:
+                self.entrees.popitem(last=False)
+    
+    def vider(self):
+        with self.verrou:
+            self.entrees.clear()
\ No newline at end of file
@@ -0,0 +1,157 @@
+"""
+Espace de Travail des Outils de Lint
+====================================
+Fichiers de travail des outils qui ont besoin d'un vrai chemin (un lot
+analysé en une fois, le fichier d'un travailleur du pool).
+
+Une analyse seule passe par stdin et n'écrit rien. Pour le reste, l'espace
+est créé une fois par processus sur un système de fichiers en mémoire
+(/dev/shm) et découpé en emplacements préalloués, réutilisés d'une analyse
+à l'autre: beaucoup de petites soumissions ne font aucune entrée-sortie
+disque. Sans /dev/shm (macOS, Windows), le dossier temporaire habituel sert.
+
+Chaque espace porte le pid de son processus: ceux laissés par un processus
+mort (kill -9) sont supprimés au démarrage suivant, la mémoire ne fuit pas.
+"""
+
+import atexit
+import os
+import queue
+import re
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+
+DOSSIER_MEMOIRE = '/dev/shm'
+PREFIXE = 'qg_espace_'
+
+_REGEX_ESPACE = re.compile(rf'^{PREFIXE}(?P<pid>\d+)_')
+
+
+def dossier_racine(dossier: Optional[str] = None) -> str:
+    """
+    Dossier où créer les fichiers de travail
+    
+    Args:
+        dossier: LINT_ESPACE_TRAVAIL (None: /dev/shm si utilisable, sinon le dossier temporaire)
+    """
+    if dossier:
+        return dossier
+    if os.path.isdir(DOSSIER_MEMOIRE) and os.access(DOSSIER_MEMOIRE, os.W_OK | os.X_OK):
+        return DOSSIER_MEMOIRE
+    return tempfile.gettempdir()
+
+
+class EspaceTravail:
+    """
+    Emplacements de travail préalloués, partagés par tout le processus
+    
+    Un emplacement est un dossier vide prêté le temps d'une analyse puis
+    vidé et rendu. Quand tous sont pris, on attend qu'un se libère: le
+    guichet du bac à sable borne déjà le nombre d'outils en cours.
+    """
+    
+    _instance = None
+    _verrou_instance = threading.Lock()
+    
+    def __init__(self, nb_emplacements: int = 4, dossier: Optional[str] = None):
+        self.racine = dossier_racine(dossier)
+        _purger_espaces_orphelins(self.racine)
+        
+        self.dossier = tempfile.mkdtemp(prefix=f'{PREFIXE}{os.getpid()}_', dir=self.racine)
+        self.libres: queue.Queue = queue.Queue()
+        for i in range(max(1, nb_emplacements)):
+            emplacement = os.path.join(self.dossier, f'{i:02d}')
+            os.mkdir(emplacement)
+            self.libres.put(emplacement)
+    
+    @classmethod
+    def get_instance(cls, config: Dict[str, Any]) -> 'EspaceTravail':
+        """Retourne l'espace partagé par tout le processus"""
+        if cls._instance is None:
+            with cls._verrou_instance:
+                if cls._instance is None:
+                    cls._instance = cls(
+                        nb_emplacements=config.get('LINT_ESPACE_EMPLACEMENTS', 4),
+                        dossier=config.get('LINT_ESPACE_TRAVAIL')
+                    )
+                    atexit.register(cls._instance.fermer)
+        return cls._instance
+    
+    @contextmanager
+    def emplacement(self) -> Iterator[str]:
+        """Prête un dossier vide le temps du bloc"""
+        emplacement = self.libres.get()
+        try:
+            yield emplacement
+        finally:
+            _vider(emplacement)
+            self.libres.put(emplacement)
+    
+    def fermer(self):
+        """Supprime l'espace (appelé à la sortie du processus)"""
+        shutil.rmtree(self.dossier, ignore_errors=True)
+
+
+def fichier_travail(dossier: Optional[str] = None) -> str:
+    """
+    Crée un fichier .py réutilisable, en mémoire si possible
+    
+    Pour un travailleur du pool, qui le réécrit à chaque analyse. Celui
+    qui l'a créé le supprime (voir supprimer_fichier).
+    """
+    fd, chemin = tempfile.mkstemp(suffix='.py', prefix='qg_pool_', dir=dossier_racine(dossier))
+    os.close(fd)
+    return chemin
+
+
+def supprimer_fichier(chemin: str):
+    """Supprime un fichier de travail (déjà supprimé: rien à faire)"""
+    try:
+        os.remove(chemin)
+    except OSError:
+        pass
+
+
+def _vider(dossier: str):
+    """Supprime le contenu d'un emplacement"""
+    with os.scandir(dossier) as entrees:
+        for entree in entrees:
+            try:
+                if entree.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entree.path, ignore_errors=True)
+                else:
+                    os.remove(entree.path)
+            except OSError:
+                pass
+
+
+def _purger_espaces_orphelins(racine: str):
+    """Supprime les espaces des processus qui n'existent plus"""
+    if os.name != 'posix':
+        # os.kill(pid, 0) terminerait le processus sous Windows
+        return
+    
+    try:
+        entrees = os.listdir(racine)
+    except OSError:
+        return
+    
+    for nom in entrees:
+        match = _REGEX_ESPACE.match(nom)
+        if match and not _processus_vivant(int(match.group('pid'))):
+            shutil.rmtree(os.path.join(racine, nom), ignore_errors=True)
+
+
+def _processus_vivant(pid: int) -> bool:
+    """Vrai si le pid existe encore (y compris s'il appartient à un autre utilisateur)"""
+    try:
+        os.kill(pid, 0)
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""
+Index des Lignes
+================
+Débuts de ligne d'un code source, relevés une seule fois par analyse.
+
+Une position (décalage dans le texte) est convertie en (ligne, colonne)
+par recherche dichotomique: aucune règle ne recompte les retours à la
+ligne depuis le début du code.
+"""
+
+import re
+from array import array
+from bisect import bisect_right
+from typing import Tuple
+
+
+_REGEX_FIN_LIGNE = re.compile('\n')
+
+
+class IndexLignes:
+    """
+    Position de début de chaque ligne d'un texte
+    
+    `ligne` et `colonne` sont celles du premier caractère du texte (quand
+    c'est un morceau d'un script plus grand, qui peut commencer au milieu
+    d'une ligne). Lignes et colonnes sont 1-based, comme celles de Flake8.
+    """
+    
+    def __init__(self, texte: str, ligne: int = 1, colonne: int = 1):
+        self.texte = texte
+        self.premiere_ligne = ligne
+        self.premiere_colonne = colonne
+        self.debuts = array('q', [0])
+        self.debuts.extend(match.end() for match in _REGEX_FIN_LIGNE.finditer(texte))
+    
+    def ligne(self, position: int) -> int:
+        """Numéro de la ligne qui contient `position`"""
+        return bisect_right(self.debuts, position) - 1 + self.premiere_ligne
+    
+    def ligne_colonne(self, position: int) -> Tuple[int, int]:
+        """Ligne et colonne de `position`"""
+        i = bisect_right(self.debuts, position) - 1
+        colonne = position - self.debuts[i] + 1
+        if i == 0:
+            colonne += self.premiere_colonne - 1
+        return i + self.premiere_ligne, colonne
+    
+    def debut_ligne(self, ligne: int) -> int:
+        """Position du premier caractère d'une ligne"""
+        return self.debuts[ligne - self.premiere_ligne]
+    
+    def texte_ligne(self, ligne: int) -> str:
+        """Texte d'une ligne, sans le retour à la ligne"""
+        i = ligne - self.premiere_ligne
+        fin = self.debuts[i + 1] - 1 if i + 1 < len(self.debuts) else len(self.texte)
+        return self.texte[self.debuts[i]:fin]
+
+
+def avancer(texte: str, debut: int, fin: int, ligne: int, colonne: int) -> Tuple[int, int]:
+    """Ligne et colonne de `fin`, connaissant celles de `debut` (sans index, pour un texte lu par morceaux)"""
+    sauts = texte.count('\n', debut, fin)
+    if not sauts:
+        return ligne, colonne + fin - debut
+    return ligne + sauts, fin - texte.rfind('\n', debut, fin)
\ No newline at end of file
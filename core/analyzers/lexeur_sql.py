@@ -0,0 +1,269 @@
+"""
+Lexeur SQL
+==========
+Découpe un code SQL en jetons, en un seul parcours et à la demande (générateur).
+
+Les commentaires, chaînes et identifiants entre délimiteurs sont des jetons
+à part: un mot-clé écrit dans un commentaire ou une chaîne n'est pas un
+mot-clé. Particularités de dialecte prises en charge:
+- identifiants "ANSI", [T-SQL] et `MySQL`
+- chaînes 'avec '' doublé', N'unicode' (T-SQL) et E'échappées' (PostgreSQL: \\' ne ferme pas la chaîne)
+- variables @locale, @@globale et tables #temporaires
+- commentaires -- et /* */ (non fermés: jusqu'à la fin du code)
+- séparateurs d'instructions ; et GO (T-SQL, seul en début de ligne)
+
+Un script trop gros pour la mémoire peut être découpé au fil de sa lecture
+(decouper_au_fil), en blocs d'instructions entières. Après un diff, seules
+les instructions qui touchent une ligne modifiée sont gardées
+(instructions_modifiees).
+"""
+
+import re
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .index_lignes import avancer
+from .lignes_modifiees import LignesModifiees
+
+
+# Types de jetons
+MOT = 'mot'
+IDENTIFIANT = 'identifiant'
+CHAINE = 'chaine'
+NOMBRE = 'nombre'
+COMMENTAIRE = 'commentaire'
+SYMBOLE = 'symbole'
+
+_REGEX_JETON = re.compile(r"""
+    (?P<espace>\s+)
+  | (?P<commentaire>--[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<chaine>[Ee]'[^'\\]*(?:(?:\\.|'')[^'\\]*)*(?:'|\\?\Z)|[Nn]?'[^']*(?:''[^']*)*(?:'|\Z))
+  | (?P<identifiant>"[^"]*(?:""[^"]*)*(?:"|\Z)|\[[^\]]*(?:\]\][^\]]*)*(?:\]|\Z)|`[^`]*(?:``[^`]*)*(?:`|\Z))
+  | (?P<nombre>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+)
+  | (?P<mot>[@#]{0,2}[^\W\d]\w*)
+  | (?P<symbole>.)
+""", re.VERBOSE | re.DOTALL)
+
+# Ce qui peut contenir un ; sans séparer deux instructions (pour découper vite un script)
+_REGEX_FRONTIERE = re.compile(r"""
+    --[^\n]*|/\*.*?(?:\*/|\Z)
+  | (?<!\w)[Ee]'[^'\\]*(?:(?:\\.|'')[^'\\]*)*(?:'|\\?\Z)
+  | '[^']*(?:''[^']*)*(?:'|\Z)
+  | "[^"]*(?:""[^"]*)*(?:"|\Z)|\[[^\]]*(?:\]\][^\]]*)*(?:\]|\Z)|`[^`]*(?:``[^`]*)*(?:`|\Z)
+  | (?P<point_virgule>;)
+  | (?P<go>(?<![^\n])[ \t]*GO(?!\w))
+""", re.VERBOSE | re.DOTALL | re.IGNORECASE)
+
+
+class Jeton(NamedTuple):
+    """
+    Un jeton SQL
+    
+    - type: MOT, IDENTIFIANT, CHAINE, NOMBRE, COMMENTAIRE ou SYMBOLE
+    - valeur: le texte du jeton, tel qu'écrit dans le code
+    - position: décalage du premier caractère dans le code
+    - ligne: numéro de ligne du premier caractère (1-based)
+    """
+    type: str
+    valeur: str
+    position: int
+    ligne: int
+    
+    @property
+    def mot_cle(self) -> str:
+        """Valeur en majuscules si le jeton est un mot (sinon chaîne vide)"""
+        return self.valeur.upper() if self.type == MOT else ''
+    
+    @property
+    def nom(self) -> str:
+        """Nom désigné par un mot ou un identifiant, sans délimiteurs, en majuscules"""
+        if self.type == IDENTIFIANT:
+            return self.valeur[1:-1].upper()
+        return self.mot_cle
+
+
+def tokeniser(contenu: str, avec_commentaires: bool = False, ligne: int = 1) -> Iterator[Jeton]:
+    """
+    Génère les jetons d'un code SQL, en temps linéaire
+    
+    Les espaces ne sont jamais générés. Les commentaires ne le sont que si
+    `avec_commentaires` est vrai. `ligne` est le numéro de la première ligne
+    de `contenu` (quand c'est un morceau d'un script plus grand).
+    """
+    dernier = 0
+    
+    for match in _REGEX_JETON.finditer(contenu):
+        type_jeton = match.lastgroup
+        if type_jeton == 'espace' or (type_jeton == COMMENTAIRE and not avec_commentaires):
+            continue
+        
+        position = match.start()
+        ligne += contenu.count('\n', dernier, position)
+        dernier = position
+        
+        yield Jeton(type_jeton, match.group(), position, ligne)
+
+
+def instructions(contenu: str, ligne: int = 1) -> Iterator[List[Jeton]]:
+    """
+    Génère les jetons de chaque instruction (sans le séparateur)
+    
+    Une instruction se termine par ; ou par un GO en début de ligne
+    (séparateur de lots T-SQL). Les instructions vides ne sont pas générées.
+    """
+    courante: List[Jeton] = []
+    ligne_precedente = 0
+    
+    for jeton in tokeniser(contenu, ligne=ligne):
+        if jeton.type == SYMBOLE and jeton.valeur == ';':
+            separateur = True
+        else:
+            separateur = jeton.ligne != ligne_precedente and jeton.mot_cle == 'GO'
+        ligne_precedente = jeton.ligne
+        
+        if not separateur:
+            courante.append(jeton)
+        elif courante:
+            yield courante
+            courante = []
+    
+    if courante:
+        yield courante
+
+
+def _coupures(contenu: str, final: bool = True) -> Iterator[Tuple[int, Optional[bool]]]:
+    """
+    Positions où un script peut être coupé, dans l'ordre
+    
+    - (position, True): entre deux instructions (après un ;, avant un GO)
+    - (position, False): après une chaîne, un identifiant ou un commentaire
+      (la coupure tombe entre deux jetons, mais au milieu d'une instruction)
+    
+    Si `final` est faux, le texte n'est pas terminé: un jeton qui touche la
+    fin (chaîne non fermée, GO qui serait un GOTO...) n'est pas une coupure.
+    Son début est alors généré en dernier, en (position, None).
+    """
+    for match in _REGEX_FRONTIERE.finditer(contenu):
+        separateur = match.lastgroup
+        if not final and match.end() == len(contenu) and separateur != 'point_virgule':
+            yield match.start(), None
+            return
+        
+        if separateur == 'point_virgule':
+            yield match.end(), True
+        elif separateur == 'go':
+            yield match.start(), True
+        else:
+            yield match.end(), False
+
+
+def decouper_morceaux(contenu: str, taille: int) -> List[Tuple[str, int, int]]:
+    """
+    Découpe un script en morceaux d'environ `taille` caractères
+    
+    Les coupures tombent juste après un ; ou juste avant un GO, hors
+    chaînes, identifiants et commentaires: chaque morceau contient des
+    instructions entières.
+    
+    Returns:
+        Liste de tuples (morceau, ligne et colonne de son premier caractère)
+    """
+    morceaux = []
+    debut = 0
+    ligne = colonne = 1
+    
+    for position, separateur in _coupures(contenu):
+        if separateur and position - debut >= taille:
+            morceaux.append((contenu[debut:position], ligne, colonne))
+            ligne, colonne = avancer(contenu, debut, position, ligne, colonne)
+            debut = position
+    
+    if debut < len(contenu):
+        morceaux.append((contenu[debut:], ligne, colonne))
+    
+    return morceaux
+
+
+def instructions_modifiees(contenu: str, lignes: LignesModifiees) -> List[Tuple[str, int, int]]:
+    """
+    Instructions qui contiennent au moins une ligne modifiée
+    
+    Les instructions voisines sont regroupées en un seul bloc. Le reste du
+    script n'est pas analysé: ses problèmes seraient de toute façon filtrés.
+    
+    Returns:
+        Liste de tuples (bloc, ligne et colonne de son premier caractère)
+    """
+    blocs = []
+    debut_bloc = None
+    debut = 0
+    ligne = colonne = 1
+    
+    coupures = [position for position, separateur in _coupures(contenu) if separateur]
+    if not coupures or coupures[-1] < len(contenu):
+        coupures.append(len(contenu))
+    
+    for position in coupures:
+        ligne_fin, colonne_fin = avancer(contenu, debut, position, ligne, colonne)
+        
+        if lignes.chevauche(ligne, ligne_fin):
+            if debut_bloc is None:
+                debut_bloc = (debut, ligne, colonne)
+        elif debut_bloc is not None:
+            blocs.append((contenu[debut_bloc[0]:debut], debut_bloc[1], debut_bloc[2]))
+            debut_bloc = None
+        
+        debut, ligne, colonne = position, ligne_fin, colonne_fin
+    
+    if debut_bloc is not None:
+        blocs.append((contenu[debut_bloc[0]:], debut_bloc[1], debut_bloc[2]))
+    
+    return blocs
+
+
+def decouper_au_fil(morceaux: Iterable[str], taille_max: int) -> Iterator[Tuple[str, int, int]]:
+    """
+    Découpe un script lu par morceaux en blocs d'instructions entières
+    
+    Seul le texte après la dernière instruction complète reste en mémoire.
+    Une instruction plus longue que `taille_max` est coupée entre deux
+    jetons, jamais dans une chaîne ou un commentaire (un seul jeton plus
+    long est lu jusqu'à sa fin): ses règles sont alors évaluées sur chaque
+    partie.
+    
+    Yields:
+        Tuples (bloc, ligne et colonne de son premier caractère)
+    """
+    tampon = ''
+    ligne = colonne = 1
+    
+    for morceau in morceaux:
+        tampon += morceau
+        coupure = fin_jeton = 0
+        debut_ouvert = None
+        for position, separateur in _coupures(tampon, final=False):
+            if separateur is None:
+                debut_ouvert = position
+            elif separateur:
+                coupure = position
+            else:
+                fin_jeton = position
+        
+        if not coupure and len(tampon) > taille_max:
+            if debut_ouvert is not None:
+                # Avant la chaîne ou le commentaire non terminé (0: on attend sa fin)
+                coupure = debut_ouvert
+            else:
+                coupure = max(fin_jeton, _fin_dernier_espace(tampon)) or len(tampon)
+        
+        if coupure:
+            yield tampon[:coupure], ligne, colonne
+            ligne, colonne = avancer(tampon, 0, coupure, ligne, colonne)
+            tampon = tampon[coupure:]
+    
+    if tampon.strip():
+        yield tampon, ligne, colonne
+
+
+def _fin_dernier_espace(texte: str) -> int:
+    """Position juste après le dernier blanc (0 s'il n'y en a pas): une coupure entre deux mots"""
+    return max(texte.rfind(' '), texte.rfind('\t'), texte.rfind('\n')) + 1
\ No newline at end of file
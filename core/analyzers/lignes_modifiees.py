@@ -0,0 +1,172 @@
+"""
+Lignes Modifiées
+================
+Lignes touchées par un diff, pour n'analyser que ce qui a changé.
+
+Un diff unifié (ou `git diff` sur une plage de commits) donne, par
+fichier, des intervalles de lignes ajoutées ou modifiées. Ils sont
+fusionnés et triés une fois: savoir si une ligne est modifiée est une
+recherche dichotomique.
+
+Les suppressions seules ne marquent aucune ligne (il n'en reste rien
+dans la nouvelle version du fichier).
+"""
+
+import re
+import subprocess
+from array import array
+from bisect import bisect_right
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+_REGEX_FICHIER = re.compile(r'^\+\+\+ (?:b/)?(?P<chemin>[^\t]+)')
+_REGEX_BLOC = re.compile(r'^@@ -\d+(?:,(?P<nombre_ancien>\d+))? \+(?P<debut>\d+)(?:,(?P<nombre>\d+))? @@')
+
+
+class LignesModifiees:
+    """
+    Intervalles de lignes modifiées d'un fichier (1-based, bornes incluses)
+    
+    Les intervalles qui se chevauchent ou se touchent sont fusionnés.
+    """
+    
+    def __init__(self, intervalles: Iterable[Tuple[int, int]] = ()):
+        self.debuts = array('q')
+        self.fins = array('q')
+        
+        for debut, fin in sorted(intervalles):
+            if self.fins and debut <= self.fins[-1] + 1:
+                self.fins[-1] = max(self.fins[-1], fin)
+            else:
+                self.debuts.append(debut)
+                self.fins.append(fin)
+    
+    def __contains__(self, ligne: int) -> bool:
+        # Un numéro mal formé (venu du modèle d'IA, par exemple) n'est dans aucun intervalle
+        if not isinstance(ligne, int) or isinstance(ligne, bool):
+            return False
+        i = bisect_right(self.debuts, ligne) - 1
+        return i >= 0 and ligne <= self.fins[i]
+    
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.debuts, self.fins)
+    
+    def __bool__(self) -> bool:
+        return bool(self.debuts)
+    
+    def __repr__(self) -> str:
+        return f'LignesModifiees({self.empreinte() or "-"})'
+    
+    def chevauche(self, debut: int, fin: int) -> bool:
+        """Vrai si une ligne de [debut, fin] est modifiée"""
+        i = bisect_right(self.debuts, fin) - 1
+        return i >= 0 and self.fins[i] >= debut
+    
+    def elargir(self, contexte: int) -> 'LignesModifiees':
+        """Mêmes intervalles avec `contexte` lignes de chaque côté"""
+        return LignesModifiees((max(1, debut - contexte), fin + contexte) for debut, fin in self)
+    
+    def filtrer(self, problemes: List[Dict]) -> List[Dict]:
+        """
+        Garde les problèmes des lignes modifiées
+        
+        Un problème sans ligne (timeout, remarque sur tout le fichier) est
+        gardé, un problème dont la ligne n'est pas un entier est écarté.
+        """
+        return [p for p in problemes if p.get('ligne') is None or p['ligne'] in self]
+    
+    def extraits(self, contenu: str, contexte: int = 0, numeroter: bool = True) -> str:
+        """
+        Lignes modifiées du code et `contexte` lignes autour
+        
+        Les extraits sont séparés par une ligne '...'. Avec `numeroter`,
+        chaque ligne est précédée de son numéro dans le fichier ('12| ').
+        """
+        lignes = contenu.split('\n')
+        blocs = []
+        
+        for debut, fin in self.elargir(contexte):
+            if debut > len(lignes):
+                break
+            fin = min(fin, len(lignes))
+            if numeroter:
+                blocs.append('\n'.join(f'{n}| {lignes[n - 1]}' for n in range(debut, fin + 1)))
+            else:
+                blocs.append('\n'.join(lignes[debut - 1:fin]))
+        
+        return '\n...\n'.join(blocs)
+    
+    def empreinte(self) -> str:
+        """Intervalles sous forme courte ('3-5,12-12'), pour une clé de cache"""
+        return ','.join(f'{debut}-{fin}' for debut, fin in self)
+
+
+def lire_diff(diff: str) -> Dict[str, LignesModifiees]:
+    """
+    Lignes modifiées de chaque fichier d'un diff unifié
+    
+    Seuls les en-têtes '+++' et '@@' sont lus: le diff peut être produit
+    avec ou sans contexte (-U0 suffit). Un fichier supprimé (+++ /dev/null)
+    n'apparaît pas.
+    
+    Returns:
+        {chemin dans la nouvelle version: LignesModifiees}
+    """
+    intervalles: Dict[str, List[Tuple[int, int]]] = {}
+    chemin: Optional[str] = None
+    # Lignes restantes du bloc en cours (ancienne, nouvelle version): tant
+    # qu'il en reste, une ligne '+++ ...' est du code ajouté, pas un en-tête
+    ancien = nouveau = 0
+    numero = 0
+    
+    for ligne in diff.splitlines():
+        if ancien > 0 or nouveau > 0:
+            if ligne.startswith('+'):
+                if chemin is not None:
+                    intervalles[chemin].append((numero, numero))
+                numero += 1
+                nouveau -= 1
+            elif ligne.startswith('-'):
+                ancien -= 1
+            elif not ligne.startswith('\\'):
+                # Contexte (une ligne vide de contexte peut avoir perdu son espace)
+                numero += 1
+                ancien -= 1
+                nouveau -= 1
+        elif ligne.startswith('+++ '):
+            match = _REGEX_FICHIER.match(ligne)
+            chemin = match.group('chemin') if match and ligne != '+++ /dev/null' else None
+            if chemin is not None:
+                intervalles.setdefault(chemin, [])
+        elif ligne.startswith('@@'):
+            match = _REGEX_BLOC.match(ligne)
+            if match:
+                ancien = _nombre(match.group('nombre_ancien'))
+                nouveau = _nombre(match.group('nombre'))
+                numero = int(match.group('debut'))
+    
+    return {chemin: LignesModifiees(blocs) for chemin, blocs in intervalles.items()}
+
+
+def _nombre(groupe: Optional[str]) -> int:
+    """Nombre de lignes d'un en-tête @@ (absent: 1)"""
+    return int(groupe) if groupe is not None else 1
+
+
+def diff_git(plage: str, chemins: Iterable[str] = (), repertoire: str = None) -> Dict[str, LignesModifiees]:
+    """
+    Lignes modifiées par une plage de commits ('HEAD~1..HEAD', 'main...HEAD')
+    
+    Raises:
+        subprocess.CalledProcessError: si git échoue (plage inconnue...)
+    """
+    resultat = subprocess.run(
+        ['git', 'diff', '--unified=0', '--no-color', '--no-ext-diff', plage, '--', *chemins],
+        capture_output=True,
+        text=True,
+        encoding='utf-8',
+        errors='replace',
+        check=True,
+        cwd=repertoire
+    )
+    return lire_diff(resultat.stdout)
\ No newline at end of file
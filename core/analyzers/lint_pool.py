@@ -0,0 +1,308 @@
+"""
+Pool de Moteurs de Lint
+=======================
+Processus Flake8/Bandit gardés "chauds" entre deux analyses.
+
+Lancer `flake8` ou `bandit` en ligne de commande coûte le démarrage d'un
+interpréteur et le chargement des plugins à chaque soumission. Ici, chaque
+travailleur importe une seule fois l'API de Flake8 et le manager de Bandit,
+puis reçoit le code source par un pipe.
+
+Les limites du bac à sable (mémoire, fichiers ouverts) sont posées sur
+le travailleur à son démarrage, la limite CPU est réarmée avant chaque
+job: un job qui la dépasse tue son travailleur.
+"""
+
+import atexit
+import multiprocessing
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from .bac_a_sable import Limites, SIGNAUX_LIMITES, appliquer_limites, limiter_cpu, limites_config
+from .espace_travail import EspaceTravail, fichier_travail, supprimer_fichier
+
+
+FORMAT_FLAKE8 = '%(row)d:%(col)d:%(code)s:%(text)s'
+
+
+def _boucle_travailleur(connexion, limites: Limites, chemin: str):
+    """
+    Point d'entrée d'un processus travailleur
+    
+    Reçoit des tuples (outil, contenu, options) et renvoie ('ok', resultats),
+    ('erreur', message) ou ('limite', message) si le job a manqué de mémoire.
+    Un message None arrête le processus. Le code est réécrit à chaque job
+    dans `chemin`, créé par le pool (en mémoire si possible).
+    """
+    appliquer_limites(limites._replace(cpu=None))
+    guides_flake8 = {}
+    
+    try:
+        while True:
+            message = connexion.recv()
+            if message is None:
+                break
+            
+            outil, contenu, options = message
+            limiter_cpu(limites.cpu)
+            try:
+                with open(chemin, 'w', encoding='utf-8') as f:
+                    f.write(contenu)
+                
+                if outil == 'flake8':
+                    resultats = _lancer_flake8(chemin, options, guides_flake8)
+                else:
+                    resultats = _lancer_bandit(chemin, options)
+                
+                connexion.send(('ok', resultats))
+            except MemoryError:
+                connexion.send(('limite', f'{outil}: mémoire insuffisante'))
+            except Exception as e:
+                connexion.send(('erreur', str(e)))
+    except (EOFError, KeyboardInterrupt):
+        pass
+
+
+def _lancer_flake8(chemin: str, options: Dict[str, Any], guides: Dict) -> List[str]:
+    """
+    Lance Flake8 via son API Python
+    
+    Retourne des lignes au même format que `--format=FORMAT_FLAKE8`
+    pour être parsées exactement comme la sortie de la ligne de commande.
+    """
+    cle = (options['max_line_length'], tuple(options['ignore']))
+    
+    if cle not in guides:
+        from flake8.api import legacy
+        from flake8.formatting.base import BaseFormatter
+        
+        class Collecteur(BaseFormatter):
+            """Formatter qui garde les erreurs en mémoire au lieu de les afficher"""
+            lignes = []
+            
+            def format(self, error):
+                return f'{error.line_number}:{error.column_number}:{error.code}:{error.text}'
+            
+            def handle(self, error):
+                Collecteur.lignes.append(self.format(error))
+        
+        parametres = {'max_line_length': options['max_line_length']}
+        if options['ignore']:
+            parametres['ignore'] = list(options['ignore'])
+        
+        guide = legacy.get_style_guide(**parametres)
+        guide.init_report(Collecteur)
+        guides[cle] = (guide, Collecteur)
+    
+    guide, collecteur = guides[cle]
+    collecteur.lignes = []
+    guide.check_files([chemin])
+    
+    return list(collecteur.lignes)
+
+
+def _lancer_bandit(chemin: str, options: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Lance Bandit via son manager Python
+    
+    Retourne les issues au format de la sortie JSON (`-f json`).
+    """
+    from bandit.core import config as b_config
+    from bandit.core import constants as b_constants
+    from bandit.core import manager as b_manager
+    
+    # Même correspondance que l'option --severity-level de la ligne de commande
+    niveaux = {'all': 'UNDEFINED', 'low': 'LOW', 'medium': 'MEDIUM', 'high': 'HIGH'}
+    niveau = niveaux.get(options['severity'], b_constants.LOW)
+    
+    manager = b_manager.BanditManager(b_config.BanditConfig(), 'file', quiet=True)
+    manager.discover_files([chemin])
+    manager.run_tests()
+    
+    return [issue.as_dict() for issue in manager.get_issue_list(sev_level=niveau)]
+
+
+class _Travailleur:
+    """Un processus travailleur, son extrémité de pipe et son fichier de travail"""
+    
+    def __init__(self, contexte, limites: Limites, dossier: str = None):
+        # Créé et supprimé ici: un travailleur tué ne laisse pas de fichier derrière lui
+        self.chemin = fichier_travail(dossier)
+        self.connexion, connexion_enfant = contexte.Pipe()
+        self.processus = contexte.Process(
+            target=_boucle_travailleur,
+            args=(connexion_enfant, limites, self.chemin),
+            daemon=True
+        )
+        self.processus.start()
+        connexion_enfant.close()
+        self.nb_jobs = 0
+    
+    def arreter(self, forcer: bool = False):
+        """Arrête proprement le processus (ou le tue si forcer=True)"""
+        try:
+            if not forcer:
+                self.connexion.send(None)
+                self.processus.join(timeout=2)
+        except OSError:
+            pass
+        
+        if self.processus.is_alive():
+            self.processus.kill()
+            self.processus.join(timeout=2)
+        
+        self.connexion.close()
+        supprimer_fichier(self.chemin)
+
+
+class PoolLint:
+    """
+    Pool de processus Flake8/Bandit réutilisables
+    
+    - Les travailleurs sont créés à la demande, jusqu'à `taille`
+    - Un travailleur est recyclé après `max_jobs` analyses (fuites mémoire)
+    - Un job qui dépasse `timeout` secondes ou les `limites` tue son travailleur
+    - L'attente d'un travailleur libre compte dans le `timeout` du job
+    """
+    
+    _instance = None
+    _verrou_instance = threading.Lock()
+    
+    def __init__(
+        self,
+        taille: int = 4,
+        max_jobs: int = 200,
+        limites: Limites = Limites(None, None, None),
+        dossier: str = None
+    ):
+        # "spawn" évite de dupliquer par fork un processus Django multi-thread
+        self.contexte = multiprocessing.get_context('spawn')
+        self.taille = taille
+        self.max_jobs = max_jobs
+        self.limites = limites
+        self.dossier = dossier
+        self.libres: queue.Queue = queue.Queue()
+        self.nb_crees = 0
+        self.verrou = threading.Lock()
+    
+    @classmethod
+    def get_instance(cls, config: Dict[str, Any]) -> 'PoolLint':
+        """Retourne le pool partagé par tout le processus"""
+        if cls._instance is None:
+            with cls._verrou_instance:
+                if cls._instance is None:
+                    cls._instance = cls(
+                        taille=config.get('LINT_POOL_TAILLE', 4),
+                        max_jobs=config.get('LINT_POOL_MAX_JOBS', 200),
+                        limites=limites_config(config, config.get('LINT_TIMEOUT', 30)),
+                        dossier=EspaceTravail.get_instance(config).dossier
+                    )
+                    atexit.register(cls._instance.fermer)
+        return cls._instance
+    
+    def executer(self, outil: str, contenu: str, options: Dict[str, Any], timeout: float) -> Any:
+        """
+        Envoie un job à un travailleur libre et attend sa réponse
+        
+        Raises:
+            TimeoutError: si aucun travailleur ne se libère à temps, ou si
+                le job dépasse le timeout ou les limites
+            RuntimeError: si l'outil a échoué dans le travailleur
+        """
+        echeance = time.monotonic() + timeout
+        travailleur = self._acquerir(echeance)
+        remettre = True
+        
+        try:
+            travailleur.connexion.send((outil, contenu, options))
+            
+            if not travailleur.connexion.poll(max(0, echeance - time.monotonic())):
+                # Le travailleur est bloqué: on le tue, un autre le remplacera
+                remettre = False
+                raise TimeoutError(f'{outil} a dépassé {timeout}s')
+            
+            statut, resultat = travailleur.connexion.recv()
+        except (EOFError, ConnectionError) as e:
+            remettre = False
+            travailleur.processus.join(timeout=1)
+            if travailleur.processus.exitcode in SIGNAUX_LIMITES:
+                raise TimeoutError(f'{outil} a dépassé sa limite CPU')
+            raise RuntimeError(f'Travailleur {outil} interrompu: {e}')
+        finally:
+            travailleur.nb_jobs += 1
+            if remettre and travailleur.nb_jobs < self.max_jobs:
+                self.libres.put(travailleur)
+            else:
+                self._retirer(travailleur, forcer=not remettre)
+        
+        if statut == 'limite':
+            raise TimeoutError(resultat)
+        if statut != 'ok':
+            raise RuntimeError(resultat)
+        
+        return resultat
+    
+    def _acquerir(self, echeance: float) -> _Travailleur:
+        """
+        Prend un travailleur libre, en crée un si le pool n'est pas plein
+        
+        Raises:
+            TimeoutError: pool plein et aucun travailleur libéré avant
+                `echeance` (time.monotonic())
+        """
+        while True:
+            try:
+                return self.libres.get_nowait()
+            except queue.Empty:
+                pass
+            
+            with self.verrou:
+                creer = self.nb_crees < self.taille
+                if creer:
+                    self.nb_crees += 1
+            
+            if creer:
+                try:
+                    return _Travailleur(self.contexte, self.limites, self.dossier)
+                except Exception:
+                    with self.verrou:
+                        self.nb_crees -= 1
+                    raise
+            
+            # Pool plein: attendre qu'un travailleur se libère (ou soit retiré)
+            restant = echeance - time.monotonic()
+            if restant <= 0:
+                raise TimeoutError('aucun travailleur de lint libéré à temps')
+            try:
+                return self.libres.get(timeout=min(restant, 0.1))
+            except queue.Empty:
+                continue
+    
+    def _retirer(self, travailleur: _Travailleur, forcer: bool = False):
+        """Arrête un travailleur et libère sa place dans le pool"""
+        travailleur.arreter(forcer=forcer)
+        with self.verrou:
+            self.nb_crees -= 1
+    
+    def fermer(self):
+        """Arrête tous les travailleurs libres (appelé à la sortie du processus)"""
+        while True:
+            try:
+                travailleur = self.libres.get_nowait()
+            except queue.Empty:
+                break
+            self._retirer(travailleur)
+
+
+def options_outils(config: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Construit les options Flake8 et Bandit envoyées aux travailleurs"""
+    options_flake8 = {
+        'max_line_length': config.get('FLAKE8_MAX_LINE_LENGTH', 120),
+        'ignore': list(config.get('FLAKE8_IGNORE', [])),
+    }
+    options_bandit = {
+        'severity': config.get('BANDIT_SEVERITY', 'LOW').lower(),
+    }
+    return options_flake8, options_bandit
\ No newline at end of file
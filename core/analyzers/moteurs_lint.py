@@ -0,0 +1,501 @@
+"""
+Moteurs de Lint Python
+======================
+Ce qui exécute réellement les vérifications Python, derrière
+AnalyseurPythonTools (choisi par LINT_MOTEUR):
+
+- 'flake8': Flake8 et Bandit (pool de travailleurs, ou ligne de commande)
+- 'ruff': Ruff, qui couvre pyflakes/pycodestyle (E, W, F) et les règles
+  de Bandit (S) en un seul binaire, beaucoup plus rapide
+
+Un moteur rend la sortie brute, au format de Flake8 et de Bandit: des
+lignes FORMAT_FLAKE8 et des issues comme celles de `bandit -f json`.
+L'analyseur les classe ensuite de la même façon quel que soit le moteur,
+les scores restent donc comparables.
+
+Convention commune: None au lieu d'une sortie signifie que l'outil a
+dépassé son timeout ou ses limites. Tout passe par le bac à sable
+(bac_a_sable.py), qui lève SurchargeLint quand le serveur est saturé.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future
+from importlib.util import find_spec
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .bac_a_sable import Guichet, lancer, lancer_async
+from .lint_pool import PoolLint, FORMAT_FLAKE8, options_outils
+
+
+# Sortie d'un lot: {outil: une liste de résultats par fichier, ou None (timeout)}
+SortieLot = Dict[str, Optional[List[List[Any]]]]
+
+
+class MoteurLint:
+    """
+    Interface d'un moteur de lint
+    
+    `flake8` regroupe le style et les erreurs (pycodestyle, pyflakes),
+    `bandit` la sécurité. Un moteur peut lancer un lot de fichiers en une
+    fois pour les outils de `outils_lot`.
+    """
+    
+    nom = ''
+    
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.flake8_disponible = False
+        self.bandit_disponible = False
+        self.outils_lot = set()
+    
+    def flake8(self, contenu: str, timeout: float) -> Optional[List[str]]:
+        """Lignes au format FORMAT_FLAKE8"""
+        raise NotImplementedError
+    
+    def bandit(self, contenu: str, timeout: float) -> Optional[List[Dict[str, Any]]]:
+        """Issues au format de `bandit -f json`"""
+        raise NotImplementedError
+    
+    async def flake8_async(self, contenu: str, timeout: float) -> Optional[List[str]]:
+        """Version asynchrone de flake8 (par défaut: dans un thread)"""
+        return await asyncio.to_thread(self.flake8, contenu, timeout)
+    
+    async def bandit_async(self, contenu: str, timeout: float) -> Optional[List[Dict[str, Any]]]:
+        """Version asynchrone de bandit (par défaut: dans un thread)"""
+        return await asyncio.to_thread(self.bandit, contenu, timeout)
+    
+    def lot(self, dossier: str, nb_fichiers: int, outils: Sequence[str], timeout: float) -> SortieLot:
+        """
+        Lance les outils une fois sur tout un dossier de fichiers NNNNN.py
+        
+        Returns:
+            {outil: [sortie du fichier 0, sortie du fichier 1, ...]}, ou None
+            pour un outil qui a dépassé le timeout
+        """
+        raise NotImplementedError
+
+
+class MoteurFlake8Bandit(MoteurLint):
+    """
+    Flake8 et Bandit
+    
+    Dans un travailleur du pool si l'outil est importable ici (pas de
+    démarrage d'interpréteur), sinon en ligne de commande avec le code sur
+    stdin. Les lots passent toujours par la ligne de commande.
+    """
+    
+    nom = 'flake8'
+    
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        
+        # Lignes de commande (nécessaires au mode lot)
+        flake8_commande = shutil.which('flake8') is not None
+        bandit_commande = shutil.which('bandit') is not None
+        
+        # Pool de travailleurs: possible si les outils sont importables ici
+        pool_actif = config.get('LINT_POOL_ACTIF', True)
+        self.flake8_pool = pool_actif and find_spec('flake8') is not None
+        self.bandit_pool = pool_actif and find_spec('bandit') is not None
+        
+        self.flake8_disponible = flake8_commande or self.flake8_pool
+        self.bandit_disponible = bandit_commande or self.bandit_pool
+        self.outils_lot = {
+            outil for outil, commande in (('flake8', flake8_commande), ('bandit', bandit_commande)) if commande
+        }
+    
+    def flake8(self, contenu: str, timeout: float) -> Optional[List[str]]:
+        if self.flake8_pool:
+            return self._executer_pool('flake8', contenu, timeout)
+        
+        sortie = lancer(self._commande_flake8('-'), timeout, self.config, contenu)
+        return None if sortie is None else sortie.splitlines()
+    
+    def bandit(self, contenu: str, timeout: float) -> Optional[List[Dict[str, Any]]]:
+        if self.bandit_pool:
+            return self._executer_pool('bandit', contenu, timeout)
+        
+        sortie = lancer(self._commande_bandit('-'), timeout, self.config, contenu)
+        return None if sortie is None else self._issues_bandit(sortie)
+    
+    async def flake8_async(self, contenu: str, timeout: float) -> Optional[List[str]]:
+        """Sans pool, Flake8 tourne dans un sous-processus lancé par asyncio"""
+        if self.flake8_pool:
+            return await super().flake8_async(contenu, timeout)
+        
+        sortie = await lancer_async(self._commande_flake8('-'), timeout, self.config, contenu)
+        return None if sortie is None else sortie.splitlines()
+    
+    async def bandit_async(self, contenu: str, timeout: float) -> Optional[List[Dict[str, Any]]]:
+        if self.bandit_pool:
+            return await super().bandit_async(contenu, timeout)
+        
+        sortie = await lancer_async(self._commande_bandit('-'), timeout, self.config, contenu)
+        return None if sortie is None else self._issues_bandit(sortie)
+    
+    def lot(self, dossier: str, nb_fichiers: int, outils: Sequence[str], timeout: float) -> SortieLot:
+        """
+        Flake8 (réparti sur --jobs processus) puis Bandit, une fois chacun
+        
+        Chaque ligne Flake8 est préfixée par son fichier (NNNNN.py:), le
+        champ `filename` des issues Bandit donne aussi le fichier.
+        """
+        sorties = {}
+        
+        if 'flake8' in outils:
+            commande = self._commande_flake8(dossier, f'%(path)s:{FORMAT_FLAKE8}')
+            commande.insert(-1, f"--jobs={self.config.get('LINT_LOT_JOBS', 'auto')}")
+            sortie = lancer(commande, timeout, self.config)
+            
+            if sortie is None:
+                sorties['flake8'] = None
+            else:
+                sorties['flake8'] = [[] for _ in range(nb_fichiers)]
+                for ligne in sortie.splitlines():
+                    chemin, separateur, reste = ligne.partition('.py:')
+                    if separateur:
+                        sorties['flake8'][index_fichier(chemin)].append(reste)
+        
+        if 'bandit' in outils:
+            commande = self._commande_bandit(dossier)
+            commande.insert(-1, '-r')
+            sortie = lancer(commande, timeout, self.config)
+            
+            if sortie is None:
+                sorties['bandit'] = None
+            else:
+                sorties['bandit'] = [[] for _ in range(nb_fichiers)]
+                for issue in self._issues_bandit(sortie):
+                    sorties['bandit'][index_fichier(issue.get('filename', ''))].append(issue)
+        
+        return sorties
+    
+    def _executer_pool(self, outil: str, contenu: str, timeout: float) -> Optional[List[Any]]:
+        """Exécute un outil dans un travailleur du pool (pas de sous-processus)"""
+        options_flake8, options_bandit = options_outils(self.config)
+        options = options_flake8 if outil == 'flake8' else options_bandit
+        
+        try:
+            with Guichet.get_instance(self.config).place():
+                return PoolLint.get_instance(self.config).executer(outil, contenu, options, timeout)
+        except TimeoutError:
+            return None
+    
+    def _commande_flake8(self, chemin: str, format_sortie: str = FORMAT_FLAKE8) -> List[str]:
+        """Construit la ligne de commande Flake8"""
+        max_length = self.config.get('FLAKE8_MAX_LINE_LENGTH', 120)
+        ignore = ','.join(self.config.get('FLAKE8_IGNORE', []))
+        
+        commande = [
+            'flake8',
+            f'--max-line-length={max_length}',
+            f'--format={format_sortie}',
+            chemin
+        ]
+        
+        if ignore:
+            commande.insert(2, f'--ignore={ignore}')
+        if chemin == '-':
+            # Code lu sur stdin: le nom sert aux exclusions par fichier, jamais au format
+            commande.insert(-1, '--stdin-display-name=code.py')
+        
+        return commande
+    
+    def _commande_bandit(self, chemin: str) -> List[str]:
+        """Construit la ligne de commande Bandit"""
+        severity = self.config.get('BANDIT_SEVERITY', 'LOW').lower()
+        
+        return [
+            'bandit',
+            '-f', 'json',
+            f'--severity-level={severity}',
+            chemin
+        ]
+    
+    def _issues_bandit(self, sortie: str) -> List[Dict[str, Any]]:
+        """Issues de la sortie JSON de Bandit (lève JSONDecodeError si invalide)"""
+        return json.loads(sortie).get('results', []) if sortie else []
+
+
+# Sévérité Bandit de chaque test, LOW sinon. Quand Bandit la choisit selon les
+# arguments de l'appel (B202, B324, B502, B505, B602, B605: commande littérale
+# ou non, taille de clé...), c'est la plus basse qu'il puisse donner: Ruff ne
+# dit pas quel cas il a vu, et un code que Bandit accepte ne doit pas échouer
+# avec Ruff
+SEVERITES_BANDIT = {
+    **dict.fromkeys([
+        'B201', 'B304', 'B312', 'B321', 'B401', 'B402', 'B411', 'B412', 'B413', 'B415',
+        'B501', 'B507', 'B609', 'B613', 'B701',
+    ], 'HIGH'),
+    **dict.fromkeys([
+        'B102', 'B103', 'B104', 'B108', 'B113', 'B301', 'B302', 'B303', 'B305', 'B306',
+        'B307', 'B308', 'B310', 'B313', 'B314', 'B315', 'B316', 'B317', 'B318', 'B319',
+        'B323', 'B324', 'B502', 'B503', 'B505', 'B506', 'B508', 'B509', 'B601', 'B604',
+        'B608', 'B610', 'B611', 'B612', 'B614', 'B615', 'B702', 'B703', 'B704',
+    ], 'MEDIUM'),
+}
+
+_NIVEAUX_BANDIT = {'all': 0, 'low': 1, 'medium': 2, 'high': 3}
+
+# Codes ignorés par Flake8 quand FLAKE8_IGNORE est vide (sa liste par défaut)
+_IGNORE_DEFAUT_FLAKE8 = ['E121', 'E123', 'E126', 'E226', 'E24', 'E704', 'W503', 'W504']
+
+
+class MoteurRuff(MoteurLint):
+    """
+    Ruff: style, erreurs et sécurité en un seul passage
+    
+    Le code est envoyé sur l'entrée standard (pas de fichier temporaire).
+    Pour une analyse, les étapes flake8 et bandit partagent un seul
+    lancement de Ruff sur toutes les familles de règles (_Passages).
+    Les règles E/W/F gardent les codes de pycodestyle et pyflakes, et une
+    règle S<nnn> est le test Bandit B<nnn>: les codes sont renommés et
+    reçoivent la sévérité que Bandit leur donne (SEVERITES_BANDIT).
+    
+    RUFF_PREVIEW active les règles pycodestyle encore en préversion dans
+    Ruff (E1, E2, E3...), sans lesquelles il signale bien moins de
+    problèmes de style que Flake8.
+    """
+    
+    nom = 'ruff'
+    
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.flake8_disponible = self.bandit_disponible = shutil.which('ruff') is not None
+        self.outils_lot = {'flake8', 'bandit'} if self.flake8_disponible else set()
+        self.ignore = tuple(config.get('FLAKE8_IGNORE') or _IGNORE_DEFAUT_FLAKE8)
+        self.niveau_bandit = _NIVEAUX_BANDIT.get(config.get('BANDIT_SEVERITY', 'LOW').lower(), 1)
+        self.passages = _Passages()
+    
+    def flake8(self, contenu: str, timeout: float) -> Optional[List[str]]:
+        resultats = self._passage(contenu, timeout, 'flake8')
+        return None if resultats is None else resultats['flake8']
+    
+    def bandit(self, contenu: str, timeout: float) -> Optional[List[Dict[str, Any]]]:
+        resultats = self._passage(contenu, timeout, 'bandit')
+        return None if resultats is None else resultats['bandit']
+    
+    async def flake8_async(self, contenu: str, timeout: float) -> Optional[List[str]]:
+        resultats = await self._passage_async(contenu, timeout, 'flake8')
+        return None if resultats is None else resultats['flake8']
+    
+    async def bandit_async(self, contenu: str, timeout: float) -> Optional[List[Dict[str, Any]]]:
+        resultats = await self._passage_async(contenu, timeout, 'bandit')
+        return None if resultats is None else resultats['bandit']
+    
+    def _passage(self, contenu: str, timeout: float, outil: str) -> Optional[Dict[str, List[Any]]]:
+        """
+        Résultats des deux outils pour ce code, avec un seul lancement de Ruff
+        
+        La première étape qui demande un code lance Ruff sur toutes les
+        familles de règles; l'autre étape (souvent en parallèle) attend et
+        reprend sa part au lieu de relancer Ruff.
+        """
+        passage, proprietaire = self.passages.prendre(_empreinte(contenu), outil)
+        if not proprietaire:
+            try:
+                return passage.result()
+            except CancelledError:
+                # Le passage partagé a été abandonné: en relancer un
+                passage = Future()
+        
+        try:
+            sortie = lancer(self._commande(('flake8', 'bandit'), '-'), timeout, self.config, contenu)
+            resultats = None if sortie is None else self._convertir(json.loads(sortie))
+        except BaseException as e:
+            passage.set_exception(e)
+            raise
+        
+        passage.set_result(resultats)
+        return resultats
+    
+    async def _passage_async(self, contenu: str, timeout: float, outil: str) -> Optional[Dict[str, List[Any]]]:
+        """Équivalent de _passage() avec asyncio"""
+        passage, proprietaire = self.passages.prendre(_empreinte(contenu), outil)
+        if not proprietaire:
+            try:
+                # shield: annuler cette attente ne doit pas annuler le passage partagé
+                return await asyncio.shield(asyncio.wrap_future(passage))
+            except (CancelledError, asyncio.CancelledError):
+                if not passage.cancelled():
+                    # C'est cette tâche qui est annulée, pas le passage partagé
+                    raise
+                passage = Future()
+        
+        try:
+            sortie = await lancer_async(self._commande(('flake8', 'bandit'), '-'), timeout, self.config, contenu)
+            resultats = None if sortie is None else self._convertir(json.loads(sortie))
+        except asyncio.CancelledError:
+            # L'autre étape relancera Ruff elle-même
+            passage.cancel()
+            raise
+        except BaseException as e:
+            passage.set_exception(e)
+            raise
+        
+        passage.set_result(resultats)
+        return resultats
+    
+    def lot(self, dossier: str, nb_fichiers: int, outils: Sequence[str], timeout: float) -> SortieLot:
+        """Un seul passage de Ruff (multi-thread) pour tous les outils et tous les fichiers"""
+        sortie = lancer(self._commande(outils, dossier), timeout, self.config)
+        if sortie is None:
+            return dict.fromkeys(outils)
+        
+        par_fichier = {}
+        for diagnostic in json.loads(sortie):
+            par_fichier.setdefault(index_fichier(diagnostic.get('filename') or ''), []).append(diagnostic)
+        
+        sorties = {outil: [[] for _ in range(nb_fichiers)] for outil in outils}
+        for index, diagnostics in par_fichier.items():
+            for outil, resultats in self._convertir(diagnostics).items():
+                sorties[outil][index] = resultats
+        
+        return sorties
+    
+    def _commande(self, outils: Sequence[str], chemin: str) -> List[str]:
+        """
+        Ligne de commande Ruff pour les familles de règles des outils demandés
+        
+        `chemin` vaut '-' pour lire le code sur l'entrée standard. Les
+        fichiers de configuration du projet analysé sont ignorés (--isolated).
+        """
+        familles = (['E', 'W', 'F'] if 'flake8' in outils else []) + (['S'] if 'bandit' in outils else [])
+        
+        commande = [
+            'ruff', 'check',
+            '--isolated',
+            '--no-cache',
+            '--exit-zero',
+            '--output-format=json',
+            f"--line-length={self.config.get('FLAKE8_MAX_LINE_LENGTH', 120)}",
+            f"--select={','.join(familles)}",
+        ]
+        
+        if self.config.get('RUFF_PREVIEW', True):
+            commande.append('--preview')
+        if chemin == '-':
+            commande.append('--stdin-filename=code.py')
+        
+        return commande + [chemin]
+    
+    def _convertir(self, diagnostics: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+        """
+        Diagnostics Ruff d'un fichier -> {'flake8': lignes, 'bandit': issues}
+        
+        Les codes de FLAKE8_IGNORE sont filtrés ici: Ruff refuse les codes
+        qu'il ne connaît pas (W503...). Comme Flake8 (E999), seule la
+        première erreur de syntaxe est gardée.
+        """
+        resultats = {'flake8': [], 'bandit': []}
+        syntaxe = False
+        
+        for diagnostic in diagnostics:
+            code = diagnostic.get('code')
+            ligne = diagnostic['location']['row']
+            colonne = diagnostic['location']['column']
+            message = diagnostic.get('message', '')
+            
+            if code is None or code == 'invalid-syntax':
+                if not syntaxe:
+                    syntaxe = True
+                    resultats['flake8'].append(f'{ligne}:{colonne}:E999:SyntaxError: {message}')
+            elif code.startswith('S'):
+                code_bandit = 'B' + code[1:]
+                severite = SEVERITES_BANDIT.get(code_bandit, 'LOW')
+                if _NIVEAUX_BANDIT[severite.lower()] >= self.niveau_bandit:
+                    resultats['bandit'].append({
+                        'test_id': code_bandit,
+                        'issue_severity': severite,
+                        'issue_text': message,
+                        'line_number': ligne,
+                        'col_offset': colonne - 1,
+                    })
+            elif not code.startswith(self.ignore):
+                resultats['flake8'].append(f'{ligne}:{colonne}:{code}:{message}')
+        
+        return resultats
+
+
+class _Passages:
+    """
+    Lancements de Ruff en cours ou récents, par empreinte du code
+    
+    Chaque passage sert une fois à chaque outil puis est oublié. Un
+    passage dont une étape n'a jamais voulu sa part (outil désactivé)
+    finit évincé: seuls les `taille` derniers sont gardés.
+    """
+    
+    def __init__(self, taille: int = 32):
+        self.taille = taille
+        self.verrou = threading.Lock()
+        self.passages: 'OrderedDict[str, Tuple[Future, set]]' = OrderedDict()
+    
+    def prendre(self, empreinte: str, outil: str) -> Tuple[Future, bool]:
+        """
+        Passage de ce code pour cet outil
+        
+        Returns:
+            (passage, proprietaire): le propriétaire lance Ruff et remplit
+            le passage, l'autre étape attend son résultat
+        """
+        with self.verrou:
+            entree = self.passages.get(empreinte)
+            proprietaire = entree is None or outil not in entree[1]
+            if proprietaire:
+                # Nouveau code, ou code resoumis après que cet outil a eu sa part
+                entree = (Future(), {'flake8', 'bandit'})
+                self.passages[empreinte] = entree
+                self.passages.move_to_end(empreinte)
+            
+            passage, restants = entree
+            restants.discard(outil)
+            if not restants:
+                del self.passages[empreinte]
+            
+            while len(self.passages) > self.taille:
+                self.passages.popitem(last=False)
+        
+        return passage, proprietaire
+
+
+def _empreinte(contenu: str) -> str:
+    """Empreinte d'un code, pour retrouver son passage de Ruff"""
+    return hashlib.sha256(contenu.encode('utf-8', errors='surrogatepass')).hexdigest()
+
+
+MOTEURS = {
+    MoteurFlake8Bandit.nom: MoteurFlake8Bandit,
+    MoteurRuff.nom: MoteurRuff,
+}
+
+
+def creer_moteur(config: Dict[str, Any], nom: str = None) -> MoteurLint:
+    """
+    Moteur demandé (par défaut LINT_MOTEUR)
+    
+    Si ce moteur n'est pas installé, Flake8/Bandit prend le relais.
+    """
+    nom = nom or config.get('LINT_MOTEUR', 'flake8')
+    if nom not in MOTEURS:
+        raise ValueError(f"Moteur de lint inconnu: {nom} (choix: {', '.join(MOTEURS)})")
+    
+    moteur = MOTEURS[nom](config)
+    if not (moteur.flake8_disponible or moteur.bandit_disponible) and nom != MoteurFlake8Bandit.nom:
+        print(f"⚠️ Moteur de lint '{nom}' indisponible, utilisation de Flake8/Bandit")
+        moteur = MoteurFlake8Bandit(config)
+    
+    return moteur
+
+
+# ===== Lots =====
+
+def index_fichier(chemin: str) -> int:
+    """Index dans le lot d'un fichier NNNNN.py"""
+    return int(os.path.splitext(os.path.basename(chemin))[0])
\ No newline at end of file
@@ -0,0 +1,407 @@
+"""
+Parseur DAX
+===========
+Lexeur et arbre d'expression pour les mesures DAX (Power BI).
+
+Un export de modèle est découpé en mesures (`Nom = ...`, `Nom := ...`,
+`Table[Nom] := ...`, `MEASURE Table[Nom] = ...`). Chaque mesure est
+tokenisée et parsée une seule fois: l'arbre est gardé en cache, indexé par
+l'empreinte du texte de la mesure. Réanalyser un modèle où peu de mesures
+ont changé ne parse que celles-là.
+"""
+
+import re
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from .cache_lru import CacheLRU, empreinte
+
+
+# ===== Lexeur =====
+
+# Types de jetons
+MOT = 'mot'
+TABLE = 'table'
+COLONNE = 'colonne'
+CHAINE = 'chaine'
+NOMBRE = 'nombre'
+OPERATEUR = 'operateur'
+COMMENTAIRE = 'commentaire'
+SYMBOLE = 'symbole'
+
+_REGEX_JETON = re.compile(r"""
+    (?P<espace>\s+)
+  | (?P<commentaire>//[^\n]*|--[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<chaine>"[^"]*(?:""[^"]*)*(?:"|\Z))
+  | (?P<table>'[^']*(?:''[^']*)*(?:'|\Z))
+  | (?P<colonne>\[[^\]]*(?:\]\][^\]]*)*(?:\]|\Z))
+  | (?P<nombre>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+)
+  | (?P<mot>[^\W\d][\w.]*)
+  | (?P<operateur>:=|&&|\|\||<=|>=|<>|==|[-+*/^&=<>])
+  | (?P<symbole>.)
+""", re.VERBOSE | re.DOTALL)
+
+
+_REGEX_COMMENTAIRE = re.compile(r'//|--|/\*')
+
+
+class Jeton(NamedTuple):
+    """Un jeton DAX (position relative au texte tokenisé)"""
+    type: str
+    valeur: str
+    position: int
+
+
+def tokeniser(texte: str, debut: int = 0) -> Iterator[Jeton]:
+    """Génère les jetons d'un texte DAX à partir de `debut` (sans les espaces), en temps linéaire"""
+    for match in _REGEX_JETON.finditer(texte, debut):
+        if match.lastgroup != 'espace':
+            yield Jeton(match.lastgroup, match.group(), match.start())
+
+
+# ===== Arbre d'expression =====
+
+class Noeud(NamedTuple):
+    """
+    Un nœud de l'arbre d'expression (immuable: partagé par le cache)
+    
+    - type: 'appel', 'operateur', 'unaire', 'var', 'colonne', 'table',
+      'definition', 'reference', 'identifiant', 'nombre', 'chaine', 'liste',
+      'sequence' ou 'erreur'
+    - valeur: nom de la fonction, opérateur, ou texte du jeton
+    - enfants: arguments, opérandes, ou (définitions..., retour) pour 'var'
+    - position: décalage dans le texte de la mesure
+    """
+    type: str
+    valeur: str
+    enfants: Tuple['Noeud', ...]
+    position: int
+    
+    def parcourir(self) -> Iterator['Noeud']:
+        """Ce nœud et tous ses descendants (profondeur d'abord)"""
+        pile = [self]
+        while pile:
+            noeud = pile.pop()
+            yield noeud
+            pile.extend(reversed(noeud.enfants))
+
+
+# Puissance de liaison des opérateurs binaires (du moins au plus prioritaire)
+PRIORITES = {
+    '||': 1,
+    '&&': 2,
+    'IN': 3,
+    '=': 4, '==': 4, '<>': 4, '<': 4, '>': 4, '<=': 4, '>=': 4,
+    '&': 5,
+    '+': 6, '-': 6,
+    '*': 7, '/': 7,
+    '^': 8,
+}
+PRIORITE_NOT = 3
+PRIORITE_UNAIRE = 7
+
+
+class _Parseur:
+    """
+    Parseur à précédence d'opérateurs (Pratt)
+    
+    Ne lève jamais d'exception: un jeton inattendu devient un nœud 'erreur'
+    et le parseur avance, pour garder les appels de fonction qui suivent.
+    """
+    
+    def __init__(self, jetons: List[Jeton]):
+        self.jetons = jetons
+        self.index = 0
+    
+    def _courant(self) -> Optional[Jeton]:
+        return self.jetons[self.index] if self.index < len(self.jetons) else None
+    
+    def _avancer(self) -> Jeton:
+        jeton = self.jetons[self.index]
+        self.index += 1
+        return jeton
+    
+    def _est(self, valeur: str) -> bool:
+        jeton = self._courant()
+        return jeton is not None and jeton.type in (SYMBOLE, OPERATEUR, MOT) and jeton.valeur.upper() == valeur
+    
+    def parser(self) -> Noeud:
+        """Toute la mesure (plusieurs expressions si le texte est mal formé)"""
+        expressions = []
+        while self._courant() is not None:
+            debut = self.index
+            expressions.append(self._expression(0))
+            if self.index == debut:
+                jeton = self._avancer()
+                expressions.append(Noeud('erreur', jeton.valeur, (), jeton.position))
+        
+        if len(expressions) == 1:
+            return expressions[0]
+        return Noeud('sequence', '', tuple(expressions), expressions[0].position if expressions else 0)
+    
+    def _operateur_binaire(self) -> Optional[str]:
+        jeton = self._courant()
+        if jeton is None:
+            return None
+        if jeton.type == OPERATEUR and jeton.valeur in PRIORITES:
+            return jeton.valeur
+        if jeton.type == MOT and jeton.valeur.upper() == 'IN':
+            return 'IN'
+        return None
+    
+    def _expression(self, priorite_min: int) -> Noeud:
+        gauche = self._primaire()
+        
+        while True:
+            operateur = self._operateur_binaire()
+            if operateur is None or PRIORITES[operateur] <= priorite_min:
+                return gauche
+            
+            jeton = self._avancer()
+            # ^ est associatif à droite, les autres à gauche
+            priorite = PRIORITES[operateur] - (1 if operateur == '^' else 0)
+            droite = self._expression(priorite)
+            gauche = Noeud('operateur', operateur, (gauche, droite), jeton.position)
+    
+    def _primaire(self) -> Noeud:
+        jeton = self._courant()
+        if jeton is None:
+            return Noeud('erreur', '', (), self.jetons[-1].position if self.jetons else 0)
+        
+        if jeton.type in (NOMBRE, CHAINE):
+            self._avancer()
+            return Noeud(jeton.type, jeton.valeur, (), jeton.position)
+        
+        if jeton.type == OPERATEUR and jeton.valeur in ('-', '+'):
+            self._avancer()
+            operande = self._expression(PRIORITE_UNAIRE)
+            return Noeud('unaire', jeton.valeur, (operande,), jeton.position)
+        
+        if jeton.type == SYMBOLE and jeton.valeur == '(':
+            self._avancer()
+            expression = self._expression(0)
+            if self._est(')'):
+                self._avancer()
+            return expression
+        
+        if jeton.type == SYMBOLE and jeton.valeur == '{':
+            self._avancer()
+            elements = self._arguments('}')
+            return Noeud('liste', '{}', elements, jeton.position)
+        
+        if jeton.type == COLONNE:
+            self._avancer()
+            return Noeud('reference', jeton.valeur, (), jeton.position)
+        
+        if jeton.type in (TABLE, MOT):
+            return self._nom()
+        
+        return Noeud('erreur', jeton.valeur, (), jeton.position)
+    
+    def _nom(self) -> Noeud:
+        """Appel de fonction, VAR ... RETURN, NOT, table, Table[Colonne] ou identifiant"""
+        jeton = self._avancer()
+        suivant = self._courant()
+        
+        if jeton.type == MOT:
+            nom = jeton.valeur.upper()
+            
+            if suivant is not None and suivant.type == SYMBOLE and suivant.valeur == '(':
+                self._avancer()
+                return Noeud('appel', nom, self._arguments(')'), jeton.position)
+            
+            if nom == 'VAR':
+                return self._var(jeton)
+            
+            if nom == 'NOT':
+                operande = self._expression(PRIORITE_NOT)
+                return Noeud('unaire', 'NOT', (operande,), jeton.position)
+        
+        if suivant is not None and suivant.type == COLONNE:
+            self._avancer()
+            table = Noeud('table', jeton.valeur, (), jeton.position)
+            return Noeud('colonne', suivant.valeur, (table,), jeton.position)
+        
+        return Noeud('table' if jeton.type == TABLE else 'identifiant', jeton.valeur, (), jeton.position)
+    
+    def _arguments(self, fermante: str) -> Tuple[Noeud, ...]:
+        """Arguments séparés par des virgules, jusqu'à la parenthèse (ou accolade) fermante"""
+        arguments = []
+        
+        while self._courant() is not None:
+            if self._est(fermante):
+                self._avancer()
+                break
+            if self._est(','):
+                self._avancer()
+                continue
+            
+            debut = self.index
+            arguments.append(self._expression(0))
+            if self.index == debut:
+                # Jeton inattendu (ex: parenthèse fermante en trop): on le saute
+                jeton = self._avancer()
+                arguments.append(Noeud('erreur', jeton.valeur, (), jeton.position))
+        
+        return tuple(arguments)
+    
+    def _var(self, jeton_var: Jeton) -> Noeud:
+        """VAR a = ... VAR b = ... RETURN ... (le dernier enfant est le retour)"""
+        definitions = []
+        jeton = jeton_var
+        
+        while True:
+            nom = self._avancer() if self._courant() is not None else jeton
+            if self._est('='):
+                self._avancer()
+            valeur = self._expression(0)
+            definitions.append(Noeud('definition', nom.valeur, (valeur,), jeton.position))
+            
+            if self._est('VAR'):
+                jeton = self._avancer()
+                continue
+            break
+        
+        if self._est('RETURN'):
+            self._avancer()
+            definitions.append(self._expression(0))
+        
+        return Noeud('var', 'VAR', tuple(definitions), jeton_var.position)
+
+
+class ArbreMesure(NamedTuple):
+    """Résultat (en cache) du parsing d'une mesure"""
+    arbre: Noeud
+    commentaires: Tuple[int, ...]
+
+
+def parser_expression(texte: str, debut: int = 0) -> ArbreMesure:
+    """
+    Tokenise et parse une expression DAX (à partir de la position `debut`)
+    
+    Avant `debut` (commentaires et en-tête de la mesure), seuls les
+    commentaires sont relevés.
+    """
+    commentaires = [match.start() for match in _REGEX_COMMENTAIRE.finditer(texte, 0, debut)]
+    jetons = []
+    for jeton in tokeniser(texte, debut):
+        if jeton.type == COMMENTAIRE:
+            commentaires.append(jeton.position)
+        else:
+            jetons.append(jeton)
+    
+    try:
+        arbre = _Parseur(jetons).parser()
+    except RecursionError:
+        # Imbrication pathologique: on garde les commentaires, sans arbre
+        arbre = Noeud('erreur', '', (), debut)
+    
+    return ArbreMesure(arbre, tuple(commentaires))
+
+
+# ===== Découpage d'un modèle en mesures =====
+
+# En-tête d'une mesure en début de ligne, hors parenthèses, chaînes et commentaires
+_REGEX_DECOUPE = re.compile(r"""
+    (?P<entete>^(?:MEASURE[ \t]+)?(?!(?:VAR|RETURN|DEFINE|EVALUATE)\b)
+        (?P<nom>(?:'[^'\n]*'|[^\W\d][\w.]*)?\[[^\]\n]*\]|[^\W\d][^\n=:()\[\]"{},<>&|+*/^]*?)
+        [ \t]*:?=(?!=))
+  | //[^\n]*|--[^\n]*|/\*.*?(?:\*/|\Z)
+  | "[^"]*(?:""[^"]*)*(?:"|\Z)
+  | '[^']*(?:''[^']*)*(?:'|\Z)
+  | \[[^\]]*(?:\]\][^\]]*)*(?:\]|\Z)
+  | (?P<ouvrante>[({])
+  | (?P<fermante>[)}])
+""", re.VERBOSE | re.DOTALL | re.MULTILINE | re.IGNORECASE)
+
+_REGEX_COMMENTAIRES_SEULS = re.compile(r'(?:\s+|//[^\n]*|--[^\n]*|/\*.*?\*/)*', re.DOTALL)
+
+
+class Mesure(NamedTuple):
+    """
+    Une mesure d'un modèle
+    
+    - nom: nom de la mesure (None si le code est une expression seule)
+    - texte: commentaires qui la précèdent, en-tête et expression
+    - position, ligne: début du texte dans le modèle (ligne 1-based)
+    - debut_expression: position de l'expression dans `texte`
+    """
+    nom: Optional[str]
+    texte: str
+    position: int
+    ligne: int
+    debut_expression: int
+
+
+def decouper_mesures(contenu: str) -> List[Mesure]:
+    """
+    Découpe un modèle en mesures
+    
+    Une mesure commence à un en-tête `Nom =` en début de ligne, hors de
+    toute parenthèse. Les lignes de commentaire juste au-dessus de
+    l'en-tête font partie de la mesure. Sans en-tête, tout le code est une
+    seule expression.
+    """
+    entetes = []
+    profondeur = 0
+    
+    for match in _REGEX_DECOUPE.finditer(contenu):
+        if match.lastgroup == 'ouvrante':
+            profondeur += 1
+        elif match.lastgroup == 'fermante':
+            profondeur = max(0, profondeur - 1)
+        elif match.group('entete') is not None and profondeur == 0:
+            entetes.append((match.start(), match.end(), match.group('nom').strip()))
+    
+    if not entetes:
+        return [Mesure(None, contenu, 0, 1, 0)] if contenu.strip() else []
+    
+    debuts = [_remonter_commentaires(contenu, debut) for debut, _, _ in entetes]
+    fins = debuts[1:] + [len(contenu)]
+    
+    mesures = []
+    ligne = 1
+    position_ligne = 0
+    
+    # Code avant la première mesure (autre chose que des commentaires)
+    if not _REGEX_COMMENTAIRES_SEULS.fullmatch(contenu, 0, debuts[0]):
+        mesures.append(Mesure(None, contenu[:debuts[0]], 0, 1, 0))
+    
+    for (debut_entete, fin_entete, nom), debut, fin in zip(entetes, debuts, fins):
+        ligne += contenu.count('\n', position_ligne, debut)
+        position_ligne = debut
+        mesures.append(Mesure(nom, contenu[debut:fin], debut, ligne, fin_entete - debut))
+    
+    return mesures
+
+
+def _remonter_commentaires(contenu: str, debut: int) -> int:
+    """Début des lignes de commentaire // ou -- collées au-dessus de `debut`"""
+    while debut > 0:
+        debut_precedente = contenu.rfind('\n', 0, debut - 1) + 1
+        ligne = contenu[debut_precedente:debut].strip()
+        if not (ligne.startswith('//') or ligne.startswith('--')):
+            break
+        debut = debut_precedente
+    return debut
+
+
+# ===== Cache des arbres =====
+
+_cache_arbres = CacheLRU('DAX_CACHE_MESURES', 20000)
+
+
+def arbre_mesure(mesure: Mesure) -> ArbreMesure:
+    """
+    Arbre d'une mesure, parsé une seule fois par texte de mesure
+    
+    La clé est l'empreinte du texte: les positions de l'arbre sont relatives
+    à la mesure, la même mesure déplacée dans le modèle reste en cache.
+    """
+    cle = empreinte(mesure.texte)
+    resultat = _cache_arbres.lire(cle)
+    
+    if resultat is None:
+        resultat = parser_expression(mesure.texte, mesure.debut_expression)
+        _cache_arbres.ecrire(cle, resultat)
+    
+    return resultat
\ No newline at end of file
@@ -0,0 +1,331 @@
+"""
+Parseur Power Query (M)
+=======================
+Lexeur M et graphe des étapes d'une expression `let ... in`.
+
+Une requête est découpée en étapes (`Nom = expression` séparées par des
+virgules au premier niveau du let). Chaque étape est tokenisée une seule
+fois par texte d'étape (cache), ce qui donne ses références aux autres
+étapes. La clé d'une étape combine son texte et les clés des étapes dont
+elle dépend: modifier une étape change sa clé et celles de ses dépendantes,
+et seulement celles-là.
+"""
+
+import re
+from typing import Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Tuple
+
+from .cache_lru import CacheLRU, empreinte
+from .index_lignes import avancer
+
+
+# ===== Lexeur =====
+
+# Types de jetons
+MOT = 'mot'
+IDENTIFIANT = 'identifiant'
+CHAINE = 'chaine'
+NOMBRE = 'nombre'
+OPERATEUR = 'operateur'
+COMMENTAIRE = 'commentaire'
+SYMBOLE = 'symbole'
+
+MOTS_CLES = {
+    'and', 'as', 'each', 'else', 'error', 'false', 'if', 'in', 'is', 'let',
+    'meta', 'not', 'null', 'or', 'otherwise', 'section', 'shared', 'then',
+    'true', 'try', 'type',
+}
+
+_REGEX_JETON = re.compile(r"""
+    (?P<espace>\s+)
+  | (?P<commentaire>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<chaine>"[^"]*(?:""[^"]*)*(?:"|\Z))
+  | (?P<identifiant>\#"[^"]*(?:""[^"]*)*(?:"|\Z))
+  | (?P<nombre>0[xX][0-9A-Fa-f]+|\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+)
+  | (?P<mot>\#?[^\W\d][\w.]*)
+  | (?P<operateur>=>|<=|>=|<>|\.\.\.|\.\.|\?\?|[-+*/&=<>?@!])
+  | (?P<symbole>.)
+""", re.VERBOSE | re.DOTALL)
+
+
+class Jeton(NamedTuple):
+    """Un jeton M (position relative au texte tokenisé)"""
+    type: str
+    valeur: str
+    position: int
+    
+    @property
+    def nom(self) -> str:
+        """Nom désigné par un mot ou un #"identifiant" (sans délimiteurs)"""
+        if self.type == IDENTIFIANT:
+            return self.valeur[2:-1].replace('""', '"')
+        return self.valeur
+
+
+def tokeniser(texte: str, debut: int = 0) -> Iterator[Jeton]:
+    """Génère les jetons d'un texte M à partir de `debut` (sans les espaces), en temps linéaire"""
+    for match in _REGEX_JETON.finditer(texte, debut):
+        if match.lastgroup != 'espace':
+            yield Jeton(match.lastgroup, match.group(), match.start())
+
+
+# ===== Découpage en étapes =====
+
+# Ce qui structure un let ... in (les chaînes et commentaires sont sautés)
+_REGEX_DECOUPE = re.compile(r"""
+    //[^\n]*|/\*.*?(?:\*/|\Z)
+  | \#?"[^"]*(?:""[^"]*)*(?:"|\Z)
+  | (?P<let>(?<![\w.\#])let(?![\w.]))
+  | (?P<in>(?<![\w.\#])in(?![\w.]))
+  | (?P<ouvrante>[(\[{])
+  | (?P<fermante>[)\]}])
+  | (?P<virgule>,)
+""", re.VERBOSE | re.DOTALL)
+
+# Nom d'une étape, après d'éventuels espaces et commentaires
+_REGEX_NOM = re.compile(
+    r'(?:\s+|//[^\n]*|/\*.*?\*/)*(?P<nom>\#"[^"]*(?:""[^"]*)*"|[^\W\d][\w.]*)\s*=(?!>)',
+    re.DOTALL
+)
+
+
+class Etape(NamedTuple):
+    """
+    Une étape d'une requête M
+    
+    - nom: nom de l'étape (None pour le code hors étapes: avant le let,
+      résultat après le in, ou requête sans let)
+    - texte: texte de l'étape, sans la virgule qui la termine
+    - position, ligne, colonne: début du texte dans la requête (1-based)
+    - debut_expression: position de l'expression dans `texte`
+    """
+    nom: Optional[str]
+    texte: str
+    position: int
+    ligne: int
+    debut_expression: int
+    colonne: int = 1
+
+
+class Requete(NamedTuple):
+    """Une requête M découpée: ses étapes et la présence d'un let ... in"""
+    etapes: List[Etape]
+    let_in: bool
+
+
+# Avancement du découpage
+_AVANT_LET = 0
+_DANS_LET = 1
+_APRES_IN = 2
+
+
+class DecoupeurRequete:
+    """
+    Découpe une requête M lue par morceaux
+    
+    Chaque étape est générée dès que la virgule qui la termine est lue:
+    seul le texte de l'étape en cours reste en mémoire. Une étape plus
+    longue que `taille_max` est coupée après son dernier jeton complet (les
+    règles sont alors évaluées sur chaque partie).
+    
+    Seul le premier let de premier niveau est découpé: un let imbriqué dans
+    une étape fait partie de cette étape.
+    """
+    
+    def __init__(self, taille_max: Optional[int] = None):
+        self.taille_max = taille_max
+        self.tampon = ''
+        self.position = 0           # Position de tampon[0] dans la requête
+        self.debut = 0              # Début de la partie en cours, dans le tampon
+        self.ligne = self.colonne = 1   # Emplacement de ce début
+        self.analyse = 0            # Découpage fait jusqu'ici, dans le tampon
+        self.fin_jeton = 0          # Fin du dernier jeton sûr, dans le tampon
+        self.etat = _AVANT_LET
+        self.profondeur = 0
+        self.lets_imbriques = 0
+    
+    @property
+    def let_in(self) -> bool:
+        """Vrai si la structure let ... in a été lue"""
+        return self.etat == _APRES_IN
+    
+    def ajouter(self, morceau: str, final: bool = False) -> Iterator[Etape]:
+        """Ajoute la suite de la requête et génère les étapes complètes (toutes si `final`)"""
+        if self.debut:
+            self.position += self.debut
+            self.analyse -= self.debut
+            self.fin_jeton = max(0, self.fin_jeton - self.debut)
+            self.tampon = self.tampon[self.debut:]
+            self.debut = 0
+        self.tampon += morceau
+        
+        tampon = self.tampon
+        if self.etat != _APRES_IN:
+            for match in _REGEX_DECOUPE.finditer(tampon, self.analyse):
+                fin = match.end()
+                if not final and fin == len(tampon):
+                    break
+                self.analyse = self.fin_jeton = fin
+                
+                groupe = match.lastgroup
+                if groupe is not None:
+                    est_etape = self._lire(groupe)
+                    if est_etape is not None:
+                        yield from self._emettre(match.start(), est_etape, fin)
+                        if self.etat == _APRES_IN:
+                            break
+        
+        if final:
+            yield from self._emettre(len(self.tampon), self.etat == _DANS_LET, len(self.tampon))
+        elif self.taille_max and len(self.tampon) - self.debut > self.taille_max and self.fin_jeton > self.debut:
+            yield from self._emettre(self.fin_jeton, False, self.fin_jeton)
+    
+    def _lire(self, groupe: str) -> Optional[bool]:
+        """
+        Un élément de structure (let, in, parenthèse, virgule)
+        
+        Returns:
+            None si la partie en cours continue, sinon si elle était une étape
+        """
+        if groupe == 'ouvrante':
+            self.profondeur += 1
+        elif groupe == 'fermante':
+            self.profondeur = max(0, self.profondeur - 1)
+        elif self.profondeur > 0:
+            return None
+        elif self.etat == _AVANT_LET:
+            if groupe == 'let':
+                # Code avant le let
+                self.etat = _DANS_LET
+                return False
+        elif groupe == 'let':
+            self.lets_imbriques += 1
+        elif groupe == 'in':
+            if self.lets_imbriques:
+                self.lets_imbriques -= 1
+            else:
+                # Dernière étape, puis résultat après le in
+                self.etat = _APRES_IN
+                return True
+        elif groupe == 'virgule' and not self.lets_imbriques:
+            return True
+        return None
+    
+    def _emettre(self, fin: int, est_etape: bool, suite: int) -> Iterator[Etape]:
+        """Génère la partie en cours (jusqu'à `fin`), la suivante commence à `suite`"""
+        texte = self.tampon[self.debut:fin]
+        if texte.strip():
+            debut = self.debut + len(texte) - len(texte.lstrip())
+            ligne, colonne = avancer(self.tampon, self.debut, debut, self.ligne, self.colonne)
+            etape = _etape(self.tampon, debut, fin, ligne, est_etape)
+            yield etape._replace(position=self.position + debut, colonne=colonne)
+        
+        self.ligne, self.colonne = avancer(self.tampon, self.debut, suite, self.ligne, self.colonne)
+        self.debut = suite
+
+
+def decouper_requete(contenu: str) -> Requete:
+    """Découpe une requête entière en étapes"""
+    decoupeur = DecoupeurRequete()
+    etapes = list(decoupeur.ajouter(contenu, final=True))
+    return Requete(etapes, decoupeur.let_in)
+
+
+def _etape(contenu: str, debut: int, fin: int, ligne: int, est_etape: bool) -> Etape:
+    """Construit une étape (nommée si elle commence par `Nom =`)"""
+    if est_etape:
+        match = _REGEX_NOM.match(contenu, debut, fin)
+        if match:
+            nom = match.group('nom')
+            if nom.startswith('#'):
+                nom = nom[2:-1].replace('""', '"')
+            return Etape(nom, contenu[debut:fin], debut, ligne, match.end() - debut)
+    
+    return Etape(None, contenu[debut:fin], debut, ligne, 0)
+
+
+# ===== Analyse d'une étape (en cache par texte) =====
+
+# Chemin de fichier local codé en dur dans une chaîne (C:\, D:\, /Users/...)
+_REGEX_CHEMIN = re.compile(r'[A-Za-z]:\\|/Users/')
+
+
+class AnalyseEtape(NamedTuple):
+    """
+    Ce que les règles et le graphe lisent d'une étape (positions relatives)
+    
+    - references: noms utilisés dans l'expression (candidats à être des étapes)
+    - chemins: positions des chaînes contenant un chemin codé en dur
+    """
+    references: FrozenSet[str]
+    chemins: Tuple[int, ...]
+
+
+_cache_etapes = CacheLRU('M_CACHE_ETAPES', 20000)
+
+
+def analyser_etape(etape: Etape) -> AnalyseEtape:
+    """Tokenise une étape, une seule fois par texte d'étape"""
+    cle = empreinte(etape.texte, str(etape.debut_expression))
+    resultat = _cache_etapes.lire(cle)
+    
+    if resultat is None:
+        references = set()
+        chemins = []
+        for jeton in tokeniser(etape.texte, etape.debut_expression):
+            if jeton.type == IDENTIFIANT or (jeton.type == MOT and jeton.valeur not in MOTS_CLES):
+                references.add(jeton.nom)
+            elif jeton.type == CHAINE and _REGEX_CHEMIN.search(jeton.valeur):
+                chemins.append(jeton.position)
+        
+        resultat = AnalyseEtape(frozenset(references), tuple(chemins))
+        _cache_etapes.ecrire(cle, resultat)
+    
+    return resultat
+
+
+# ===== Graphe des étapes =====
+
+def graphe_etapes(etapes: List[Etape], analyses: List[AnalyseEtape]) -> Dict[int, List[int]]:
+    """
+    Dépendances entre étapes: index d'une étape -> index des étapes qu'elle référence
+    
+    Le code hors étapes (résultat après le in) dépend aussi des étapes qu'il cite.
+    """
+    index_par_nom = {etape.nom: i for i, etape in enumerate(etapes) if etape.nom is not None}
+    
+    return {
+        i: sorted(index_par_nom[nom] for nom in analyse.references if nom in index_par_nom and index_par_nom[nom] != i)
+        for i, analyse in enumerate(analyses)
+    }
+
+
+def cles_etapes(etapes: List[Etape], graphe: Dict[int, List[int]]) -> List[bytes]:
+    """
+    Clé de chaque étape: son texte et les clés des étapes dont elle dépend
+    
+    Parcours itératif (une requête peut enchaîner des milliers d'étapes).
+    Une référence circulaire (invalide en M) ne compte que par le texte.
+    """
+    cles: List[Optional[bytes]] = [None] * len(etapes)
+    en_cours = set()
+    
+    for racine in range(len(etapes)):
+        pile = [racine]
+        while pile:
+            i = pile[-1]
+            if cles[i] is not None:
+                pile.pop()
+                continue
+            
+            en_attente = [d for d in graphe[i] if cles[d] is None and d not in en_cours]
+            if en_attente and i not in en_cours:
+                en_cours.add(i)
+                pile.extend(en_attente)
+                continue
+            
+            pile.pop()
+            en_cours.discard(i)
+            dependances = [cles[d].hex() for d in graphe[i] if cles[d] is not None]
+            cles[i] = empreinte(etapes[i].nom or '', etapes[i].texte, *dependances)
+    
+    return cles
\ No newline at end of file
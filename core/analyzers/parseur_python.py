@@ -0,0 +1,90 @@
+"""
+Parseur Python
+==============
+Arbre syntaxique (module ast) d'un code Python, parsé une seule fois.
+
+L'arbre est en cache par empreinte du code: les règles complémentaires et
+tout autre consommateur du même processus le relisent au lieu de reparser.
+Les arbres en cache sont partagés entre threads: ils ne doivent pas être
+modifiés.
+
+Les visiteurs des règles sont tous appelés pendant un seul parcours de
+l'arbre, selon le type de chaque nœud (ast.Call, ast.ImportFrom...).
+"""
+
+import ast
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .cache_lru import CacheLRU, empreinte
+
+
+# Visiteur: fonction (nœud, dans_try) -> noms des occurrences relevées sur ce nœud
+Visiteur = Callable[[ast.AST, bool], Iterable[str]]
+
+# Blocs dont le corps est protégé par leurs except
+_TRY = (ast.Try, ast.TryStar) if hasattr(ast, 'TryStar') else (ast.Try,)
+
+# Corps exécutés plus tard, hors du try qui les entoure
+_FONCTIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)
+
+# Un arbre pèse ~35 fois le code source: peu d'entrées suffisent
+_cache_arbres = CacheLRU('PYTHON_CACHE_ARBRES', 32)
+
+
+def arbre_python(contenu: str) -> Optional[ast.Module]:
+    """
+    Arbre d'un code Python, en cache par contenu
+    
+    Returns:
+        L'arbre, ou None si le code n'est pas du Python valide (Flake8 le
+        signale déjà par E999). L'échec est aussi mis en cache.
+    """
+    cle = empreinte(contenu)
+    arbre = _cache_arbres.lire(cle)
+    
+    if arbre is None:
+        try:
+            arbre = ast.parse(contenu)
+        except (SyntaxError, ValueError, RecursionError, MemoryError):
+            arbre = False
+        _cache_arbres.ecrire(cle, arbre)
+    
+    return arbre or None
+
+
+def parcourir(arbre: ast.AST, visiteurs: Dict[type, List[Visiteur]]) -> Iterator[Tuple[str, ast.AST]]:
+    """
+    Un seul parcours de l'arbre, en profondeur et dans l'ordre du code
+    
+    Chaque nœud est passé aux visiteurs de son type, avec `dans_try`: vrai
+    si le nœud est dans le corps d'un try qui a des except (le corps d'une
+    fonction définie dans ce try n'est pas protégé: il s'exécute plus tard).
+    Parcours itératif: un code très imbriqué ne dépasse pas la pile.
+    
+    Yields:
+        Tuples (nom de l'occurrence, nœud)
+    """
+    pile = [(arbre, False)]
+    
+    while pile:
+        noeud, dans_try = pile.pop()
+        
+        for visiteur in visiteurs.get(type(noeud), ()):
+            for nom in visiteur(noeud, dans_try):
+                yield nom, noeud
+        
+        protege = isinstance(noeud, _TRY) and bool(noeud.handlers)
+        differe = isinstance(noeud, _FONCTIONS)
+        
+        enfants = []
+        for champ, valeur in ast.iter_fields(noeud):
+            if champ == 'body':
+                dans_try_enfant = (dans_try or protege) and not differe
+            else:
+                dans_try_enfant = dans_try
+            if isinstance(valeur, ast.AST):
+                enfants.append((valeur, dans_try_enfant))
+            elif isinstance(valeur, list):
+                enfants.extend((element, dans_try_enfant) for element in valeur if isinstance(element, ast.AST))
+        
+        pile.extend(reversed(enfants))
\ No newline at end of file
@@ -2,30 +2,43 @@
 Étudiant 2: Analyseur Python avec Flake8 et Bandit
 ==================================================
 Utilise les outils professionnels pour analyser le code Python.
+
+Les outils sont exécutés par un moteur (voir moteurs_lint.py): Flake8 et
+Bandit, ou Ruff qui couvre les mêmes règles en un seul passage. Le
+classement des problèmes (sévérité, suggestion) ne dépend pas du moteur.
 """
 
 import os
 import json
-import subprocess
-import tempfile
-import shutil
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 
 from django.conf import settings
 
+from .bac_a_sable import SurchargeLint
+from .espace_travail import EspaceTravail
+from .moteurs_lint import MoteurLint, creer_moteur
+from ..metriques import Metriques
+
 
 class AnalyseurPythonTools:
     """
-    Utilise Flake8 et Bandit pour analyser le code Python
+    Utilise Flake8 et Bandit (ou Ruff) pour analyser le code Python
     """
     
-    def __init__(self):
-        """Vérifie la disponibilité des outils"""
-        self.flake8_disponible = shutil.which('flake8') is not None
-        self.bandit_disponible = shutil.which('bandit') is not None
+    def __init__(self, moteur: str = None):
+        """
+        Vérifie la disponibilité des outils
         
+        Args:
+            moteur: 'flake8' ou 'ruff' (par défaut: LINT_MOTEUR)
+        """
         # Récupérer la configuration depuis settings.py
         self.config = settings.QUALITY_GATE_CONFIG
+        self.timeout = self.config.get('LINT_TIMEOUT', 30)
+        
+        self.moteur: MoteurLint = creer_moteur(self.config, moteur)
+        self.flake8_disponible = self.moteur.flake8_disponible
+        self.bandit_disponible = self.moteur.bandit_disponible
     
     def analyser(self, contenu: str) -> Tuple[List[Dict], List[Dict]]:
         """
@@ -37,90 +50,157 @@ class AnalyseurPythonTools:
         Returns:
             Tuple (problemes_flake8, problemes_bandit)
         """
-        problemes_flake8 = []
-        problemes_bandit = []
+        return self.analyser_flake8(contenu), self.analyser_bandit(contenu)
+    
+    def analyser_flake8(self, contenu: str) -> List[Dict[str, Any]]:
+        """
+        Analyse le code Python avec Flake8 uniquement
         
-        # Créer un fichier temporaire
-        fichier_temp = self._creer_fichier_temp(contenu)
+        Permet au service de lancer Flake8 et Bandit comme deux étapes
+        indépendantes (et en parallèle) sans exécuter chaque outil deux fois.
+        """
+        if not self.flake8_disponible:
+            return []
         
         try:
-            # Exécuter Flake8
-            if self.flake8_disponible:
-                problemes_flake8 = self._executer_flake8(fichier_temp)
-            
-            # Exécuter Bandit
-            if self.bandit_disponible:
-                problemes_bandit = self._executer_bandit(fichier_temp)
-        
-        finally:
-            # Toujours supprimer le fichier temporaire
-            self._supprimer_fichier_temp(fichier_temp)
+            return self._problemes_flake8(self.moteur.flake8(contenu, self.timeout))
+        except SurchargeLint:
+            return [self._probleme_surcharge('flake8')]
+        except Exception as e:
+            print(f"Erreur Flake8: {e}")
+            return []
+    
+    def analyser_bandit(self, contenu: str) -> List[Dict[str, Any]]:
+        """Analyse le code Python avec Bandit uniquement"""
+        if not self.bandit_disponible:
+            return []
         
-        return problemes_flake8, problemes_bandit
+        try:
+            return self._problemes_bandit(self.moteur.bandit(contenu, self.timeout))
+        except SurchargeLint:
+            return [self._probleme_surcharge('bandit')]
+        except json.JSONDecodeError:
+            return []
+        except Exception as e:
+            print(f"Erreur Bandit: {e}")
+            return []
     
-    def _creer_fichier_temp(self, contenu: str) -> str:
-        """Crée un fichier temporaire avec le code"""
-        fd, chemin = tempfile.mkstemp(suffix='.py', prefix='qg_')
+    async def analyser_flake8_async(self, contenu: str) -> List[Dict[str, Any]]:
+        """
+        Version asynchrone de analyser_flake8 (vues ASGI)
         
-        with os.fdopen(fd, 'w', encoding='utf-8') as f:
-            f.write(contenu)
+        Le sous-processus est lancé par asyncio, ou l'attente du travailleur
+        du pool se fait dans un thread: la boucle d'événements reste libre.
+        """
+        if not self.flake8_disponible:
+            return []
         
-        return chemin
+        try:
+            return self._problemes_flake8(await self.moteur.flake8_async(contenu, self.timeout))
+        except SurchargeLint:
+            return [self._probleme_surcharge('flake8')]
+        except Exception as e:
+            print(f"Erreur Flake8: {e}")
+            return []
     
-    def _supprimer_fichier_temp(self, chemin: str):
-        """Supprime le fichier temporaire"""
+    async def analyser_bandit_async(self, contenu: str) -> List[Dict[str, Any]]:
+        """Version asynchrone de analyser_bandit (vues ASGI)"""
+        if not self.bandit_disponible:
+            return []
+        
         try:
-            if os.path.exists(chemin):
-                os.remove(chemin)
-        except Exception:
-            pass
+            return self._problemes_bandit(await self.moteur.bandit_async(contenu, self.timeout))
+        except SurchargeLint:
+            return [self._probleme_surcharge('bandit')]
+        except json.JSONDecodeError:
+            return []
+        except Exception as e:
+            print(f"Erreur Bandit: {e}")
+            return []
     
-    def _executer_flake8(self, chemin_fichier: str) -> List[Dict[str, Any]]:
+    def analyser_lot(
+        self,
+        contenus: List[str],
+        flake8: bool = True,
+        bandit: bool = True
+    ) -> List[Dict[str, List[Dict[str, Any]]]]:
         """
-        Exécute Flake8 et parse les résultats
+        Analyse plusieurs codes Python avec un seul lancement de chaque outil
+        
+        Les codes sont écrits dans un emplacement de l'espace de travail (en
+        mémoire si possible) que le moteur parcourt en une fois (Flake8 réparti sur --jobs processus, puis
+        Bandit; ou un seul passage de Ruff), et les sorties sont
+        redistribuées par fichier: le démarrage des outils n'est payé
+        qu'une fois par lot.
+        
+        Args:
+            contenus: Les codes Python à analyser
+            flake8, bandit: Outils à lancer
+        
+        Returns:
+            Une entrée par code, dans l'ordre: {'flake8': [...], 'bandit': [...]}
+            pour les outils lancés (les autres sont à exécuter fichier par fichier)
         """
+        resultats = [{} for _ in contenus]
+        outils = [
+            outil for outil, demande in (('flake8', flake8), ('bandit', bandit))
+            if demande and outil in self.moteur.outils_lot
+        ]
+        
+        if not contenus or not outils:
+            return resultats
+        
+        with EspaceTravail.get_instance(self.config).emplacement() as dossier:
+            try:
+                # Noms générés: pas de collision ni de chemin venant de l'utilisateur
+                for i, contenu in enumerate(contenus):
+                    with open(os.path.join(dossier, f'{i:05d}.py'), 'w', encoding='utf-8') as f:
+                        f.write(contenu)
+                
+                sorties = self.moteur.lot(dossier, len(contenus), outils, self._timeout_lot(len(contenus)))
+            except SurchargeLint:
+                # Refusé en bloc: relancer fichier par fichier ne ferait que surcharger davantage
+                for resultat in resultats:
+                    resultat.update({outil: [self._probleme_surcharge(outil)] for outil in outils})
+                return resultats
+            except Exception as e:
+                print(f"Erreur lint du lot: {e}")
+                return resultats
+        
+        convertir = {'flake8': self._problemes_flake8, 'bandit': self._problemes_bandit}
+        for outil, par_fichier in sorties.items():
+            for i, resultat in enumerate(resultats):
+                resultat[outil] = convertir[outil](None if par_fichier is None else par_fichier[i])
+        
+        return resultats
+    
+    def _timeout_lot(self, nb_fichiers: int) -> float:
+        """Temps max d'un outil sur un lot: LINT_TIMEOUT plus une marge par fichier"""
+        return self.timeout + self.config.get('LINT_LOT_TIMEOUT_FICHIER', 2) * nb_fichiers
+    
+    def _problemes_flake8(self, lignes: Optional[List[str]]) -> List[Dict[str, Any]]:
+        """Parse les lignes FORMAT_FLAKE8 d'un moteur (None: timeout)"""
+        if lignes is None:
+            return [self._probleme_timeout('flake8')]
+        
         problemes = []
+        for ligne in lignes:
+            probleme = self._parser_flake8(ligne)
+            if probleme:
+                problemes.append(probleme)
         
-        try:
-            # Construire la commande
-            max_length = self.config.get('FLAKE8_MAX_LINE_LENGTH', 120)
-            ignore = ','.join(self.config.get('FLAKE8_IGNORE', []))
-            
-            commande = [
-                'flake8',
-                f'--max-line-length={max_length}',
-                '--format=%(row)d:%(col)d:%(code)s:%(text)s',
-                chemin_fichier
-            ]
-            
-            if ignore:
-                commande.insert(2, f'--ignore={ignore}')
-            
-            # Exécuter
-            resultat = subprocess.run(
-                commande,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            # Parser la sortie
-            for ligne in resultat.stdout.strip().split('\n'):
-                if ligne:
-                    probleme = self._parser_flake8(ligne)
-                    if probleme:
-                        problemes.append(probleme)
+        return problemes
+    
+    def _problemes_bandit(self, issues: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Parse les issues Bandit d'un moteur (None: timeout)"""
+        if issues is None:
+            return [self._probleme_timeout('bandit')]
         
-        except subprocess.TimeoutExpired:
-            problemes.append({
-                'severite': 'warning',
-                'categorie': 'performance',
-                'source': 'flake8',
-                'message': 'Timeout Flake8 - code trop long ou complexe',
-                'code_erreur': 'TIMEOUT'
-            })
-        except Exception as e:
-            print(f"Erreur Flake8: {e}")
+        problemes = []
+        for issue in issues:
+            probleme = self._parser_bandit(issue)
+            if probleme:
+                problemes.append(probleme)
         
         return problemes
     
@@ -185,52 +265,6 @@ class AnalyseurPythonTools:
         }
         return suggestions.get(code, 'Consultez la documentation PEP8')
     
-    def _executer_bandit(self, chemin_fichier: str) -> List[Dict[str, Any]]:
-        """
-        Exécute Bandit et parse les résultats JSON
-        """
-        problemes = []
-        
-        try:
-            severity = self.config.get('BANDIT_SEVERITY', 'LOW').lower()
-            
-            commande = [
-                'bandit',
-                '-f', 'json',
-                f'--severity-level={severity}',
-                chemin_fichier
-            ]
-            
-            resultat = subprocess.run(
-                commande,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            if resultat.stdout:
-                data = json.loads(resultat.stdout)
-                
-                for issue in data.get('results', []):
-                    probleme = self._parser_bandit(issue)
-                    if probleme:
-                        problemes.append(probleme)
-        
-        except subprocess.TimeoutExpired:
-            problemes.append({
-                'severite': 'warning',
-                'categorie': 'securite',
-                'source': 'bandit',
-                'message': 'Timeout Bandit - code trop long',
-                'code_erreur': 'TIMEOUT'
-            })
-        except json.JSONDecodeError:
-            pass
-        except Exception as e:
-            print(f"Erreur Bandit: {e}")
-        
-        return problemes
-    
     def _parser_bandit(self, issue: dict) -> Dict[str, Any]:
         """Parse un résultat Bandit"""
         try:
@@ -271,6 +305,45 @@ class AnalyseurPythonTools:
         }
         return suggestions.get(code, 'Consultez la documentation Bandit')
     
+    def _probleme_timeout(self, outil: str) -> Dict[str, Any]:
+        """Problème signalé quand un outil dépasse LINT_TIMEOUT ou ses limites"""
+        Metriques.compter_timeout(outil)
+        
+        if outil == 'flake8':
+            return {
+                'severite': 'warning',
+                'categorie': 'performance',
+                'source': 'flake8',
+                'message': 'Timeout Flake8 - code trop long ou complexe',
+                'code_erreur': 'TIMEOUT'
+            }
+        
+        return {
+            'severite': 'warning',
+            'categorie': 'securite',
+            'source': 'bandit',
+            'message': 'Timeout Bandit - code trop long',
+            'code_erreur': 'TIMEOUT'
+        }
+    
+    def _probleme_surcharge(self, outil: str) -> Dict[str, Any]:
+        """
+        Problème signalé quand le bac à sable refuse de lancer un outil
+        
+        Même code que le timeout: le résultat n'est pas mis en cache et
+        l'analyse pourra être refaite une fois la charge retombée.
+        """
+        Metriques.compter_refus_lint(outil)
+        nom = 'Flake8' if outil == 'flake8' else 'Bandit'
+        
+        return {
+            'severite': 'warning',
+            'categorie': 'performance' if outil == 'flake8' else 'securite',
+            'source': outil,
+            'message': f'Serveur surchargé - {nom} non exécuté, réessayez plus tard',
+            'code_erreur': 'TIMEOUT'
+        }
+    
     def get_status(self) -> Dict[str, bool]:
         """Retourne le statut des outils"""
         return {
@@ -0,0 +1,698 @@
+"""
+Moteur de Règles Statiques
+==========================
+Registre des occurrences et des règles de AnalyseurStatique.
+
+Chaque langage a son moteur, qui parcourt le code une seule fois et relève
+les occurrences (avec leur position) que lisent ensuite les règles, au
+lieu que chacune recherche dans le texte.
+
+Le SQL passe par le lexeur (lexeur_sql.py): ses occurrences sont relevées
+sur les jetons, une seule tokenisation par analyse, et les règles SQL sont
+évaluées instruction par instruction. Le DAX est parsé en arbres
+d'expression (parseur_dax.py), mesure par mesure, et le Power Query en
+étapes d'un let ... in (parseur_m.py). Le Python est parsé une fois par
+ast (parseur_python.py): toutes les règles Python sont des visiteurs
+appelés pendant un seul parcours de l'arbre.
+"""
+
+import ast
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .lexeur_sql import CHAINE, IDENTIFIANT, MOT, NOMBRE, Jeton, decouper_au_fil, instructions
+from .cache_lru import CacheLRU
+from .index_lignes import IndexLignes
+from .parseur_dax import Noeud, arbre_mesure, decouper_mesures
+from .parseur_m import (
+    AnalyseEtape, DecoupeurRequete, Etape, analyser_etape, cles_etapes, decouper_requete, graphe_etapes
+)
+from .parseur_python import Visiteur, arbre_python, parcourir
+
+
+class Occurrences:
+    """
+    Positions de chaque occurrence relevée dans un code source
+    
+    Les positions sont des décalages dans le texte de `index`. Pour une
+    partie du code (une instruction SQL, une mesure DAX), `debut` et `fin`
+    délimitent cette partie.
+    """
+    
+    def __init__(self, index: IndexLignes, positions: Dict[str, List[int]], debut: int = 0, fin: Optional[int] = None):
+        self.index = index
+        self.positions = positions
+        self.debut = debut
+        self.fin = len(index.texte) if fin is None else fin
+    
+    def present(self, nom: str) -> bool:
+        return nom in self.positions
+    
+    def nombre(self, nom: str) -> int:
+        return len(self.positions.get(nom, []))
+    
+    def premiere(self, nom: str) -> Optional[int]:
+        """Position de la première occurrence (None si absente)"""
+        positions = self.positions.get(nom)
+        return positions[0] if positions else None
+    
+    def emplacement(self, nom: Optional[str] = None) -> Dict[str, int]:
+        """Ligne et colonne de la première occurrence (du début de la partie si `nom` est None)"""
+        position = self.debut if nom is None else self.premiere(nom)
+        ligne, colonne = self.index.ligne_colonne(position)
+        return {'ligne': ligne, 'colonne': colonne}
+    
+    def emplacements(self, nom: str) -> List[Dict[str, int]]:
+        """Ligne et colonne de la première occurrence de chaque ligne"""
+        emplacements = []
+        for position in self.positions.get(nom, []):
+            ligne, colonne = self.index.ligne_colonne(position)
+            if not emplacements or emplacements[-1]['ligne'] != ligne:
+                emplacements.append({'ligne': ligne, 'colonne': colonne})
+        return emplacements
+
+
+# ===== Registre =====
+
+# À incrémenter quand une règle change ses résultats (entre dans la clé du cache)
+VERSION_REGLES = 14
+
+# Règle: fonction (occurrences) -> liste de problèmes
+Regle = Callable[[Occurrences], List[Dict[str, Any]]]
+
+REGLES: Dict[str, List[Tuple[str, Regle]]] = {}
+
+
+def regle(outil: str, code: str):
+    """Décorateur: enregistre une règle pour un langage (dans l'ordre de déclaration)"""
+    def enregistrer(fonction: Regle) -> Regle:
+        REGLES.setdefault(outil, []).append((code, fonction))
+        return fonction
+    return enregistrer
+
+
+# ===== SQL =====
+
+DONNEES_SENSIBLES = ['PASSWORD', 'EMAIL', 'PHONE', 'SSN', 'CREDIT_CARD', 'SALAIRE']
+ANNEES = ['2023', '2024', '2025']
+
+# Mots-clés SQL relevés (nom de l'occurrence par mot-clé)
+MOTS_CLES_SQL = {
+    'SELECT': 'select',
+    'JOIN': 'join',
+    'ON': 'on',
+    'WHERE': 'where',
+    'AS': 'alias',
+    'LIMIT': 'limit',
+    'TOP': 'top',
+    'FETCH': 'fetch',
+    'GETDATE': 'getdate',
+}
+
+
+class MoteurJetonsSQL:
+    """
+    Occurrences SQL relevées sur les jetons du lexeur, instruction par instruction
+    
+    Les règles SQL gardent les mêmes noms d'occurrences que les autres
+    langages, mais un mot-clé n'est reconnu que comme mot entier, hors
+    commentaires et chaînes (ON ne correspond plus à CONDITION).
+    """
+    
+    def instructions(self, texte: str, ligne: int = 1, colonne: int = 1) -> Iterator[Occurrences]:
+        """Un seul parcours du texte: les occurrences de chaque instruction"""
+        index = IndexLignes(texte, ligne, colonne)
+        for jetons in instructions(texte, ligne=ligne):
+            fin = jetons[-1].position + len(jetons[-1].valeur)
+            yield Occurrences(index, self._relever(jetons), jetons[0].position, fin)
+    
+    def _relever(self, jetons: List[Jeton]) -> Dict[str, List[int]]:
+        """Positions des occurrences dans les jetons d'une instruction"""
+        positions: Dict[str, List[int]] = {}
+        
+        def relever(nom: str, position: int):
+            positions.setdefault(nom, []).append(position)
+        
+        precedent = None
+        for jeton in jetons:
+            type_jeton = jeton.type
+            
+            if type_jeton == MOT or type_jeton == IDENTIFIANT:
+                nom = jeton.nom
+                if type_jeton == MOT:
+                    if nom in MOTS_CLES_SQL:
+                        relever(MOTS_CLES_SQL[nom], jeton.position)
+                    elif nom.startswith('CURRENT'):
+                        relever('current', jeton.position)
+                for donnee in DONNEES_SENSIBLES:
+                    if donnee in nom:
+                        relever(f'sensible_{donnee.lower()}', jeton.position)
+            
+            elif type_jeton == NOMBRE:
+                if jeton.valeur in ANNEES:
+                    relever(f'annee_{jeton.valeur}', jeton.position)
+            
+            elif type_jeton == CHAINE:
+                for annee in ANNEES:
+                    if annee in jeton.valeur:
+                        relever(f'annee_{annee}', jeton.position)
+            
+            elif jeton.valeur == '*' and precedent is not None and precedent.mot_cle == 'SELECT':
+                # Position du SELECT: la ligne signalée est celle de la requête
+                relever('select_etoile', precedent.position)
+            
+            precedent = jeton
+        
+        return positions
+
+
+@regle('SQL', 'SQL001')
+def _sql_select_etoile(occ: Occurrences) -> List[Dict[str, Any]]:
+    """SELECT *"""
+    if not occ.present('select_etoile'):
+        return []
+    return [{
+        'severite': 'warning',
+        'categorie': 'performance',
+        'source': 'manuel',
+        'message': 'SELECT * détecté - charge toutes les colonnes inutilement',
+        'suggestion': 'Listez uniquement les colonnes nécessaires',
+        **occ.emplacement('select_etoile'),
+        'code_erreur': 'SQL001'
+    }]
+
+
+@regle('SQL', 'SQL002')
+def _sql_join_sans_on(occ: Occurrences) -> List[Dict[str, Any]]:
+    """JOIN sans ON"""
+    if not (occ.present('join') and not occ.present('on')):
+        return []
+    return [{
+        'severite': 'critique',
+        'categorie': 'qualite',
+        'source': 'manuel',
+        'message': 'JOIN sans clause ON - produit un produit cartésien',
+        'suggestion': 'Ajoutez une condition ON: JOIN table ON t1.id = t2.id',
+        **occ.emplacement('join'),
+        'code_erreur': 'SQL002'
+    }]
+
+
+@regle('SQL', 'SQL003')
+def _sql_donnees_sensibles(occ: Occurrences) -> List[Dict[str, Any]]:
+    """Données sensibles (la première de la liste trouvée)"""
+    for donnee in DONNEES_SENSIBLES:
+        if occ.present(f'sensible_{donnee.lower()}'):
+            return [{
+                'severite': 'critique',
+                'categorie': 'securite',
+                'source': 'manuel',
+                'message': f'Donnée sensible détectée: {donnee}',
+                'suggestion': 'Masquez avec HASH() ou excluez du dashboard',
+                **occ.emplacement(f'sensible_{donnee.lower()}'),
+                'code_erreur': 'SQL003'
+            }]
+    return []
+
+
+@regle('SQL', 'SQL004')
+def _sql_join_sans_where(occ: Occurrences) -> List[Dict[str, Any]]:
+    """JOIN sans WHERE"""
+    if not (occ.present('join') and not occ.present('where')):
+        return []
+    return [{
+        'severite': 'warning',
+        'categorie': 'performance',
+        'source': 'manuel',
+        'message': 'JOIN sans WHERE - risque de charger trop de données',
+        'suggestion': 'Ajoutez des filtres WHERE pour limiter les résultats',
+        **occ.emplacement('join'),
+        'code_erreur': 'SQL004'
+    }]
+
+
+@regle('SQL', 'SQL005')
+def _sql_sans_alias(occ: Occurrences) -> List[Dict[str, Any]]:
+    """Pas d'alias (AS)"""
+    if not (occ.present('select') and not occ.present('alias')):
+        return []
+    return [{
+        'severite': 'info',
+        'categorie': 'lisibilite',
+        'source': 'manuel',
+        'message': 'Aucun alias (AS) utilisé - code moins lisible',
+        'suggestion': 'Utilisez des alias: SELECT COUNT(*) AS total_ventes',
+        **occ.emplacement('select'),
+        'code_erreur': 'SQL005'
+    }]
+
+
+@regle('SQL', 'SQL006')
+def _sql_annee_en_dur(occ: Occurrences) -> List[Dict[str, Any]]:
+    """Année codée en dur (la première de la liste trouvée)"""
+    if occ.present('getdate') or occ.present('current'):
+        return []
+    for annee in ANNEES:
+        if occ.present(f'annee_{annee}'):
+            return [{
+                'severite': 'warning',
+                'categorie': 'qualite',
+                'source': 'manuel',
+                'message': f'Année {annee} codée en dur',
+                'suggestion': 'Utilisez GETDATE() ou CURRENT_DATE pour des dates dynamiques',
+                **occ.emplacement(f'annee_{annee}'),
+                'code_erreur': 'SQL006'
+            }]
+    return []
+
+
+@regle('SQL', 'SQL007')
+def _sql_sans_limite(occ: Occurrences) -> List[Dict[str, Any]]:
+    """SELECT sans LIMIT/TOP/FETCH ni WHERE"""
+    if not occ.present('select') or any(occ.present(nom) for nom in ('limit', 'top', 'fetch', 'where')):
+        return []
+    return [{
+        'severite': 'warning',
+        'categorie': 'performance',
+        'source': 'manuel',
+        'message': 'SELECT sans LIMIT ni WHERE - risque de surcharge',
+        'suggestion': 'Ajoutez LIMIT ou TOP pour limiter les résultats',
+        **occ.emplacement('select'),
+        'code_erreur': 'SQL007'
+    }]
+
+
+# ===== Python =====
+
+# Appels qui lisent un fichier (open(), pd.read_csv()...)
+LECTURES_PYTHON = {'open', 'read_csv', 'read_excel'}
+
+VISITEURS_PYTHON: Dict[type, List[Visiteur]] = {}
+
+
+def visiteur(*types: type):
+    """Décorateur: appelle la fonction sur chaque nœud de ces types, pendant le parcours de l'arbre"""
+    def enregistrer(fonction: Visiteur) -> Visiteur:
+        for type_noeud in types:
+            VISITEURS_PYTHON.setdefault(type_noeud, []).append(fonction)
+        return fonction
+    return enregistrer
+
+
+@visiteur(ast.ImportFrom)
+def _visiter_import(noeud: ast.ImportFrom, dans_try: bool) -> Iterator[str]:
+    if any(alias.name == '*' for alias in noeud.names):
+        yield 'import_etoile'
+
+
+@visiteur(ast.FunctionDef, ast.AsyncFunctionDef)
+def _visiter_fonction(noeud: ast.FunctionDef, dans_try: bool) -> Iterator[str]:
+    if ast.get_docstring(noeud, clean=False) is None:
+        yield 'sans_docstring'
+
+
+@visiteur(ast.Call)
+def _visiter_appel(noeud: ast.Call, dans_try: bool) -> Iterator[str]:
+    fonction = noeud.func
+    if isinstance(fonction, ast.Name):
+        nom = fonction.id
+        if nom == 'print':
+            yield 'print'
+    elif isinstance(fonction, ast.Attribute):
+        nom = fonction.attr
+    else:
+        return
+    
+    if nom in LECTURES_PYTHON and not dans_try:
+        yield 'lecture_sans_try'
+
+
+class MoteurArbrePython:
+    """
+    Occurrences Python relevées sur l'arbre du code (parseur_python)
+    
+    Un print() en commentaire ou dans une chaîne ne compte plus, et une
+    lecture de fichier n'est protégée que si elle est dans le corps d'un
+    try ... except (pas seulement quelque part dans le même fichier).
+    """
+    
+    def rechercher(self, texte: str) -> Optional[Occurrences]:
+        """Un seul parcours de l'arbre pour tous les visiteurs (None si le code n'est pas du Python valide)"""
+        arbre = arbre_python(texte)
+        if arbre is None:
+            return None
+        
+        index = IndexLignes(texte)
+        positions: Dict[str, List[int]] = {}
+        for nom, noeud in parcourir(arbre, VISITEURS_PYTHON):
+            positions.setdefault(nom, []).append(self._position(index, noeud))
+        
+        for valeurs in positions.values():
+            valeurs.sort()
+        return Occurrences(index, positions)
+    
+    def _position(self, index: IndexLignes, noeud: ast.AST) -> int:
+        """Position d'un nœud dans le texte (col_offset compte des octets UTF-8)"""
+        debut = index.debut_ligne(noeud.lineno)
+        ligne = index.texte_ligne(noeud.lineno)
+        if ligne.isascii():
+            return debut + noeud.col_offset
+        return debut + len(ligne.encode('utf-8')[:noeud.col_offset].decode('utf-8', 'ignore'))
+
+
+@regle('Python', 'PY001')
+def _py_import_etoile(occ: Occurrences) -> List[Dict[str, Any]]:
+    """from module import * (une fois par ligne)"""
+    return [
+        {
+            'severite': 'warning',
+            'categorie': 'lisibilite',
+            'source': 'manuel',
+            'message': 'Import * détecté - importe tout le module',
+            'suggestion': 'Importez uniquement ce dont vous avez besoin',
+            **emplacement,
+            'code_erreur': 'PY001'
+        }
+        for emplacement in occ.emplacements('import_etoile')
+    ]
+
+
+@regle('Python', 'PY002')
+def _py_sans_docstring(occ: Occurrences) -> List[Dict[str, Any]]:
+    """Fonctions sans docstrings (ligne de la première)"""
+    if not occ.present('sans_docstring'):
+        return []
+    return [{
+        'severite': 'info',
+        'categorie': 'lisibilite',
+        'source': 'manuel',
+        'message': 'Fonctions sans docstrings',
+        'suggestion': 'Ajoutez des docstrings pour documenter vos fonctions',
+        **occ.emplacement('sans_docstring'),
+        'code_erreur': 'PY002'
+    }]
+
+
+@regle('Python', 'PY003')
+def _py_print(occ: Occurrences) -> List[Dict[str, Any]]:
+    """Plus de 3 appels à print()"""
+    count = occ.nombre('print')
+    if count <= 3:
+        return []
+    return [{
+        'severite': 'info',
+        'categorie': 'qualite',
+        'source': 'manuel',
+        'message': f'{count} print() détectés - utilisez logging en production',
+        'suggestion': 'Remplacez print() par logging.info()',
+        **occ.emplacement('print'),
+        'code_erreur': 'PY003'
+    }]
+
+
+@regle('Python', 'PY004')
+def _py_lecture_sans_try(occ: Occurrences) -> List[Dict[str, Any]]:
+    """Lecture de fichier hors d'un try/except (ligne de la première)"""
+    if not occ.present('lecture_sans_try'):
+        return []
+    return [{
+        'severite': 'warning',
+        'categorie': 'qualite',
+        'source': 'manuel',
+        'message': 'Lecture de fichier sans gestion d\'erreur',
+        'suggestion': 'Entourez avec try/except pour gérer les erreurs',
+        **occ.emplacement('lecture_sans_try'),
+        'code_erreur': 'PY004'
+    }]
+
+
+# ===== DAX =====
+
+# Fonctions qui posent ou retirent explicitement un filtre dans CALCULATE
+MODIFICATEURS_FILTRE_DAX = {
+    'FILTER', 'ALL', 'ALLSELECTED', 'ALLEXCEPT', 'ALLNOBLANKROW',
+    'ALLCROSSFILTERED', 'REMOVEFILTERS', 'KEEPFILTERS',
+}
+ITERATIFS_DAX = {'SUMX', 'AVERAGEX'}
+
+
+class MoteurArbresDAX:
+    """
+    Occurrences DAX relevées sur l'arbre de chaque mesure
+    
+    Seuls les vrais appels de fonction comptent: ALL ne correspond plus à
+    ALLEXCEPT, à une colonne [Allocation] ni à un commentaire. Les arbres
+    sont en cache par texte de mesure (voir parseur_dax.arbre_mesure).
+    """
+    
+    def mesures(self, texte: str) -> Iterator[Occurrences]:
+        index = IndexLignes(texte)
+        for mesure in decouper_mesures(texte):
+            resultat = arbre_mesure(mesure)
+            decalage = mesure.position
+            positions: Dict[str, List[int]] = {}
+            
+            if resultat.commentaires:
+                positions['commentaire'] = [decalage + position for position in resultat.commentaires]
+            
+            for noeud in resultat.arbre.parcourir():
+                if noeud.type != 'appel':
+                    continue
+                if noeud.valeur in ('CALCULATE', 'CALCULATETABLE') and not self._filtre_explicite(noeud):
+                    positions.setdefault('calculate_sans_filtre', []).append(decalage + noeud.position)
+                elif noeud.valeur in ITERATIFS_DAX:
+                    positions.setdefault('iteratif', []).append(decalage + noeud.position)
+            
+            yield Occurrences(index, positions, decalage, decalage + len(mesure.texte))
+    
+    def _filtre_explicite(self, appel: Noeud) -> bool:
+        """Un argument de filtre du CALCULATE appelle FILTER, ALL, REMOVEFILTERS..."""
+        return any(
+            noeud.type == 'appel' and noeud.valeur in MODIFICATEURS_FILTRE_DAX
+            for argument in appel.enfants[1:]
+            for noeud in argument.parcourir()
+        )
+
+
+@regle('DAX', 'DAX001')
+def _dax_calculate_sans_filter(occ: Occurrences) -> List[Dict[str, Any]]:
+    """CALCULATE dont aucun filtre n'appelle FILTER, ALL..."""
+    if not occ.present('calculate_sans_filtre'):
+        return []
+    return [{
+        'severite': 'info',
+        'categorie': 'lisibilite',
+        'source': 'manuel',
+        'message': 'CALCULATE sans FILTER explicite',
+        'suggestion': 'Vérifiez que le contexte de filtre est bien défini',
+        **occ.emplacement('calculate_sans_filtre'),
+        'code_erreur': 'DAX001'
+    }]
+
+
+@regle('DAX', 'DAX002')
+def _dax_iteratif(occ: Occurrences) -> List[Dict[str, Any]]:
+    """SUMX / AVERAGEX"""
+    if not occ.present('iteratif'):
+        return []
+    return [{
+        'severite': 'warning',
+        'categorie': 'performance',
+        'source': 'manuel',
+        'message': 'Fonction itérative (SUMX/AVERAGEX) détectée',
+        'suggestion': 'Vérifiez les performances sur grandes tables, préférez SUM si possible',
+        **occ.emplacement('iteratif'),
+        'code_erreur': 'DAX002'
+    }]
+
+
+@regle('DAX', 'DAX003')
+def _dax_sans_commentaire(occ: Occurrences) -> List[Dict[str, Any]]:
+    """Mesure longue sans commentaires"""
+    if occ.present('commentaire') or occ.fin - occ.debut <= 200:
+        return []
+    return [{
+        'severite': 'info',
+        'categorie': 'lisibilite',
+        'source': 'manuel',
+        'message': 'Mesure DAX complexe sans commentaires',
+        'suggestion': 'Ajoutez des commentaires pour expliquer la logique',
+        'code_erreur': 'DAX003'
+    }]
+
+
+# ===== Power Query (M) =====
+
+class MoteurEtapesM:
+    """
+    Règles Power Query évaluées étape par étape, avec résultats en cache
+    
+    Le graphe des étapes est construit une fois par analyse (parseur_m).
+    Les problèmes d'une étape sont gardés sous la clé de l'étape, qui
+    dépend de son texte et de celles des étapes qu'elle référence: modifier
+    une étape ne réévalue que cette étape et ses dépendantes.
+    """
+    
+    def __init__(self):
+        self.cache = CacheLRU('M_CACHE_ETAPES', 20000)
+    
+    def analyser(self, texte: str) -> List[Dict[str, Any]]:
+        requete = decouper_requete(texte)
+        problemes = []
+        
+        if not requete.let_in:
+            problemes.extend(self._sans_let_in())
+        
+        analyses = [analyser_etape(etape) for etape in requete.etapes]
+        cles = cles_etapes(requete.etapes, graphe_etapes(requete.etapes, analyses))
+        
+        for etape, analyse, cle in zip(requete.etapes, analyses, cles):
+            resultats = self.cache.lire(cle)
+            if resultats is None:
+                resultats = self._regles_etape(etape, analyse)
+                self.cache.ecrire(cle, resultats)
+            problemes.extend(self._placer(etape, resultats))
+        
+        return problemes
+    
+    def analyser_au_fil(self, morceaux: Iterable[str], taille_max: int) -> Iterator[Dict[str, Any]]:
+        """
+        Requête lue par morceaux: problèmes générés étape par étape
+        
+        Le graphe demande toutes les étapes: les résultats ne sont pas mis
+        en cache sous la clé de l'étape, seule l'analyse de son texte l'est.
+        """
+        decoupeur = DecoupeurRequete(taille_max)
+        
+        def etapes() -> Iterator[Etape]:
+            for morceau in morceaux:
+                yield from decoupeur.ajouter(morceau)
+            yield from decoupeur.ajouter('', final=True)
+        
+        for etape in etapes():
+            yield from self._placer(etape, self._regles_etape(etape, analyser_etape(etape)))
+        
+        if not decoupeur.let_in:
+            yield from self._sans_let_in()
+    
+    def _sans_let_in(self) -> List[Dict[str, Any]]:
+        """Problème de la requête entière (ligne 1, colonne 1)"""
+        return _appliquer_par_partie('PowerQuery', [Occurrences(IndexLignes(''), {'sans_let_in': [0]})])
+    
+    def _regles_etape(self, etape: Etape, analyse: AnalyseEtape) -> List[Dict[str, Any]]:
+        """Problèmes d'une étape, placés relativement à son texte"""
+        positions = {'chemin': list(analyse.chemins)} if analyse.chemins else {}
+        return _appliquer_par_partie('PowerQuery', [Occurrences(IndexLignes(etape.texte), positions)])
+    
+    def _placer(self, etape: Etape, resultats: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Emplacements relatifs à l'étape (en cache) rendus absolus"""
+        problemes = []
+        for probleme in resultats:
+            ligne, colonne = probleme['ligne'], probleme['colonne']
+            problemes.append({
+                **probleme,
+                'ligne': ligne + etape.ligne - 1,
+                'colonne': colonne + etape.colonne - 1 if ligne == 1 else colonne,
+            })
+        return problemes
+
+
+@regle('PowerQuery', 'PQ001')
+def _pq_sans_let_in(occ: Occurrences) -> List[Dict[str, Any]]:
+    """Structure let ... in absente (relevé sur la requête entière)"""
+    if not occ.present('sans_let_in'):
+        return []
+    return [{
+        'severite': 'warning',
+        'categorie': 'lisibilite',
+        'source': 'manuel',
+        'message': 'Structure let...in non détectée',
+        'suggestion': 'Utilisez let...in pour structurer votre code M',
+        'code_erreur': 'PQ001'
+    }]
+
+
+@regle('PowerQuery', 'PQ002')
+def _pq_chemin_en_dur(occ: Occurrences) -> List[Dict[str, Any]]:
+    """Chemin de fichier codé en dur"""
+    if not occ.present('chemin'):
+        return []
+    return [{
+        'severite': 'critique',
+        'categorie': 'qualite',
+        'source': 'manuel',
+        'message': 'Chemin de fichier codé en dur détecté',
+        'suggestion': 'Utilisez des paramètres Power Query pour les chemins',
+        **occ.emplacement('chemin'),
+        'code_erreur': 'PQ002'
+    }]
+
+
+MOTEUR_SQL = MoteurJetonsSQL()
+MOTEUR_PYTHON = MoteurArbrePython()
+MOTEUR_DAX = MoteurArbresDAX()
+MOTEUR_M = MoteurEtapesM()
+
+
+def appliquer_regles(contenu: str, outil: str) -> List[Dict[str, Any]]:
+    """Un parcours du code (jetons, arbres ou étapes), puis toutes les règles du langage dans l'ordre"""
+    if outil == 'SQL':
+        return appliquer_regles_sql(contenu)
+    if outil == 'DAX':
+        return _appliquer_par_partie('DAX', MOTEUR_DAX.mesures(contenu))
+    if outil == 'PowerQuery':
+        return MOTEUR_M.analyser(contenu)
+    
+    if outil != 'Python':
+        return []
+    
+    occurrences = MOTEUR_PYTHON.rechercher(contenu)
+    if occurrences is None:
+        return []
+    
+    problemes = []
+    for _, fonction in REGLES[outil]:
+        problemes.extend(fonction(occurrences))
+    
+    return problemes
+
+
+def appliquer_regles_au_fil(morceaux: Iterable[str], outil: str, taille_max: int) -> Iterator[Dict[str, Any]]:
+    """
+    Règles SQL ou Power Query sur un code lu par morceaux (fichier trop gros pour la mémoire)
+    
+    Les problèmes sont générés au fil de la lecture, bloc d'instructions
+    par bloc ou étape par étape: seuls le bloc ou l'étape en cours restent
+    en mémoire (au plus ~`taille_max` caractères).
+    """
+    if outil == 'SQL':
+        for bloc, ligne, colonne in decouper_au_fil(morceaux, taille_max):
+            yield from appliquer_regles_sql(bloc, ligne, colonne)
+    elif outil == 'PowerQuery':
+        yield from MOTEUR_M.analyser_au_fil(morceaux, taille_max)
+    else:
+        raise ValueError(f"Analyse au fil de l'eau non disponible pour {outil}")
+
+
+def appliquer_regles_sql(contenu: str, ligne: int = 1, colonne: int = 1) -> List[Dict[str, Any]]:
+    """
+    Règles SQL évaluées instruction par instruction
+    
+    Un problème sans emplacement précis reçoit celui du début de son
+    instruction. `ligne` et `colonne` sont celles du premier caractère de
+    `contenu` (un morceau d'un script plus grand, analysé dans un autre
+    processus ou lu au fil de l'eau).
+    """
+    return _appliquer_par_partie('SQL', MOTEUR_SQL.instructions(contenu, ligne, colonne))
+
+
+def _appliquer_par_partie(outil: str, parties: Iterable[Occurrences]) -> List[Dict[str, Any]]:
+    """Règles d'un langage sur chaque partie (instruction, mesure), avec l'emplacement de la partie par défaut"""
+    problemes = []
+    for occurrences in parties:
+        for _, fonction in REGLES[outil]:
+            for probleme in fonction(occurrences):
+                if 'ligne' not in probleme:
+                    probleme.update(occurrences.emplacement())
+                problemes.append(probleme)
+    
+    return problemes
\ No newline at end of file
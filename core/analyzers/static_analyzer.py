@@ -4,15 +4,48 @@
 Règles personnalisées pour SQL, DAX, et compléments Python.
 """
 
-from typing import List, Dict, Any
-import re
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterable, Iterator, List
+
+from django.conf import settings
+
+from .lexeur_sql import decouper_morceaux, instructions_modifiees
+from .lignes_modifiees import LignesModifiees
+from .regles import appliquer_regles, appliquer_regles_au_fil, appliquer_regles_sql
 
 
 class AnalyseurStatique:
     """
     Analyseur avec des règles manuelles pour tous les langages BI
+    
+    Les règles sont déclarées dans regles.py: un seul parcours du code
+    (jetons, arbres ou étapes selon le langage) suffit pour toutes.
+    
+    Un script SQL plus gros que SQL_PARALLELE_SEUIL est découpé en morceaux
+    d'instructions entières, analysés par un pool de processus partagé
+    (au plus un par CPU: avec un seul CPU, l'analyse reste séquentielle).
+    Un fichier SQL ou Power Query trop gros pour la mémoire est analysé au
+    fil de sa lecture (analyser_au_fil).
     """
     
+    # Langages analysables sans charger tout le fichier
+    OUTILS_AU_FIL = ('SQL', 'PowerQuery')
+    
+    _pool = None
+    _verrou_pool = threading.Lock()
+    
+    def __init__(self):
+        self.config = settings.QUALITY_GATE_CONFIG
+        self.seuil_parallele = self.config.get('SQL_PARALLELE_SEUIL', 512 * 1024)
+        # Plus de processus que de CPU ne fait que ralentir (un seul CPU: toujours séquentiel)
+        self.nb_processus = min(self.config.get('SQL_PARALLELE_PROCESSUS') or nb_cpu(), nb_cpu())
+        self.taille_max_bloc = self.config.get('FLUX_TAILLE_MAX_BLOC', 8 * 1024 * 1024)
+    
     def analyser(self, contenu: str, outil: str) -> List[Dict[str, Any]]:
         """
         Lance l'analyse selon le type d'outil
@@ -35,224 +68,106 @@ class AnalyseurStatique:
         
         return []
     
-    def _analyser_sql(self, contenu: str) -> List[Dict[str, Any]]:
-        """Règles pour le SQL"""
-        problemes = []
-        contenu_upper = contenu.upper()
-        lignes = contenu.split('\n')
-        
-        # Règle 1: SELECT *
-        if 'SELECT *' in contenu_upper:
-            for i, ligne in enumerate(lignes):
-                if 'SELECT *' in ligne.upper():
-                    problemes.append({
-                        'severite': 'warning',
-                        'categorie': 'performance',
-                        'source': 'manuel',
-                        'message': 'SELECT * détecté - charge toutes les colonnes inutilement',
-                        'suggestion': 'Listez uniquement les colonnes nécessaires',
-                        'ligne': i + 1,
-                        'code_erreur': 'SQL001'
-                    })
-                    break
-        
-        # Règle 2: JOIN sans ON
-        if 'JOIN' in contenu_upper and 'ON' not in contenu_upper:
-            problemes.append({
-                'severite': 'critique',
-                'categorie': 'qualite',
-                'source': 'manuel',
-                'message': 'JOIN sans clause ON - produit un produit cartésien',
-                'suggestion': 'Ajoutez une condition ON: JOIN table ON t1.id = t2.id',
-                'code_erreur': 'SQL002'
-            })
-        
-        # Règle 3: Données sensibles
-        donnees_sensibles = ['PASSWORD', 'EMAIL', 'PHONE', 'SSN', 'CREDIT_CARD', 'SALAIRE']
-        for donnee in donnees_sensibles:
-            if donnee in contenu_upper:
-                problemes.append({
-                    'severite': 'critique',
-                    'categorie': 'securite',
-                    'source': 'manuel',
-                    'message': f'Donnée sensible détectée: {donnee}',
-                    'suggestion': 'Masquez avec HASH() ou excluez du dashboard',
-                    'code_erreur': 'SQL003'
-                })
-                break
+    def analyser_lignes(self, contenu: str, outil: str, lignes: LignesModifiees) -> List[Dict[str, Any]]:
+        """
+        Analyse limitée aux lignes modifiées par un diff
         
-        # Règle 4: Pas de WHERE avec JOIN
-        if 'JOIN' in contenu_upper and 'WHERE' not in contenu_upper:
-            problemes.append({
-                'severite': 'warning',
-                'categorie': 'performance',
-                'source': 'manuel',
-                'message': 'JOIN sans WHERE - risque de charger trop de données',
-               'suggestion': 'Ajoutez des filtres WHERE pour limiter les résultats',
-                'code_erreur': 'SQL004'
-            })
+        Pour SQL, seules les instructions qui touchent une ligne modifiée
+        sont évaluées. Les règles DAX et Power Query relisent leurs mesures
+        et étapes inchangées en cache, et celles de Python portent sur
+        l'arbre du module entier: elles voient tout le code. Dans tous les
+        cas, seuls les problèmes des lignes modifiées sont retournés.
+        """
+        if outil == 'SQL':
+            problemes = []
+            for bloc, ligne, colonne in instructions_modifiees(contenu, lignes):
+                problemes.extend(appliquer_regles_sql(bloc, ligne, colonne))
+        else:
+            problemes = self.analyser(contenu, outil)
         
-        # Règle 5: Pas d'alias (AS)
-        if 'SELECT' in contenu_upper and ' AS ' not in contenu_upper:
-            problemes.append({
-                'severite': 'info',
-                'categorie': 'lisibilite',
-                'source': 'manuel',
-                'message': 'Aucun alias (AS) utilisé - code moins lisible',
-                'suggestion': 'Utilisez des alias: SELECT COUNT(*) AS total_ventes',
-                'code_erreur': 'SQL005'
-            })
+        return lignes.filtrer(problemes)
+    
+    def analyser_au_fil(self, morceaux: Iterable[str], outil: str) -> Iterator[Dict[str, Any]]:
+        """
+        Analyse un code lu par morceaux, en générant les problèmes au fur et à mesure
         
-        # Règle 6: Date en dur
-        annees = ['2023', '2024', '2025']
-        for annee in annees:
-            if annee in contenu and 'GETDATE' not in contenu_upper and 'CURRENT' not in contenu_upper:
-                problemes.append({
-                    'severite': 'warning',
-                    'categorie': 'qualite',
-                    'source': 'manuel',
-                    'message': f'Année {annee} codée en dur',
-                    'suggestion': 'Utilisez GETDATE() ou CURRENT_DATE pour des dates dynamiques',
-                    'code_erreur': 'SQL006'
-                })
-                break
+        Pour SQL et Power Query, la mémoire utilisée ne dépend pas de la
+        taille du code (voir regles.appliquer_regles_au_fil). Les règles des
+        autres langages portent sur le code entier: il est d'abord lu en entier.
         
-        # Règle 7: Pas de LIMIT
-        if 'SELECT' in contenu_upper and 'LIMIT' not in contenu_upper and 'TOP' not in contenu_upper:
-            if 'WHERE' not in contenu_upper:
-                problemes.append({
-                    'severite': 'warning',
-                    'categorie': 'performance',
-                    'source': 'manuel',
-                    'message': 'SELECT sans LIMIT ni WHERE - risque de surcharge',
-                    'suggestion': 'Ajoutez LIMIT ou TOP pour limiter les résultats',
-                    'code_erreur': 'SQL007'
-                })
+        Args:
+            morceaux: Le code source, morceau par morceau (ex: lecture d'un fichier)
+            outil: Le langage (SQL, Python, DAX, PowerQuery)
+        """
+        if outil in self.OUTILS_AU_FIL:
+            yield from appliquer_regles_au_fil(morceaux, outil, self.taille_max_bloc)
+        else:
+            yield from self.analyser(''.join(morceaux), outil)
+    
+    def _analyser_sql(self, contenu: str) -> List[Dict[str, Any]]:
+        """Règles pour le SQL (évaluées par instruction)"""
+        if self.nb_processus > 1 and len(contenu) > self.seuil_parallele:
+            return self._analyser_sql_parallele(contenu)
+        return appliquer_regles_sql(contenu)
+    
+    def _analyser_sql_parallele(self, contenu: str) -> List[Dict[str, Any]]:
+        """
+        Répartit un gros script SQL entre les processus du pool
         
-        return problemes
+        Chaque morceau connaît sa première ligne et sa première colonne: les
+        emplacements des problèmes sont ceux du script complet, dans l'ordre
+        du script.
+        """
+        taille = max(self.seuil_parallele // 2, len(contenu) // self.nb_processus + 1)
+        morceaux = decouper_morceaux(contenu, taille)
+        if len(morceaux) == 1:
+            return appliquer_regles_sql(contenu)
+        
+        try:
+            pool = self._get_pool()
+            resultats = pool.map(appliquer_regles_sql, *zip(*morceaux))
+            return [probleme for problemes in resultats for probleme in problemes]
+        except (BrokenProcessPool, OSError) as e:
+            print(f"Erreur pool SQL, analyse séquentielle: {e}")
+            self._fermer_pool()
+            return appliquer_regles_sql(contenu)
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Pool de processus partagé par tout le processus (créé au premier gros script)"""
+        cls = AnalyseurStatique
+        with cls._verrou_pool:
+            if cls._pool is None:
+                # "spawn" évite de dupliquer par fork un processus Django multi-thread
+                cls._pool = ProcessPoolExecutor(
+                    max_workers=self.nb_processus,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                atexit.register(cls._fermer_pool)
+            return cls._pool
+    
+    @classmethod
+    def _fermer_pool(cls):
+        """Arrête le pool (à la sortie du processus, ou s'il est cassé)"""
+        with cls._verrou_pool:
+            if cls._pool is not None:
+                cls._pool.shutdown(wait=False, cancel_futures=True)
+                cls._pool = None
     
     def _analyser_python(self, contenu: str) -> List[Dict[str, Any]]:
         """Règles complémentaires pour Python (en plus de Flake8/Bandit)"""
-        problemes = []
-        lignes = contenu.split('\n')
-        
-        # Règle 1: Import *
-        for i, ligne in enumerate(lignes):
-            if 'from' in ligne and 'import *' in ligne:
-                problemes.append({
-                    'severite': 'warning',
-                    'categorie': 'lisibilite',
-                    'source': 'manuel',
-                    'message': 'Import * détecté - importe tout le module',
-                    'suggestion': 'Importez uniquement ce dont vous avez besoin',
-                    'ligne': i + 1,
-                    'code_erreur': 'PY001'
-                })
-        
-        # Règle 2: Pas de docstring
-        if 'def ' in contenu and '"""' not in contenu and "'''" not in contenu:
-            problemes.append({
-                'severite': 'info',
-                'categorie': 'lisibilite',
-                'source': 'manuel',
-                'message': 'Fonctions sans docstrings',
-                'suggestion': 'Ajoutez des docstrings pour documenter vos fonctions',
-                'code_erreur': 'PY002'
-            })
-        
-        # Règle 3: print() en production
-        if 'print(' in contenu:
-            count = contenu.count('print(')
-            if count > 3:
-                problemes.append({
-                    'severite': 'info',
-                    'categorie': 'qualite',
-                    'source': 'manuel',
-                    'message': f'{count} print() détectés - utilisez logging en production',
-                    'suggestion': 'Remplacez print() par logging.info()',
-                    'code_erreur': 'PY003'
-                })
-        
-        # Règle 4: Pas de gestion d'erreur avec fichiers
-        if ('open(' in contenu or 'read_csv' in contenu or 'read_excel' in contenu):
-            if 'try' not in contenu and 'except' not in contenu:
-                problemes.append({
-                    'severite': 'warning',
-                    'categorie': 'qualite',
-                    'source': 'manuel',
-                    'message': 'Lecture de fichier sans gestion d\'erreur',
-                    'suggestion': 'Entourez avec try/except pour gérer les erreurs',
-                    'code_erreur': 'PY004'
-                })
-        
-        return problemes
+        return appliquer_regles(contenu, 'Python')
     
     def _analyser_dax(self, contenu: str) -> List[Dict[str, Any]]:
         """Règles pour DAX (Power BI)"""
-        problemes = []
-        contenu_upper = contenu.upper()
-        
-        # Règle 1: CALCULATE sans contexte clair
-        if 'CALCULATE' in contenu_upper:
-            if 'FILTER' not in contenu_upper and 'ALL' not in contenu_upper:
-                problemes.append({
-                    'severite': 'info',
-                    'categorie': 'lisibilite',
-                    'source': 'manuel',
-                    'message': 'CALCULATE sans FILTER explicite',
-                    'suggestion': 'Vérifiez que le contexte de filtre est bien défini',
-                    'code_erreur': 'DAX001'
-                })
-        
-        # Règle 2: Utilisation de SUMX sur grande table
-        if 'SUMX' in contenu_upper or 'AVERAGEX' in contenu_upper:
-            problemes.append({
-                'severite': 'warning',
-                'categorie': 'performance',
-                'source': 'manuel',
-                'message': 'Fonction itérative (SUMX/AVERAGEX) détectée',
-                'suggestion': 'Vérifiez les performances sur grandes tables, préférez SUM si possible',
-                'code_erreur': 'DAX002'
-            })
-        
-        # Règle 3: Pas de commentaires
-        if '--' not in contenu and '//' not in contenu:
-            if len(contenu) > 200:
-                problemes.append({
-                    'severite': 'info',
-                    'categorie': 'lisibilite',
-                    'source': 'manuel',
-                    'message': 'Mesure DAX complexe sans commentaires',
-                    'suggestion': 'Ajoutez des commentaires pour expliquer la logique',
-                    'code_erreur': 'DAX003'
-                })
-        
-        return problemes
+        return appliquer_regles(contenu, 'DAX')
     
     def _analyser_power_query(self, contenu: str) -> List[Dict[str, Any]]:
         """Règles pour Power Query (M)"""
-        problemes = []
-        
-        # Règle 1: Pas de let...in
-        if 'let' not in contenu.lower() or 'in' not in contenu.lower():
-            problemes.append({
-                'severite': 'warning',
-                'categorie': 'lisibilite',
-                'source': 'manuel',
-                'message': 'Structure let...in non détectée',
-                'suggestion': 'Utilisez let...in pour structurer votre code M',
-                'code_erreur': 'PQ001'
-            })
-        
-        # Règle 2: Chemins en dur
-        if 'C:\\' in contenu or 'D:\\' in contenu or '/Users/' in contenu:
-            problemes.append({
-                'severite': 'critique',
-                'categorie': 'qualite',
-                'source': 'manuel',
-                'message': 'Chemin de fichier codé en dur détecté',
-                'suggestion': 'Utilisez des paramètres Power Query pour les chemins',
-                'code_erreur': 'PQ002'
-            })
-        
-        return problemes
\ No newline at end of file
+        return appliquer_regles(contenu, 'PowerQuery')
+
+
+def nb_cpu() -> int:
+    """CPU utilisables par ce processus (affinité comprise, ex: conteneur limité)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
\ No newline at end of file
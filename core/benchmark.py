@@ -0,0 +1,402 @@
+"""
+Benchmarks des Analyseurs
+=========================
+Mesure le débit (octets/s, problèmes/s) et le pic mémoire de chaque
+analyseur sur des corpus générés, ainsi que la latence de bout en bout
+de QualityGateService.analyser_code (base de données comprise).
+
+Les résultats sont un dictionnaire sérialisable en JSON, comparable à une
+référence sauvegardée (voir comparer). Lancement:
+    python manage.py benchmark --sortie resultats.json --reference reference.json
+"""
+
+import os
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+from .analyzers import AnalyseurStatique, AnalyseurPythonTools
+from .analyzers.moteurs_lint import MOTEURS
+from .models import AnalyseCode
+from .services import QualityGateService
+
+
+OUTILS = ['SQL', 'DAX', 'PowerQuery', 'Python']
+
+TAILLES_DEFAUT = ['1K', '64K', '1M', '5M']
+
+UNITES = {'K': 1024, 'M': 1024 * 1024}
+
+
+def convertir_taille(taille: str) -> int:
+    """Convertit '64K' ou '5M' en nombre d'octets"""
+    taille = taille.strip().upper()
+    if taille[-1:] in UNITES:
+        return int(float(taille[:-1]) * UNITES[taille[-1]])
+    return int(taille)
+
+
+# ===== Génération des corpus =====
+
+def _bloc_sql(rng: random.Random, i: int) -> str:
+    """Une requête SQL, avec ou sans les défauts détectés par les règles"""
+    colonnes = rng.choice(['*', 'v.id, v.montant, c.nom AS client', 'c.email, SUM(v.montant) AS total'])
+    annee = rng.choice(['2024', 'YEAR(GETDATE())'])
+    filtre = rng.choice(['', f"WHERE v.date_vente >= '{annee}-01-01'\n"])
+    return (
+        f"-- Requête {i}\n"
+        f"SELECT {colonnes}\n"
+        f"FROM ventes v\n"
+        f"JOIN clients c ON c.id = v.client_id\n"
+        f"{filtre}"
+        f"ORDER BY v.montant DESC;\n\n"
+    )
+
+
+def _bloc_dax(rng: random.Random, i: int) -> str:
+    """Une mesure DAX"""
+    modele = rng.choice([
+        "Ventes {i} = CALCULATE(SUM(Ventes[Montant]), FILTER(Ventes, Ventes[Annee] = {n}))\n",
+        "Marge {i} = SUMX(Ventes, Ventes[Quantite] * (Ventes[Prix] - Ventes[Cout]))\n",
+        "// Part du magasin {i}\nPart {i} = DIVIDE([Ventes], CALCULATE([Ventes], ALL(Magasins)))\n",
+        "Panier {i} = AVERAGEX(VALUES(Commandes[Id]), CALCULATE(SUM(Ventes[Montant])))\n",
+    ])
+    return modele.format(i=i, n=rng.randint(2015, 2030)) + "\n"
+
+
+def _bloc_power_query(rng: random.Random, i: int) -> str:
+    """Une étape d'une expression let ... in"""
+    modele = rng.choice([
+        '    Etape{i} = Table.SelectRows(Etape{p}, each [Montant] > {n}),\n',
+        '    Etape{i} = Table.TransformColumnTypes(Etape{p}, {{{{"Montant", type number}}}}),\n',
+        '    Etape{i} = Table.RenameColumns(Etape{p}, {{{{"Col{n}", "Colonne{n}"}}}}),\n',
+    ])
+    return modele.format(i=i, p=i - 1, n=rng.randint(1, 1000))
+
+
+def _bloc_python(rng: random.Random, i: int) -> str:
+    """Une fonction Python, avec des défauts Flake8/Bandit de temps en temps"""
+    corps = rng.choice([
+        "    resultat = df[df['montant'] > seuil]\n    return resultat\n",
+        "    total = 0\n    for ligne in df.itertuples():\n        total += ligne.montant\n    return total\n",
+        "    print('traitement', seuil)\n    return eval(str(seuil))\n",
+        "    inutilise = 1\n    return subprocess.call('ls ' + str(seuil), shell=True)\n",
+        "    with open(f'export_{seuil}.csv') as f:\n        return f.read()\n",
+    ])
+    docstring = rng.choice(['    """Traitement du lot"""\n', ''])
+    return f"def traitement_{i}(df, seuil={rng.randint(1, 100)}):\n{docstring}{corps}\n\n"
+
+
+ENTETES = {
+    'SQL': "-- Corpus de benchmark SQL\n",
+    'DAX': "// Corpus de benchmark DAX\n",
+    'PowerQuery': 'let\n    Etape0 = Csv.Document(File.Contents("C:\\\\data\\\\ventes.csv")),\n',
+    'Python': '"""Corpus de benchmark Python"""\nimport os\nimport subprocess\n\n\n',
+}
+
+GENERATEURS = {
+    'SQL': _bloc_sql,
+    'DAX': _bloc_dax,
+    'PowerQuery': _bloc_power_query,
+    'Python': _bloc_python,
+}
+
+
+def generer_corpus(outil: str, taille: int, graine: int = 42) -> str:
+    """
+    Génère un code source d'environ `taille` octets pour un langage
+    
+    Le contenu ne dépend que de (outil, taille, graine): deux lancements
+    mesurent exactement le même code.
+    """
+    rng = random.Random(f'{graine}-{outil}-{taille}')
+    blocs = [ENTETES[outil]]
+    longueur = len(blocs[0])
+    i = 1
+    
+    while longueur < taille:
+        bloc = GENERATEURS[outil](rng, i)
+        blocs.append(bloc)
+        longueur += len(bloc)
+        i += 1
+    
+    if outil == 'PowerQuery':
+        blocs.append(f'in\n    Etape{i - 1}\n')
+    
+    return ''.join(blocs)
+
+
+# ===== Mesures =====
+
+class Benchmark:
+    """
+    Lance les mesures d'un benchmark complet
+    
+    Chaque mesure est répétée `repetitions` fois et on garde la durée
+    médiane. Le pic mémoire (tracemalloc) est mesuré sur une exécution
+    à part, car tracemalloc ralentit le code mesuré. Il ne compte que le
+    processus courant: pas les sous-processus ni le pool Flake8/Bandit.
+    """
+    
+    def __init__(
+        self,
+        tailles: List[str] = None,
+        outils: List[str] = None,
+        repetitions: int = 3,
+        bout_en_bout: bool = True,
+        avec_ia: bool = False
+    ):
+        self.tailles = tailles or TAILLES_DEFAUT
+        self.outils = outils or OUTILS
+        self.repetitions = max(1, repetitions)
+        self.bout_en_bout = bout_en_bout
+        self.avec_ia = avec_ia
+        self.analyseur_statique = AnalyseurStatique()
+        self.analyseur_python = AnalyseurPythonTools()
+        
+        # Un analyseur par moteur de lint installé, comparés sur le même corpus
+        self.analyseurs_moteurs = {}
+        for nom in MOTEURS:
+            analyseur = AnalyseurPythonTools(nom)
+            if analyseur.moteur.nom == nom:
+                self.analyseurs_moteurs[nom] = analyseur
+    
+    def lancer(self, progression: Callable[[str], None] = None) -> Dict[str, Any]:
+        """
+        Lance toutes les mesures
+        
+        Args:
+            progression: Fonction appelée avec le nom de chaque mesure (affichage)
+        
+        Returns:
+            {'meta': {...}, 'analyseurs': {nom: mesure}, 'bout_en_bout': {nom: mesure},
+            'moteurs_lint': {taille: comparaison}}
+        """
+        resultats = {
+            'meta': self._meta(),
+            'analyseurs': {},
+            'bout_en_bout': {},
+        }
+        
+        for outil in self.outils:
+            for taille in self.tailles:
+                contenu = generer_corpus(outil, convertir_taille(taille))
+                
+                for analyseur, fonction in self._analyseurs(outil).items():
+                    nom = f'{analyseur}/{outil}/{taille}'
+                    if progression:
+                        progression(nom)
+                    resultats['analyseurs'][nom] = self.mesurer(fonction, contenu)
+                
+                if self.bout_en_bout:
+                    nom = f'analyser_code/{outil}/{taille}'
+                    if progression:
+                        progression(nom)
+                    resultats['bout_en_bout'][nom] = self.mesurer_bout_en_bout(outil, contenu)
+        
+        resultats['moteurs_lint'] = self._comparer_moteurs(resultats['analyseurs'])
+        return resultats
+    
+    def _analyseurs(self, outil: str) -> Dict[str, Callable[[str], List[Dict]]]:
+        """Analyseurs à mesurer pour un langage"""
+        analyseurs = {
+            'statique': lambda contenu: self.analyseur_statique.analyser(contenu, outil),
+        }
+        
+        if outil == 'Python':
+            status = self.analyseur_python.get_status()
+            if status['flake8']:
+                analyseurs['flake8'] = self.analyseur_python.analyser_flake8
+            if status['bandit']:
+                analyseurs['bandit'] = self.analyseur_python.analyser_bandit
+            
+            # Flake8 + Bandit complets, par moteur
+            for nom, analyseur in self.analyseurs_moteurs.items():
+                analyseurs[f'lint-{nom}'] = lambda contenu, analyseur=analyseur: sum(analyseur.analyser(contenu), [])
+        
+        return analyseurs
+    
+    def _comparer_moteurs(self, mesures: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Moteurs de lint côte à côte, pour chaque taille du corpus Python
+        
+        Returns:
+            {taille: {'duree': {moteur: s}, 'problemes': {moteur: n},
+            'acceleration': durée Flake8/Bandit / durée Ruff}}
+        """
+        comparaison = {}
+        
+        for taille in self.tailles:
+            par_moteur = {
+                nom: mesures[f'lint-{nom}/Python/{taille}']
+                for nom in self.analyseurs_moteurs
+                if f'lint-{nom}/Python/{taille}' in mesures
+            }
+            if len(par_moteur) < 2:
+                continue
+            
+            duree_flake8 = par_moteur.get('flake8', {}).get('duree')
+            duree_ruff = par_moteur.get('ruff', {}).get('duree')
+            comparaison[taille] = {
+                'duree': {nom: mesure['duree'] for nom, mesure in par_moteur.items()},
+                'problemes': {nom: mesure['problemes'] for nom, mesure in par_moteur.items()},
+                'acceleration': round(duree_flake8 / duree_ruff, 1) if duree_flake8 and duree_ruff else None,
+            }
+        
+        return comparaison
+    
+    def mesurer(self, fonction: Callable[[str], List[Dict]], contenu: str) -> Dict[str, Any]:
+        """Débit et pic mémoire d'un analyseur sur un contenu"""
+        # Tour de chauffe sur un extrait: démarrage du pool Flake8/Bandit,
+        # imports paresseux
+        fonction(contenu[:1024])
+        
+        durees = []
+        problemes = []
+        
+        for _ in range(self.repetitions):
+            debut = time.perf_counter()
+            problemes = fonction(contenu)
+            durees.append(time.perf_counter() - debut)
+        
+        tracemalloc.start()
+        try:
+            fonction(contenu)
+            _, pic = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        
+        timeout = any(p.get('code_erreur') == 'TIMEOUT' for p in problemes)
+        return self._resultat(contenu, durees, len(problemes), pic, timeout)
+    
+    def mesurer_bout_en_bout(self, outil: str, contenu: str) -> Dict[str, Any]:
+        """
+        Latence de QualityGateService.analyser_code, sauvegarde comprise
+        
+        Le cache est désactivé (sinon seule la première répétition
+        analyserait vraiment) et les analyses créées sont supprimées.
+        """
+        service = QualityGateService()
+        service.cache.actif = False
+        options = {
+            'utiliser_flake8': True,
+            'utiliser_bandit': True,
+            'utiliser_ia': self.avec_ia,
+        }
+        
+        durees = []
+        ids = []
+        analyse = None
+        
+        try:
+            for _ in range(self.repetitions):
+                debut = time.perf_counter()
+                analyse = service.analyser_code(
+                    nom_fichier=f'benchmark.{outil.lower()}',
+                    outil=outil,
+                    contenu=contenu,
+                    options=options
+                )
+                durees.append(time.perf_counter() - debut)
+                ids.append(analyse.pk)
+            
+            timeout = analyse.problemes.filter(code_erreur='TIMEOUT').exists()
+        finally:
+            AnalyseCode.objects.filter(pk__in=ids).delete()
+        
+        mesure = self._resultat(contenu, durees, analyse.nb_problemes_total, None, timeout)
+        mesure['temps_etapes'] = analyse.temps_etapes
+        return mesure
+    
+    def _resultat(
+        self,
+        contenu: str,
+        durees: List[float],
+        nb_problemes: int,
+        pic: Optional[int],
+        timeout: bool
+    ) -> Dict[str, Any]:
+        """Met en forme une mesure"""
+        octets = len(contenu.encode('utf-8'))
+        duree = statistics.median(durees)
+        
+        return {
+            'octets': octets,
+            'repetitions': len(durees),
+            'duree': round(duree, 6),
+            'duree_min': round(min(durees), 6),
+            'octets_par_s': round(octets / duree) if duree else None,
+            'problemes': nb_problemes,
+            'problemes_par_s': round(nb_problemes / duree, 1) if duree else None,
+            'memoire_pic_ko': round(pic / 1024, 1) if pic is not None else None,
+            'timeout': timeout,
+        }
+    
+    def _meta(self) -> Dict[str, Any]:
+        """Contexte du lancement (pour interpréter une comparaison)"""
+        config = settings.QUALITY_GATE_CONFIG
+        return {
+            'date': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'plateforme': platform.platform(),
+            'processeurs': os.cpu_count(),
+            'tailles': self.tailles,
+            'repetitions': self.repetitions,
+            'lint_pool_actif': config.get('LINT_POOL_ACTIF', True),
+            'lint_moteur': self.analyseur_python.moteur.nom,
+        }
+
+
+def comparer(
+    resultats: Dict[str, Any],
+    reference: Dict[str, Any],
+    seuil: float,
+    plancher: float = 0.001
+) -> List[Dict[str, Any]]:
+    """
+    Compare des résultats à une référence
+    
+    Args:
+        resultats: Sortie de Benchmark.lancer()
+        reference: Sortie sauvegardée d'un lancement précédent
+        seuil: Dégradation tolérée, en pourcentage
+        plancher: Durée (secondes) en dessous de laquelle on ignore les
+            écarts, trop sensibles au bruit
+    
+    Returns:
+        Liste des régressions {mesure, metrique, reference, actuel, ecart_pct}
+    """
+    regressions = []
+    
+    for section in ('analyseurs', 'bout_en_bout'):
+        for nom, mesure in resultats.get(section, {}).items():
+            ancienne = reference.get(section, {}).get(nom)
+            # Une mesure coupée par LINT_TIMEOUT ne dit rien de la vitesse réelle
+            if ancienne is None or mesure.get('timeout') or ancienne.get('timeout'):
+                continue
+            
+            for metrique in ('duree', 'memoire_pic_ko'):
+                actuel = mesure.get(metrique)
+                avant = ancienne.get(metrique)
+                if actuel is None or not avant:
+                    continue
+                if metrique == 'duree' and max(actuel, avant) < plancher:
+                    continue
+                
+                ecart = (actuel - avant) / avant * 100
+                if ecart > seuil:
+                    regressions.append({
+                        'mesure': f'{section}/{nom}',
+                        'metrique': metrique,
+                        'reference': avant,
+                        'actuel': actuel,
+                        'ecart_pct': round(ecart, 1),
+                    })
+    
+    return regressions
\ No newline at end of file
@@ -0,0 +1,196 @@
+"""
+Cache des Résultats d'Analyse
+=============================
+Évite de relancer tous les analyseurs quand le même code est resoumis
+(cas fréquent en CI). Deux niveaux:
+1. Mémoire locale (LRU, par processus)
+2. Base de données (modèle ResultatCache, LRU sur la date d'accès)
+
+Un hit en mémoire met aussi à jour la date d'accès en base, au plus une
+fois par CACHE_INTERVALLE_ACCES: sinon les entrées les plus demandées,
+toujours servies par la mémoire, seraient les premières évincées de la base.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .analyzers.regles import VERSION_REGLES
+from .models import ResultatCache
+
+
+# Valeurs de QUALITY_GATE_CONFIG qui influencent les problèmes ou le score
+CLES_CONFIG = [
+    'PENALITE_CRITIQUE',
+    'PENALITE_WARNING',
+    'PENALITE_INFO',
+    'FLAKE8_MAX_LINE_LENGTH',
+    'FLAKE8_IGNORE',
+    'BANDIT_SEVERITY',
+    'LINT_MOTEUR',
+    'RUFF_PREVIEW',
+    'OPENAI_MODEL',
+    'OPENAI_BASE_URL',
+]
+
+
+class CacheAnalyses:
+    """
+    Cache à deux niveaux des problèmes détectés, par étape
+    
+    Les compteurs hits/misses sont partagés par toutes les instances
+    du processus (voir get_statistiques).
+    """
+    
+    # Clé -> (problèmes par étape, instant de la dernière mise à jour de date_acces)
+    _memoire: 'OrderedDict[str, Tuple[Dict[str, List[Dict]], float]]' = OrderedDict()
+    _verrou = threading.Lock()
+    _compteurs = {
+        'hits_memoire': 0,
+        'hits_persistant': 0,
+        'misses': 0,
+    }
+    
+    def __init__(self):
+        self.config = settings.QUALITY_GATE_CONFIG
+        self.actif = self.config.get('CACHE_ACTIF', True)
+        self.taille_memoire = self.config.get('CACHE_TAILLE_MEMOIRE', 256)
+        self.taille_persistante = self.config.get('CACHE_TAILLE_PERSISTANTE', 5000)
+        self.intervalle_acces = self.config.get('CACHE_INTERVALLE_ACCES', 60)
+    
+    def calculer_cle(
+        self,
+        contenu: str,
+        outil: str,
+        description: str,
+        options: Dict[str, bool],
+        portee: str = ''
+    ) -> str:
+        """
+        Calcule la clé SHA-256 d'une soumission
+        
+        La description n'entre dans la clé que si l'IA est utilisée
+        (c'est le seul analyseur qui la lit). `portee` identifie les lignes
+        analysées quand l'analyse est limitée à un diff (vide: tout le code).
+        """
+        utiliser_ia = options.get('utiliser_ia', True)
+        donnees = {
+            'outil': outil,
+            'options': {
+                'utiliser_flake8': options.get('utiliser_flake8', True),
+                'utiliser_bandit': options.get('utiliser_bandit', True),
+                'utiliser_ia': utiliser_ia,
+            },
+            'description': description if utiliser_ia else '',
+            'version_regles': VERSION_REGLES,
+            'config': {cle: self.config.get(cle) for cle in CLES_CONFIG},
+        }
+        if portee:
+            donnees['portee'] = portee
+        
+        empreinte = hashlib.sha256()
+        empreinte.update(json.dumps(donnees, sort_keys=True).encode('utf-8'))
+        empreinte.update(b'\0')
+        empreinte.update(contenu.encode('utf-8'))
+        
+        return empreinte.hexdigest()
+    
+    def lire(self, cle: str) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """Retourne les problèmes par étape, ou None si absent"""
+        if not self.actif:
+            return None
+        
+        # Niveau 1: mémoire locale
+        with self._verrou:
+            entree_memoire = self._memoire.get(cle)
+            if entree_memoire is not None:
+                resultats, date_acces = entree_memoire
+                maintenant = time.monotonic()
+                a_noter = maintenant - date_acces >= self.intervalle_acces
+                if a_noter:
+                    self._memoire[cle] = (resultats, maintenant)
+                self._memoire.move_to_end(cle)
+                self._compteurs['hits_memoire'] += 1
+        
+        if entree_memoire is not None:
+            if a_noter:
+                ResultatCache.objects.filter(cle=cle).update(date_acces=timezone.now())
+            return resultats
+        
+        # Niveau 2: base de données
+        entree = ResultatCache.objects.filter(cle=cle).first()
+        if entree is None:
+            with self._verrou:
+                self._compteurs['misses'] += 1
+            return None
+        
+        ResultatCache.objects.filter(pk=entree.pk).update(
+            nb_hits=F('nb_hits') + 1,
+            date_acces=timezone.now()
+        )
+        
+        with self._verrou:
+            self._compteurs['hits_persistant'] += 1
+        self._memoriser(cle, entree.resultats)
+        
+        return entree.resultats
+    
+    def ecrire(self, cle: str, resultats: Dict[str, List[Dict[str, Any]]]):
+        """Enregistre les problèmes par étape dans les deux niveaux"""
+        if not self.actif:
+            return
+        
+        # Un timeout est un incident passager, pas un résultat à réutiliser
+        for problemes in resultats.values():
+            if any(p.get('code_erreur') == 'TIMEOUT' for p in problemes):
+                return
+        
+        self._memoriser(cle, resultats)
+        
+        try:
+            with transaction.atomic():
+                ResultatCache.objects.create(cle=cle, resultats=resultats)
+        except IntegrityError:
+            # Déjà écrit par une analyse concurrente
+            return
+        
+        self._evincer()
+    
+    def _memoriser(self, cle: str, resultats: Dict[str, List[Dict[str, Any]]]):
+        """Ajoute une entrée au niveau mémoire en respectant la taille max"""
+        with self._verrou:
+            # date_acces vient d'être écrite en base (création ou hit persistant)
+            self._memoire[cle] = (resultats, time.monotonic())
+            self._memoire.move_to_end(cle)
+            while len(self._memoire) > self.taille_memoire:
+                self._memoire.popitem(last=False)
+    
+    def _evincer(self):
+        """Supprime les entrées persistantes les moins récemment utilisées"""
+        nb_entrees = ResultatCache.objects.count()
+        excedent = nb_entrees - self.taille_persistante
+        
+        if excedent > 0:
+            anciennes = ResultatCache.objects.order_by('date_acces').values_list('pk', flat=True)[:excedent]
+            ResultatCache.objects.filter(pk__in=list(anciennes)).delete()
+    
+    @classmethod
+    def get_statistiques(cls) -> Dict[str, Any]:
+        """Compteurs hits/misses du processus courant"""
+        with cls._verrou:
+            compteurs = dict(cls._compteurs)
+            compteurs['entrees_memoire'] = len(cls._memoire)
+        
+        total = compteurs['hits_memoire'] + compteurs['hits_persistant'] + compteurs['misses']
+        hits = compteurs['hits_memoire'] + compteurs['hits_persistant']
+        compteurs['taux_hit'] = round((hits / total) * 100, 1) if total else 0
+        
+        return compteurs
\ No newline at end of file
@@ -0,0 +1,120 @@
+"""
+Exécuteur d'Étapes d'Analyse
+============================
+Lance les différentes étapes d'une analyse (règles manuelles, Flake8,
+Bandit, IA) en parallèle sur un pool de threads borné.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Awaitable, Callable, Dict, Iterator, List, Any, Tuple
+
+from django.conf import settings
+
+
+class ExecuteurEtapes:
+    """
+    Exécute les étapes d'une analyse en parallèle
+    
+    Les étapes passent l'essentiel de leur temps à attendre (sous-processus
+    Flake8/Bandit, appel réseau OpenAI), des threads suffisent donc.
+    Le pool est partagé par tout le processus: le nombre de threads reste
+    borné même quand plusieurs analyses tournent en même temps.
+    """
+    
+    _pool = None
+    _verrou = threading.Lock()
+    
+    @classmethod
+    def get_pool(cls) -> ThreadPoolExecutor:
+        """Retourne le pool partagé (créé au premier appel)"""
+        if cls._pool is None:
+            with cls._verrou:
+                if cls._pool is None:
+                    config = settings.QUALITY_GATE_CONFIG
+                    cls._pool = ThreadPoolExecutor(
+                        max_workers=config.get('MAX_THREADS_ETAPES', 8),
+                        thread_name_prefix='qg_etape'
+                    )
+        return cls._pool
+    
+    def executer(
+        self,
+        etapes: Dict[str, Callable[[], List[Dict[str, Any]]]]
+    ) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, float]]:
+        """
+        Lance toutes les étapes et attend la fin de la plus lente
+        
+        Args:
+            etapes: Dictionnaire {nom_etape: fonction sans argument}
+        
+        Returns:
+            Tuple ({nom_etape: liste des problèmes}, {nom_etape: durée en secondes}),
+            dans l'ordre des étapes
+        """
+        # Une seule étape: inutile de passer par le pool
+        if len(etapes) <= 1:
+            chronos = {nom: self._chronometrer(fonction) for nom, fonction in etapes.items()}
+        else:
+            pool = self.get_pool()
+            futures = {nom: pool.submit(self._chronometrer, fonction) for nom, fonction in etapes.items()}
+            chronos = {nom: future.result() for nom, future in futures.items()}
+        
+        return (
+            {nom: problemes for nom, (problemes, _) in chronos.items()},
+            {nom: duree for nom, (_, duree) in chronos.items()}
+        )
+    
+    async def executer_async(
+        self,
+        etapes: Dict[str, Awaitable[List[Dict[str, Any]]]]
+    ) -> Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, float]]:
+        """
+        Équivalent de executer() pour des coroutines (vues ASGI)
+        
+        Args:
+            etapes: Dictionnaire {nom_etape: coroutine}
+        """
+        chronos = await asyncio.gather(*(self._chronometrer_async(etape) for etape in etapes.values()))
+        
+        return (
+            {nom: problemes for nom, (problemes, _) in zip(etapes, chronos)},
+            {nom: duree for nom, (_, duree) in zip(etapes, chronos)}
+        )
+    
+    def executer_au_fil(
+        self,
+        etapes: Dict[str, Callable[[], List[Dict[str, Any]]]]
+    ) -> Iterator[Tuple[str, List[Dict[str, Any]], float]]:
+        """
+        Lance toutes les étapes et rend chacune dès qu'elle est terminée
+        
+        Yields:
+            Tuples (nom_etape, problemes, duree_en_secondes), dans l'ordre
+            de fin des étapes (la plus rapide d'abord)
+        """
+        pool = self.get_pool()
+        futures = {
+            pool.submit(self._chronometrer, fonction): nom
+            for nom, fonction in etapes.items()
+        }
+        
+        for future in as_completed(futures):
+            problemes, duree = future.result()
+            yield futures[future], problemes, duree
+    
+    @staticmethod
+    def _chronometrer(fonction: Callable[[], List[Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], float]:
+        """Exécute une étape et mesure sa durée"""
+        debut = time.time()
+        problemes = fonction()
+        return problemes, time.time() - debut
+    
+    @staticmethod
+    async def _chronometrer_async(etape: Awaitable[List[Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], float]:
+        """Attend une étape asynchrone et mesure sa durée"""
+        debut = time.time()
+        problemes = await etape
+        return problemes, time.time() - debut
\ No newline at end of file
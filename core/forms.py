@@ -5,7 +5,9 @@ Les formulaires permettent de valider les données entrées par l'utilisateur.
 """
 
 from django import forms
+from django.conf import settings
 from .models import AnalyseCode, OutilBI
+from .analyzers.static_analyzer import AnalyseurStatique
 
 
 class AnalyseCodeForm(forms.Form):
@@ -129,8 +131,20 @@ class AnalyseCodeForm(forms.Form):
 class UploadFileForm(forms.Form):
     """
     Formulaire alternatif pour uploader un fichier
+    
+    Les fichiers SQL et Power Query peuvent dépasser 1 Mo: ils sont
+    analysés au fil de la lecture, sans être chargés en mémoire.
     """
     
+    # Langage déduit de l'extension (un .txt demande de choisir l'outil)
+    EXTENSIONS_OUTILS = {
+        '.py': 'Python',
+        '.sql': 'SQL',
+        '.dax': 'DAX',
+        '.m': 'PowerQuery',
+        '.txt': None,
+    }
+    
     fichier = forms.FileField(
         label="Fichier à analyser",
         widget=forms.FileInput(attrs={
@@ -140,6 +154,15 @@ class UploadFileForm(forms.Form):
         help_text="Formats acceptés: .py, .sql, .dax, .m, .txt"
     )
     
+    outil = forms.ChoiceField(
+        required=False,
+        choices=[('', "D'après l'extension")] + list(OutilBI.choices),
+        label="Langage / Outil",
+        widget=forms.Select(attrs={
+            'class': 'form-select'
+        })
+    )
+    
     description = forms.CharField(
         required=False,
         label="Description",
@@ -155,16 +178,40 @@ class UploadFileForm(forms.Form):
         
         if fichier:
             # Vérifier l'extension
-            extensions_valides = ['.py', '.sql', '.dax', '.m', '.txt']
+            extensions_valides = list(self.EXTENSIONS_OUTILS)
             ext = '.' + fichier.name.split('.')[-1].lower()
             
             if ext not in extensions_valides:
                 raise forms.ValidationError(
                     f"Extension non supportée. Extensions valides: {', '.join(extensions_valides)}"
                 )
-            
-            # Vérifier la taille (max 1 Mo)
-            if fichier.size > 1024 * 1024:
-                raise forms.ValidationError("Le fichier est trop volumineux (max 1 Mo)")
         
-        return fichier
\ No newline at end of file
+        return fichier
+    
+    def clean(self):
+        """
+        Déduit l'outil de l'extension et vérifie la taille
+        
+        1 Mo au plus, sauf pour SQL et Power Query (FLUX_TAILLE_MAX_FICHIER)
+        """
+        cleaned_data = super().clean()
+        fichier = cleaned_data.get('fichier')
+        if not fichier:
+            return cleaned_data
+        
+        outil = cleaned_data.get('outil') or self.EXTENSIONS_OUTILS.get('.' + fichier.name.split('.')[-1].lower())
+        if not outil:
+            raise forms.ValidationError("Choisissez le langage du fichier")
+        cleaned_data['outil'] = outil
+        
+        if outil in AnalyseurStatique.OUTILS_AU_FIL:
+            taille_max = settings.QUALITY_GATE_CONFIG.get('FLUX_TAILLE_MAX_FICHIER', 2 * 1024 ** 3)
+        else:
+            taille_max = 1024 * 1024
+        
+        if fichier.size > taille_max:
+            raise forms.ValidationError(
+                f"Le fichier est trop volumineux (max {taille_max // (1024 * 1024)} Mo pour {outil})"
+            )
+        
+        return cleaned_data
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""
+Analyse d'un Fichier en Ligne de Commande
+=========================================
+Applique les règles statiques à un fichier, quelle que soit sa taille: un
+fichier SQL ou Power Query est lu par morceaux et les problèmes sont
+affichés au fur et à mesure (mémoire constante).
+
+Usage:
+    python manage.py analyser_fichier extraction.sql
+    python manage.py analyser_fichier requete.txt --outil PowerQuery --json > problemes.jsonl
+
+Code de sortie 1 si au moins un problème critique est trouvé.
+"""
+
+import json
+import os
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.analyzers.static_analyzer import AnalyseurStatique
+from core.forms import UploadFileForm
+from core.models import OutilBI
+
+
+class Command(BaseCommand):
+    help = "Applique les règles statiques à un fichier, lu par morceaux (SQL et Power Query)"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('chemin', help="Fichier à analyser")
+        parser.add_argument(
+            '--outil',
+            choices=OutilBI.values,
+            help="Langage du fichier (par défaut: d'après l'extension)"
+        )
+        parser.add_argument(
+            '--taille-morceau',
+            type=int,
+            default=settings.QUALITY_GATE_CONFIG.get('FLUX_TAILLE_MORCEAU', 1024 * 1024),
+            help="Caractères lus à la fois"
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help="Un objet JSON par problème (une ligne chacun) au lieu du format texte"
+        )
+    
+    def handle(self, *args, **options):
+        chemin = options['chemin']
+        extension = os.path.splitext(chemin)[1].lower()
+        outil = options['outil'] or UploadFileForm.EXTENSIONS_OUTILS.get(extension)
+        if not outil:
+            raise CommandError(f"Langage inconnu pour '{chemin}': précisez --outil")
+        if options['taille_morceau'] <= 0:
+            raise CommandError("--taille-morceau doit être positif")
+        
+        par_severite = {}
+        try:
+            with open(chemin, encoding='utf-8-sig', errors='replace') as fichier:
+                morceaux = iter(lambda: fichier.read(options['taille_morceau']), '')
+                for probleme in AnalyseurStatique().analyser_au_fil(morceaux, outil):
+                    severite = probleme['severite']
+                    par_severite[severite] = par_severite.get(severite, 0) + 1
+                    self.stdout.write(self._formater(chemin, probleme, options['json']))
+        except OSError as e:
+            raise CommandError(f"Lecture impossible: {e}")
+        
+        resume = ', '.join(f"{nombre} {severite}" for severite, nombre in sorted(par_severite.items()))
+        self.stderr.write(f"{sum(par_severite.values())} problème(s) {outil}" + (f": {resume}" if resume else ''))
+        
+        if par_severite.get('critique'):
+            sys.exit(1)
+    
+    def _formater(self, chemin: str, probleme: dict, en_json: bool) -> str:
+        """Une ligne par problème: JSON, ou chemin:ligne:colonne: CODE message (comme Flake8)"""
+        if en_json:
+            return json.dumps(probleme, ensure_ascii=False)
+        return (
+            f"{chemin}:{probleme.get('ligne') or 1}:{probleme.get('colonne') or 1}: "
+            f"{probleme.get('code_erreur', '')} [{probleme['severite']}] {probleme['message']}"
+        )
\ No newline at end of file
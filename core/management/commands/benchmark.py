@@ -0,0 +1,123 @@
+"""
+Benchmark des Analyseurs
+========================
+Mesure les analyseurs et QualityGateService.analyser_code sur des corpus
+générés, puis compare éventuellement à une référence.
+
+Usage:
+    python manage.py benchmark --sortie reference.json
+    python manage.py benchmark --reference reference.json --seuil 15
+    python manage.py benchmark --tailles 1K,64K --outils SQL,Python --repetitions 5
+"""
+
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark import Benchmark, OUTILS, TAILLES_DEFAUT, comparer, convertir_taille
+
+
+class Command(BaseCommand):
+    help = "Mesure le débit et la mémoire des analyseurs et la latence de bout en bout"
+    
+    def add_arguments(self, parser):
+        config = settings.QUALITY_GATE_CONFIG
+        
+        parser.add_argument(
+            '--tailles',
+            default=','.join(TAILLES_DEFAUT),
+            help="Tailles des corpus, séparées par des virgules (ex: 1K,64K,1M,5M)"
+        )
+        parser.add_argument(
+            '--outils',
+            default=','.join(OUTILS),
+            help="Langages à mesurer, séparés par des virgules"
+        )
+        parser.add_argument(
+            '--repetitions',
+            type=int,
+            default=3,
+            help="Nombre d'exécutions par mesure (on garde la médiane)"
+        )
+        parser.add_argument(
+            '--sans-bout-en-bout',
+            action='store_true',
+            help="Ne pas mesurer analyser_code (ni écrire en base)"
+        )
+        parser.add_argument(
+            '--avec-ia',
+            action='store_true',
+            help="Inclure l'étape IA dans analyser_code (consomme des crédits si une clé est configurée)"
+        )
+        parser.add_argument(
+            '--sortie',
+            help="Fichier JSON des résultats (par défaut: sortie standard)"
+        )
+        parser.add_argument(
+            '--reference',
+            help="Fichier JSON d'un lancement précédent à comparer"
+        )
+        parser.add_argument(
+            '--seuil',
+            type=float,
+            default=config.get('BENCHMARK_SEUIL_REGRESSION', 20),
+            help="Dégradation tolérée par rapport à la référence, en pourcentage"
+        )
+    
+    def handle(self, *args, **options):
+        tailles = [t.strip() for t in options['tailles'].split(',') if t.strip()]
+        outils = [o.strip() for o in options['outils'].split(',') if o.strip()]
+        
+        for taille in tailles:
+            try:
+                convertir_taille(taille)
+            except ValueError:
+                raise CommandError(f"Taille invalide: {taille}")
+        for outil in outils:
+            if outil not in OUTILS:
+                raise CommandError(f"Outil inconnu: {outil} (choix: {', '.join(OUTILS)})")
+        
+        reference = None
+        if options['reference']:
+            try:
+                with open(options['reference'], 'r', encoding='utf-8') as f:
+                    reference = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                raise CommandError(f"Référence illisible: {e}")
+        
+        benchmark = Benchmark(
+            tailles=tailles,
+            outils=outils,
+            repetitions=options['repetitions'],
+            bout_en_bout=not options['sans_bout_en_bout'],
+            avec_ia=options['avec_ia']
+        )
+        
+        # La progression va sur stderr pour garder stdout en JSON pur
+        resultats = benchmark.lancer(progression=lambda nom: self.stderr.write(f"⏱️ {nom}"))
+        
+        if reference is not None:
+            resultats['regressions'] = comparer(resultats, reference, options['seuil'])
+            resultats['seuil'] = options['seuil']
+        
+        rapport = json.dumps(resultats, indent=2, ensure_ascii=False)
+        if options['sortie']:
+            with open(options['sortie'], 'w', encoding='utf-8') as f:
+                f.write(rapport)
+            self.stderr.write(f"✅ Résultats écrits dans {options['sortie']}")
+        else:
+            self.stdout.write(rapport)
+        
+        for mesure in resultats.get('analyseurs', {}).values():
+            if mesure['timeout']:
+                self.stderr.write(self.style.WARNING("⚠️ Certaines mesures ont atteint LINT_TIMEOUT"))
+                break
+        
+        regressions = resultats.get('regressions', [])
+        if regressions:
+            for r in regressions:
+                self.stderr.write(self.style.ERROR(
+                    f"   {r['mesure']} {r['metrique']}: {r['reference']} -> {r['actuel']} (+{r['ecart_pct']}%)"
+                ))
+            raise CommandError(f"{len(regressions)} régression(s) au-delà de {options['seuil']}%")
\ No newline at end of file
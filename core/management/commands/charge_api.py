@@ -0,0 +1,220 @@
+"""
+Test de Charge de l'API
+=======================
+Envoie des analyses à /api/analyser/ à un débit cible (boucle ouverte:
+les requêtes partent à l'heure prévue, même si les précédentes ne sont
+pas terminées) et mesure débit, taux d'erreur et latences.
+
+Usage:
+    python manage.py charge_api --rps 10 --duree 60
+    python manage.py charge_api --url http://serveur:8000/api/analyser/ --outil Python --taille 8K --json
+
+Avec un serveur OpenAI local (python manage.py serveur_openai), l'étape IA
+est chargée sans consommer de crédits.
+"""
+
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import CookieJar
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark import OUTILS, convertir_taille, generer_corpus
+from core.metriques import percentiles
+
+
+# Préfixe de commentaire par langage (pour varier le contenu sans changer les règles)
+COMMENTAIRES = {'SQL': '--', 'DAX': '//', 'PowerQuery': '//', 'Python': '#'}
+
+
+class Command(BaseCommand):
+    help = "Charge /api/analyser/ à un débit cible et mesure latences et erreurs"
+    
+    def add_arguments(self, parser):
+        config = settings.QUALITY_GATE_CONFIG
+        
+        parser.add_argument(
+            '--url',
+            default=config.get('CHARGE_URL', 'http://127.0.0.1:8000/api/analyser/'),
+            help="URL de l'API d'analyse"
+        )
+        parser.add_argument('--rps', type=float, default=5, help="Requêtes par seconde visées")
+        parser.add_argument('--duree', type=float, default=30, help="Durée du test (secondes)")
+        parser.add_argument(
+            '--concurrence',
+            type=int,
+            default=64,
+            help="Requêtes en vol au maximum (au-delà, l'envoi prend du retard)"
+        )
+        parser.add_argument('--outil', choices=OUTILS, default='SQL', help="Langage du code envoyé")
+        parser.add_argument('--taille', default='4K', help="Taille du code envoyé (ex: 4K, 1M)")
+        parser.add_argument(
+            '--meme-contenu',
+            action='store_true',
+            help="Envoyer toujours le même code (mesure le cache au lieu des analyseurs)"
+        )
+        parser.add_argument('--timeout', type=float, default=120, help="Timeout d'une requête (secondes)")
+        parser.add_argument('--json', action='store_true', help="Afficher le rapport en JSON")
+    
+    def handle(self, *args, **options):
+        if options['rps'] <= 0 or options['duree'] <= 0:
+            raise CommandError("--rps et --duree doivent être positifs")
+        
+        url = options['url']
+        ouvreur = self._ouvreur_avec_csrf(url)
+        contenu = generer_corpus(options['outil'], convertir_taille(options['taille']))
+        nb_requetes = max(1, int(options['rps'] * options['duree']))
+        
+        self.stderr.write(
+            f"🚀 {nb_requetes} requête(s) vers {url} à {options['rps']} req/s "
+            f"({options['outil']}, {len(contenu)} octets)"
+        )
+        
+        resultats: List[Tuple[Any, float]] = []
+        retard_max = 0.0
+        
+        with ThreadPoolExecutor(max_workers=options['concurrence'], thread_name_prefix='qg_charge') as pool:
+            futures = []
+            debut = time.perf_counter()
+            
+            for i in range(nb_requetes):
+                attente = debut + i / options['rps'] - time.perf_counter()
+                if attente > 0:
+                    time.sleep(attente)
+                else:
+                    retard_max = max(retard_max, -attente)
+                
+                corps = self._corps(options, contenu, i)
+                futures.append(pool.submit(self._envoyer, ouvreur, url, corps, options['timeout']))
+            
+            resultats = [future.result() for future in futures]
+            duree_totale = time.perf_counter() - debut
+        
+        rapport = self._rapport(resultats, duree_totale, options['rps'], retard_max)
+        
+        if options['json']:
+            self.stdout.write(json.dumps(rapport, indent=2, ensure_ascii=False))
+        else:
+            self._afficher(rapport)
+    
+    def _ouvreur_avec_csrf(self, url: str) -> urllib.request.OpenerDirector:
+        """
+        Prépare un client HTTP avec le cookie et le jeton CSRF
+        
+        L'API est protégée par CsrfViewMiddleware: comme un navigateur, on
+        récupère le cookie csrftoken sur la page du formulaire.
+        """
+        cookies = CookieJar()
+        ouvreur = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cookies))
+        
+        try:
+            ouvreur.open(urljoin(url, '/analyser/'), timeout=10).read()
+        except (urllib.error.URLError, OSError) as e:
+            raise CommandError(f"Serveur injoignable: {e}")
+        
+        jeton = next((c.value for c in cookies if c.name == settings.CSRF_COOKIE_NAME), '')
+        ouvreur.addheaders = [('X-CSRFToken', jeton), ('Referer', url)]
+        
+        return ouvreur
+    
+    def _corps(self, options: Dict[str, Any], contenu: str, numero: int) -> bytes:
+        """Corps JSON d'une requête (contenu unique sauf --meme-contenu)"""
+        if not options['meme_contenu']:
+            contenu = f"{COMMENTAIRES[options['outil']]} charge_api requête {numero}\n{contenu}"
+        
+        return json.dumps({
+            'nom_fichier': f"charge_{numero}.{options['outil'].lower()}",
+            'outil': options['outil'],
+            'contenu': contenu,
+        }).encode('utf-8')
+    
+    def _envoyer(self, ouvreur, url: str, corps: bytes, timeout: float) -> Tuple[Any, float]:
+        """
+        Envoie une requête
+        
+        Returns:
+            Tuple (code HTTP, ou nom de l'erreur réseau, latence en secondes)
+        """
+        requete = urllib.request.Request(
+            url,
+            data=corps,
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        
+        debut = time.perf_counter()
+        try:
+            with ouvreur.open(requete, timeout=timeout) as reponse:
+                reponse.read()
+                statut = reponse.status
+        except urllib.error.HTTPError as e:
+            statut = e.code
+        except (urllib.error.URLError, OSError) as e:
+            statut = type(getattr(e, 'reason', e)).__name__
+        
+        return statut, time.perf_counter() - debut
+    
+    def _rapport(
+        self,
+        resultats: List[Tuple[Any, float]],
+        duree_totale: float,
+        rps_cible: float,
+        retard_max: float
+    ) -> Dict[str, Any]:
+        """Débit, taux d'erreur et percentiles de latence"""
+        reussies = [latence for statut, latence in resultats if statut == 200]
+        erreurs: Dict[str, int] = {}
+        for statut, _ in resultats:
+            if statut != 200:
+                erreurs[str(statut)] = erreurs.get(str(statut), 0) + 1
+        
+        toutes = [latence for _, latence in resultats]
+        
+        return {
+            'requetes': len(resultats),
+            'reussies': len(reussies),
+            'erreurs': erreurs,
+            'taux_erreur': round((len(resultats) - len(reussies)) / len(resultats) * 100, 2),
+            'duree': round(duree_totale, 3),
+            'rps_cible': rps_cible,
+            'rps_envoye': round(len(resultats) / duree_totale, 2),
+            'debit': round(len(reussies) / duree_totale, 2),
+            'retard_envoi_max': round(retard_max, 3),
+            'latence': {
+                **percentiles(toutes),
+                'moyenne': round(sum(toutes) / len(toutes), 4),
+                'max': round(max(toutes), 4),
+            },
+            'latence_reussies': percentiles(reussies) if reussies else None,
+        }
+    
+    def _afficher(self, rapport: Dict[str, Any]):
+        """Affiche le rapport en texte"""
+        latence = rapport['latence']
+        
+        self.stdout.write(f"📊 Requêtes: {rapport['requetes']} en {rapport['duree']}s")
+        self.stdout.write(
+            f"   Débit: {rapport['debit']} analyses/s "
+            f"(envoyé: {rapport['rps_envoye']} req/s, cible: {rapport['rps_cible']})"
+        )
+        self.stdout.write(
+            f"   Latence: p50 {latence['p50']}s, p95 {latence['p95']}s, "
+            f"p99 {latence['p99']}s, max {latence['max']}s"
+        )
+        
+        if rapport['retard_envoi_max'] > 0.1:
+            self.stdout.write(self.style.WARNING(
+                f"   ⚠️ Envoi en retard de {rapport['retard_envoi_max']}s: augmentez --concurrence"
+            ))
+        
+        if rapport['erreurs']:
+            detail = ', '.join(f"{statut}: {nb}" for statut, nb in sorted(rapport['erreurs'].items()))
+            self.stdout.write(self.style.ERROR(f"   ❌ Erreurs: {rapport['taux_erreur']}% ({detail})"))
+        else:
+            self.stdout.write(self.style.SUCCESS("   ✅ Aucune erreur"))
\ No newline at end of file
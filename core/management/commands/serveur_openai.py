@@ -0,0 +1,101 @@
+"""
+Serveur OpenAI Local
+====================
+Lance le remplaçant local de l'API chat/completions (core.simulateur_openai).
+
+Usage:
+    python manage.py serveur_openai --port 8001
+    python manage.py serveur_openai --latence 1200 --ecart 400 --taux-429 0.1 --taux-500 0.02
+    python manage.py serveur_openai --reponses reponses.json --taux-malforme 0.05
+
+Puis pointer AnalyseurIA dessus: OPENAI_BASE_URL=http://127.0.0.1:8001/v1
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.simulateur_openai import ConfigSimulateur, DISTRIBUTIONS, creer_serveur
+
+
+class Command(BaseCommand):
+    help = "Lance un serveur local qui imite l'API chat/completions d'OpenAI"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--hote', default='127.0.0.1', help="Adresse d'écoute")
+        parser.add_argument('--port', type=int, default=8001, help="Port d'écoute")
+        parser.add_argument(
+            '--latence',
+            type=float,
+            default=500,
+            help="Latence moyenne des réponses (millisecondes)"
+        )
+        parser.add_argument(
+            '--ecart',
+            type=float,
+            default=150,
+            help="Écart-type de la latence (millisecondes, distributions normale et lognormale)"
+        )
+        parser.add_argument(
+            '--distribution',
+            choices=DISTRIBUTIONS,
+            default='lognormale',
+            help="Distribution de la latence"
+        )
+        parser.add_argument('--taux-429', type=float, default=0.0, help="Part des requêtes en 429 (0 à 1)")
+        parser.add_argument('--taux-500', type=float, default=0.0, help="Part des requêtes en 500 (0 à 1)")
+        parser.add_argument(
+            '--taux-malforme',
+            type=float,
+            default=0.0,
+            help="Part des réponses dont le contenu n'est pas du JSON valide (0 à 1)"
+        )
+        parser.add_argument(
+            '--reponses',
+            help="Fichier JSON: un objet {\"problemes\": [...]} ou une liste de ces objets"
+        )
+        parser.add_argument('--graine', type=int, help="Graine aléatoire (tirages reproductibles)")
+    
+    def handle(self, *args, **options):
+        if options['taux_429'] + options['taux_500'] + options['taux_malforme'] > 1:
+            raise CommandError("La somme des taux d'erreur dépasse 1")
+        
+        reponses = None
+        if options['reponses']:
+            try:
+                with open(options['reponses'], 'r', encoding='utf-8') as f:
+                    reponses = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                raise CommandError(f"Fichier de réponses illisible: {e}")
+            if isinstance(reponses, dict):
+                reponses = [reponses]
+        
+        config = ConfigSimulateur(
+            latence_ms=options['latence'],
+            ecart_ms=options['ecart'],
+            distribution=options['distribution'],
+            taux_429=options['taux_429'],
+            taux_500=options['taux_500'],
+            taux_malforme=options['taux_malforme'],
+            reponses=reponses,
+            graine=options['graine']
+        )
+        
+        serveur = creer_serveur(options['hote'], options['port'], config)
+        adresse = f"http://{options['hote']}:{options['port']}/v1"
+        
+        self.stdout.write(f"🚀 Serveur OpenAI local sur {adresse}")
+        self.stdout.write(f"   Configurez OPENAI_BASE_URL={adresse}")
+        
+        try:
+            serveur.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            serveur.server_close()
+        
+        compteurs = config.compteurs
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Serveur arrêté: {compteurs['requetes']} requête(s), "
+            f"{compteurs['429']} en 429, {compteurs['500']} en 500, {compteurs['malformees']} malformée(s)"
+        ))
\ No newline at end of file
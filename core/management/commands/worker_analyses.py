@@ -0,0 +1,96 @@
+"""
+Worker des Analyses Asynchrones
+===============================
+Vide la file TacheAnalyse remplie par l'API en mode asynchrone.
+
+Usage:
+    python manage.py worker_analyses --concurrence 4
+    python manage.py worker_analyses --une-fois   # Vide la file puis s'arrête
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.taches import FileTaches
+
+
+class Command(BaseCommand):
+    help = "Traite les analyses en file d'attente (mode asynchrone de l'API)"
+    
+    def add_arguments(self, parser):
+        config = settings.QUALITY_GATE_CONFIG
+        
+        parser.add_argument(
+            '--concurrence',
+            type=int,
+            default=config.get('WORKER_CONCURRENCE', 2),
+            help="Nombre d'analyses traitées en parallèle"
+        )
+        parser.add_argument(
+            '--intervalle',
+            type=float,
+            default=config.get('WORKER_INTERVALLE', 1.0),
+            help="Secondes d'attente quand la file est vide"
+        )
+        parser.add_argument(
+            '--une-fois',
+            action='store_true',
+            help="S'arrêter dès que la file est vide"
+        )
+    
+    def handle(self, *args, **options):
+        concurrence = max(1, options['concurrence'])
+        intervalle = options['intervalle']
+        file_taches = FileTaches()
+        
+        reprises = file_taches.reprendre_taches_bloquees()
+        if reprises:
+            self.stdout.write(self.style.WARNING(f"♻️ {reprises} tâche(s) bloquée(s) remise(s) en attente"))
+        
+        self.stdout.write(f"🚀 Worker démarré (concurrence: {concurrence})")
+        
+        en_cours = set()
+        
+        with ThreadPoolExecutor(max_workers=concurrence, thread_name_prefix='qg_worker') as pool:
+            try:
+                while True:
+                    # Remplir les places libres
+                    file_vide = False
+                    while len(en_cours) < concurrence:
+                        tache = file_taches.reserver()
+                        if tache is None:
+                            file_vide = True
+                            break
+                        en_cours.add(pool.submit(file_taches.executer, tache))
+                    
+                    if file_vide and not en_cours:
+                        if options['une_fois']:
+                            break
+                        time.sleep(intervalle)
+                        continue
+                    
+                    # Attendre qu'une analyse se termine (ou l'intervalle si la file est vide)
+                    terminees, en_cours = wait(
+                        en_cours,
+                        timeout=intervalle if file_vide else None,
+                        return_when=FIRST_COMPLETED
+                    )
+                    for future in terminees:
+                        self._afficher(future.result())
+            
+            except KeyboardInterrupt:
+                self.stdout.write("⏹️ Arrêt demandé, fin des analyses en cours...")
+        
+        self.stdout.write(self.style.SUCCESS("✅ Worker arrêté"))
+    
+    def _afficher(self, tache):
+        """Affiche le résultat d'une tâche traitée"""
+        if tache.analyse is not None:
+            self.stdout.write(
+                f"   #{tache.pk} {tache.nom_fichier}: {tache.analyse.score}/100"
+            )
+        else:
+            self.stdout.write(self.style.ERROR(f"   #{tache.pk} {tache.nom_fichier}: {tache.erreur}"))
\ No newline at end of file
@@ -0,0 +1,196 @@
+"""
+Métriques Prometheus
+====================
+Compteurs du quality gate gardés en mémoire et exposés sur /metrics
+au format texte de Prometheus.
+
+Les valeurs sont propres à chaque processus (comme CacheAnalyses):
+avec plusieurs workers, Prometheus agrège les cibles. Un scrape ne fait
+aucune requête en base.
+"""
+
+import math
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+
+
+# Bornes des histogrammes de durée (secondes)
+BORNES_DUREE = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Metriques:
+    """
+    Registre des métriques du processus
+    
+    Toutes les méthodes sont des classmethods: les analyseurs et le
+    service enregistrent sans avoir à se passer d'instance.
+    """
+    
+    _verrou = threading.Lock()
+    _analyses: Dict[Tuple[str, str], int] = {}
+    _durees: Dict[str, List[float]] = {}
+    _sommes: Dict[str, float] = {}
+    _timeouts: Dict[str, int] = {}
+    _refus_lint: Dict[str, int] = {}
+    _erreurs_openai: Dict[str, int] = {}
+    _simulations_openai = 0
+    _en_cours = 0
+    
+    @classmethod
+    def enregistrer_analyse(cls, outil: str, est_approuve: bool, temps_analyse: float, temps_etapes: Dict[str, float]):
+        """Compte une analyse sauvegardée et observe la durée de chaque étape"""
+        verdict = 'approuve' if est_approuve else 'rejete'
+        
+        with cls._verrou:
+            cls._analyses[(outil, verdict)] = cls._analyses.get((outil, verdict), 0) + 1
+            for etape, duree in {**temps_etapes, 'total': temps_analyse}.items():
+                cls._observer(etape, duree)
+    
+    @classmethod
+    def _observer(cls, etape: str, duree: float):
+        """Ajoute une durée à l'histogramme d'une étape (verrou déjà pris)"""
+        if etape not in cls._durees:
+            cls._durees[etape] = [0] * (len(BORNES_DUREE) + 1)
+            cls._sommes[etape] = 0.0
+        
+        compteurs = cls._durees[etape]
+        for i, borne in enumerate(BORNES_DUREE):
+            if duree <= borne:
+                compteurs[i] += 1
+        compteurs[-1] += 1
+        cls._sommes[etape] += duree
+    
+    @classmethod
+    def compter_timeout(cls, outil: str):
+        """Un sous-processus (flake8, bandit) a dépassé LINT_TIMEOUT"""
+        with cls._verrou:
+            cls._timeouts[outil] = cls._timeouts.get(outil, 0) + 1
+    
+    @classmethod
+    def compter_refus_lint(cls, outil: str):
+        """Le bac à sable a refusé de lancer un outil (serveur surchargé)"""
+        with cls._verrou:
+            cls._refus_lint[outil] = cls._refus_lint.get(outil, 0) + 1
+    
+    @classmethod
+    def compter_erreur_openai(cls, type_erreur: str):
+        """Échec d'un appel OpenAI ('api', 'json' ou 'initialisation')"""
+        with cls._verrou:
+            cls._erreurs_openai[type_erreur] = cls._erreurs_openai.get(type_erreur, 0) + 1
+    
+    @classmethod
+    def compter_simulation_openai(cls):
+        """L'IA a répondu en mode simulation (pas de clé ou pas de client)"""
+        with cls._verrou:
+            cls._simulations_openai += 1
+    
+    @classmethod
+    @contextmanager
+    def en_cours(cls, nb: int = 1) -> Iterator[None]:
+        """Incrémente la jauge des analyses en cours le temps du bloc"""
+        with cls._verrou:
+            cls._en_cours += nb
+        try:
+            yield
+        finally:
+            with cls._verrou:
+                cls._en_cours -= nb
+    
+    @classmethod
+    def exporter(cls, statistiques_cache: Dict[str, Any]) -> str:
+        """
+        Génère le texte exposé sur /metrics
+        
+        Args:
+            statistiques_cache: Compteurs de CacheAnalyses.get_statistiques()
+        """
+        with cls._verrou:
+            analyses = dict(cls._analyses)
+            durees = {etape: list(c) for etape, c in cls._durees.items()}
+            sommes = dict(cls._sommes)
+            timeouts = dict(cls._timeouts)
+            refus_lint = dict(cls._refus_lint)
+            erreurs_openai = dict(cls._erreurs_openai)
+            simulations_openai = cls._simulations_openai
+            en_cours = cls._en_cours
+        
+        lignes = []
+        
+        lignes += _entete('qualitygate_analyses_total', 'counter', "Analyses sauvegardées par outil et verdict")
+        for (outil, verdict), valeur in sorted(analyses.items()):
+            lignes.append(f"qualitygate_analyses_total{_labels(outil=outil, verdict=verdict)} {valeur}")
+        
+        lignes += _entete('qualitygate_analyses_en_cours', 'gauge', "Analyses en cours dans ce processus")
+        lignes.append(f"qualitygate_analyses_en_cours {en_cours}")
+        
+        nom = 'qualitygate_etape_duree_secondes'
+        lignes += _entete(nom, 'histogram', "Durée de chaque étape d'analyse (total = temps_analyse)")
+        for etape in sorted(durees):
+            compteurs = durees[etape]
+            for borne, valeur in zip(BORNES_DUREE, compteurs):
+                lignes.append(f"{nom}_bucket{_labels(etape=etape, le=repr(borne))} {valeur}")
+            lignes.append(f"{nom}_bucket{_labels(etape=etape, le='+Inf')} {compteurs[-1]}")
+            lignes.append(f"{nom}_sum{_labels(etape=etape)} {sommes[etape]}")
+            lignes.append(f"{nom}_count{_labels(etape=etape)} {compteurs[-1]}")
+        
+        lignes += _entete('qualitygate_timeouts_total', 'counter', "Outils arrêtés après LINT_TIMEOUT ou leurs limites")
+        for outil in ('flake8', 'bandit'):
+            lignes.append(f"qualitygate_timeouts_total{_labels(outil=outil)} {timeouts.get(outil, 0)}")
+        
+        lignes += _entete('qualitygate_lint_refus_total', 'counter', "Outils non lancés, file d'attente du bac à sable pleine")
+        for outil in ('flake8', 'bandit'):
+            lignes.append(f"qualitygate_lint_refus_total{_labels(outil=outil)} {refus_lint.get(outil, 0)}")
+        
+        lignes += _entete('qualitygate_openai_erreurs_total', 'counter', "Appels OpenAI en erreur")
+        for type_erreur in ('api', 'json', 'initialisation'):
+            lignes.append(
+                f"qualitygate_openai_erreurs_total{_labels(type=type_erreur)} {erreurs_openai.get(type_erreur, 0)}"
+            )
+        
+        lignes += _entete('qualitygate_openai_simulations_total', 'counter', "Analyses IA faites en mode simulation")
+        lignes.append(f"qualitygate_openai_simulations_total {simulations_openai}")
+        
+        lignes += _entete('qualitygate_cache_requetes_total', 'counter', "Lectures du cache des résultats")
+        for resultat in ('hits_memoire', 'hits_persistant', 'misses'):
+            lignes.append(
+                f"qualitygate_cache_requetes_total{_labels(resultat=resultat)} {statistiques_cache.get(resultat, 0)}"
+            )
+        
+        lignes += _entete('qualitygate_cache_taux_hit', 'gauge', "Taux de hit du cache (0 à 1)")
+        lignes.append(f"qualitygate_cache_taux_hit {statistiques_cache.get('taux_hit', 0) / 100}")
+        
+        lignes += _entete('qualitygate_cache_entrees_memoire', 'gauge', "Entrées du cache en mémoire")
+        lignes.append(f"qualitygate_cache_entrees_memoire {statistiques_cache.get('entrees_memoire', 0)}")
+        
+        return '\n'.join(lignes) + '\n'
+
+
+def _entete(nom: str, type_metrique: str, aide: str) -> List[str]:
+    """Lignes # HELP et # TYPE d'une métrique"""
+    return [f"# HELP {nom} {aide}", f"# TYPE {nom} {type_metrique}"]
+
+
+def _labels(**labels: str) -> str:
+    """Formate les labels Prometheus en échappant les valeurs"""
+    valeurs = []
+    for nom, valeur in labels.items():
+        valeur = str(valeur).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        valeurs.append(f'{nom}="{valeur}"')
+    return '{' + ','.join(valeurs) + '}'
+
+
+def percentiles(valeurs: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 d'une série, par la méthode du rang le plus proche"""
+    valeurs = sorted(valeurs)
+    n = len(valeurs)
+    
+    def rang(p):
+        return valeurs[max(0, math.ceil(p / 100 * n) - 1)]
+    
+    return {
+        'nb': n,
+        'p50': round(rang(50), 4),
+        'p95': round(rang(95), 4),
+        'p99': round(rang(99), 4),
+    }
\ No newline at end of file
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultatCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cle', models.CharField(max_length=64, unique=True, verbose_name='Clé (SHA-256)')),
+                ('resultats', models.JSONField(default=dict, verbose_name='Problèmes par étape')),
+                ('nb_hits', models.IntegerField(default=0)),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+                ('date_acces', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Dernier accès')),
+            ],
+            options={
+                'verbose_name': 'Résultat en cache',
+                'verbose_name_plural': 'Résultats en cache',
+            },
+        ),
+    ]
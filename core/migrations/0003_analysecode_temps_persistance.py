@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_resultatcache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysecode',
+            name='temps_persistance',
+            field=models.FloatField(default=0.0, help_text="Écriture de l'analyse et de ses problèmes en base", verbose_name='Temps de sauvegarde (secondes)'),
+        ),
+    ]
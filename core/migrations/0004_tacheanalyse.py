@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_analysecode_temps_persistance'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TacheAnalyse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nom_fichier', models.CharField(max_length=255)),
+                ('outil', models.CharField(choices=[('SQL', 'SQL'), ('Python', 'Python'), ('DAX', 'DAX (Power BI)'), ('PowerQuery', 'Power Query (M)')], default='Python', max_length=20)),
+                ('contenu', models.TextField()),
+                ('description', models.TextField(blank=True)),
+                ('options', models.JSONField(blank=True, help_text="Options d'analyse (flake8, bandit, ia)", null=True)),
+                ('statut', models.CharField(choices=[('en_attente', 'En attente'), ('en_cours', 'En cours'), ('terminee', 'Terminée'), ('echec', 'Échec')], db_index=True, default='en_attente', max_length=20)),
+                ('erreur', models.TextField(blank=True)),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+                ('date_debut', models.DateTimeField(blank=True, null=True)),
+                ('date_fin', models.DateTimeField(blank=True, null=True)),
+                ('analyse', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='taches', to='core.analysecode', verbose_name='Analyse produite')),
+                ('auteur', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': "Tâche d'analyse",
+                'verbose_name_plural': "Tâches d'analyse",
+                'ordering': ['date_creation'],
+            },
+        ),
+    ]
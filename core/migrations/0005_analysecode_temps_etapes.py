@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_tacheanalyse'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysecode',
+            name='temps_etapes',
+            field=models.JSONField(blank=True, default=dict, help_text='manuel, flake8, bandit, openai, score, persistance', verbose_name='Temps par étape (secondes)'),
+        ),
+    ]
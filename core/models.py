@@ -46,6 +46,14 @@ class SourceAnalyse(models.TextChoices):
     OPENAI = 'openai', 'OpenAI'
 
 
+class StatutTache(models.TextChoices):
+    """État d'une analyse soumise en mode asynchrone"""
+    EN_ATTENTE = 'en_attente', 'En attente'
+    EN_COURS = 'en_cours', 'En cours'
+    TERMINEE = 'terminee', 'Terminée'
+    ECHEC = 'echec', 'Échec'
+
+
 class AnalyseCode(models.Model):
     """
     Modèle principal: Une analyse de code
@@ -96,6 +104,19 @@ class AnalyseCode(models.Model):
         verbose_name="Temps d'analyse (secondes)"
     )
     
+    temps_persistance = models.FloatField(
+        default=0.0,
+        verbose_name="Temps de sauvegarde (secondes)",
+        help_text="Écriture de l'analyse et de ses problèmes en base"
+    )
+    
+    temps_etapes = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name="Temps par étape (secondes)",
+        help_text="manuel, flake8, bandit, openai, score, persistance"
+    )
+    
     # Statistiques par outil
     nb_problemes_total = models.IntegerField(default=0)
     nb_critiques = models.IntegerField(default=0)
@@ -240,4 +261,108 @@ class Probleme(models.Model):
             'openai': 'success',
             'manuel': 'secondary'
         }
-        return colors.get(self.source, 'secondary')
\ No newline at end of file
+        return colors.get(self.source, 'secondary')
+
+
+class ResultatCache(models.Model):
+    """
+    Résultat d'analyse mis en cache (niveau persistant du cache)
+    
+    La clé est un hash du code, du langage, des options et de la
+    configuration: deux soumissions identiques donnent les mêmes problèmes.
+    """
+    
+    cle = models.CharField(
+        max_length=64,
+        unique=True,
+        verbose_name="Clé (SHA-256)"
+    )
+    
+    # Problèmes par étape: {'manuel': [...], 'flake8': [...], ...}
+    resultats = models.JSONField(
+        default=dict,
+        verbose_name="Problèmes par étape"
+    )
+    
+    nb_hits = models.IntegerField(default=0)
+    
+    date_creation = models.DateTimeField(auto_now_add=True)
+    
+    date_acces = models.DateTimeField(
+        default=timezone.now,
+        db_index=True,  # Utilisé pour l'éviction LRU
+        verbose_name="Dernier accès"
+    )
+    
+    class Meta:
+        verbose_name = "Résultat en cache"
+        verbose_name_plural = "Résultats en cache"
+    
+    def __str__(self):
+        return f"{self.cle[:12]}... ({self.nb_hits} hits)"
+
+
+class TacheAnalyse(models.Model):
+    """
+    Une analyse en file d'attente (mode asynchrone de l'API)
+    
+    L'API crée la tâche et répond tout de suite; la commande
+    `manage.py worker_analyses` la traite et crée l'AnalyseCode.
+    """
+    
+    # Soumission
+    nom_fichier = models.CharField(max_length=255)
+    
+    outil = models.CharField(
+        max_length=20,
+        choices=OutilBI.choices,
+        default=OutilBI.PYTHON
+    )
+    
+    contenu = models.TextField()
+    
+    description = models.TextField(blank=True)
+    
+    options = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Options d'analyse (flake8, bandit, ia)"
+    )
+    
+    # Suivi
+    statut = models.CharField(
+        max_length=20,
+        choices=StatutTache.choices,
+        default=StatutTache.EN_ATTENTE,
+        db_index=True
+    )
+    
+    analyse = models.ForeignKey(
+        AnalyseCode,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='taches',
+        verbose_name="Analyse produite"
+    )
+    
+    erreur = models.TextField(blank=True)
+    
+    date_creation = models.DateTimeField(auto_now_add=True)
+    date_debut = models.DateTimeField(null=True, blank=True)
+    date_fin = models.DateTimeField(null=True, blank=True)
+    
+    auteur = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+    
+    class Meta:
+        verbose_name = "Tâche d'analyse"
+        verbose_name_plural = "Tâches d'analyse"
+        ordering = ['date_creation']  # File FIFO
+    
+    def __str__(self):
+        return f"#{self.pk} {self.nom_fichier} ({self.statut})"
\ No newline at end of file
@@ -5,13 +5,23 @@ Orchestre tous les analyseurs et crée les résultats.
 """
 
 import time
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
 
 from .models import AnalyseCode, Probleme
 from .analyzers import AnalyseurStatique, AnalyseurPythonTools, AnalyseurIA
-from django.db import models
+from .analyzers.lignes_modifiees import LignesModifiees
+from .executeur import ExecuteurEtapes
+from .cache import CacheAnalyses
+from .metriques import Metriques, percentiles
+from django.db import connection, models, transaction
+
+# Cache pas encore consulté pour un fichier (None veut dire: absent du cache)
+_NON_LU = object()
 
 
 class QualityGateService:
@@ -30,6 +40,8 @@ class QualityGateService:
         self.analyseur_statique = AnalyseurStatique()
         self.analyseur_python = AnalyseurPythonTools()
         self.analyseur_ia = AnalyseurIA()
+        self.executeur = ExecuteurEtapes()
+        self.cache = CacheAnalyses()
         self.config = settings.QUALITY_GATE_CONFIG
     
     def analyser_code(
@@ -39,7 +51,8 @@ class QualityGateService:
         contenu: str,
         description: str = "",
         auteur=None,
-        options: Dict[str, bool] = None
+        options: Dict[str, bool] = None,
+        lignes_modifiees: LignesModifiees = None
     ) -> AnalyseCode:
         """
         Lance une analyse complète et sauvegarde les résultats
@@ -51,12 +64,268 @@ class QualityGateService:
             description: Description du code
             auteur: Utilisateur Django (optionnel)
             options: Options d'analyse (flake8, bandit, ia)
+            lignes_modifiees: Si fourni (mode incrémental), seuls les
+                problèmes de ces lignes sont gardés et l'IA ne voit qu'elles
         
         Returns:
             Instance AnalyseCode avec tous les résultats
         """
+        with Metriques.en_cours():
+            analyse, problemes = self._preparer_analyse(
+                nom_fichier, outil, contenu, description, auteur, options,
+                lignes_modifiees=lignes_modifiees
+            )
+            
+            # ===== ÉTAPE 6: Sauvegarde en base de données =====
+            return self._sauvegarder(analyse, problemes)
+    
+    async def analyser_code_async(
+        self,
+        nom_fichier: str,
+        outil: str,
+        contenu: str,
+        description: str = "",
+        auteur=None,
+        options: Dict[str, bool] = None
+    ) -> AnalyseCode:
+        """
+        Version asynchrone de analyser_code (vues ASGI)
+        
+        Les étapes tournent comme des coroutines (sous-processus asyncio,
+        client OpenAI asynchrone). Les accès à la base passent par
+        sync_to_async, sur le thread dédié à l'ORM.
+        """
+        debut = time.time()
+        
+        if options is None:
+            options = {
+                'utiliser_flake8': True,
+                'utiliser_bandit': True,
+                'utiliser_ia': True
+            }
+        
+        with Metriques.en_cours():
+            cle_cache = self.cache.calculer_cle(contenu, outil, description, options)
+            resultats = await sync_to_async(self.cache.lire)(cle_cache)
+            durees = {}
+            
+            if resultats is None:
+                resultats, durees, reutilisable = await self._executer_analyseurs_async(
+                    contenu, outil, description, options
+                )
+                if reutilisable:
+                    await sync_to_async(self.cache.ecrire)(cle_cache, resultats)
+            
+            analyse, problemes = self._construire_analyse(
+                nom_fichier, outil, contenu, description, auteur, resultats, debut, durees
+            )
+            
+            return await sync_to_async(self._sauvegarder)(analyse, problemes)
+    
+    def analyser_code_au_fil(
+        self,
+        nom_fichier: str,
+        outil: str,
+        contenu: str,
+        description: str = "",
+        auteur=None,
+        options: Dict[str, bool] = None
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Comme analyser_code, mais rend un événement par étape terminée
+        
+        Les règles manuelles (quelques millisecondes) arrivent sans attendre
+        Flake8, Bandit ou l'IA.
+        
+        Yields:
+            ('etape', {'etape', 'problemes', 'duree'}) pour chaque étape,
+            puis ('resultat', {'id', 'score', 'est_approuve', ...}) une fois
+            l'analyse sauvegardée
+        """
+        debut = time.time()
+        
+        if options is None:
+            options = {
+                'utiliser_flake8': True,
+                'utiliser_bandit': True,
+                'utiliser_ia': True
+            }
+        
+        with Metriques.en_cours():
+            cle_cache = self.cache.calculer_cle(contenu, outil, description, options)
+            resultats = self.cache.lire(cle_cache)
+            durees = {}
+            
+            if resultats is not None:
+                for etape, problemes in resultats.items():
+                    yield 'etape', {'etape': etape, 'problemes': problemes, 'duree': 0.0}
+            else:
+                resultats = {}
+                etapes = self._etapes(contenu, outil, description, options)
+                reutilisable = True
+                
+                for etape, problemes, duree in self.executeur.executer_au_fil(etapes):
+                    if etape == 'openai':
+                        problemes, incident = problemes
+                        reutilisable = not incident
+                    resultats[etape] = problemes
+                    durees[etape] = duree
+                    yield 'etape', {'etape': etape, 'problemes': problemes, 'duree': round(duree, 4)}
+                
+                # Même ordre que _executer_analyseurs pour la clé de cache
+                resultats = {etape: resultats[etape] for etape in etapes}
+                if reutilisable:
+                    self.cache.ecrire(cle_cache, resultats)
+            
+            analyse, problemes = self._construire_analyse(
+                nom_fichier, outil, contenu, description, auteur, resultats, debut, durees
+            )
+            analyse = self._sauvegarder(analyse, problemes)
+            
+            yield 'resultat', {
+                'id': analyse.pk,
+                'score': analyse.score,
+                'est_approuve': analyse.est_approuve,
+                'temps_analyse': analyse.temps_analyse,
+                'temps_etapes': analyse.temps_etapes,
+                'statistiques': {
+                    'total': analyse.nb_problemes_total,
+                    'critiques': analyse.nb_critiques,
+                    'warnings': analyse.nb_warnings,
+                    'infos': analyse.nb_infos,
+                },
+            }
+    
+    def analyser_lot(
+        self,
+        fichiers: List[Dict[str, str]],
+        auteur=None,
+        options: Dict[str, bool] = None
+    ) -> List[Union[AnalyseCode, Exception]]:
+        """
+        Analyse plusieurs fichiers en parallèle et les sauvegarde en une fois
+        
+        Args:
+            fichiers: Liste de {nom_fichier, outil, contenu, description},
+                avec éventuellement lignes_modifiees (voir analyser_code)
+            auteur: Utilisateur Django (optionnel)
+            options: Options d'analyse communes à tous les fichiers
+        
+        Returns:
+            Une entrée par fichier, dans l'ordre: l'AnalyseCode sauvegardée,
+            ou l'exception levée pendant l'analyse de ce fichier
+        """
+        precalcules, en_cache = self._lint_lot(fichiers, options)
+        
+        def preparer(fichier, precalcule, resultats_caches):
+            try:
+                return self._preparer_analyse(
+                    fichier.get('nom_fichier', 'code.py'),
+                    fichier.get('outil', 'Python'),
+                    fichier.get('contenu', ''),
+                    fichier.get('description', ''),
+                    auteur,
+                    options,
+                    precalcule,
+                    fichier.get('lignes_modifiees'),
+                    resultats_caches
+                )
+            except Exception as e:
+                return e
+            finally:
+                # Le cache lit la base depuis ce thread
+                connection.close()
+        
+        with Metriques.en_cours(len(fichiers)):
+            nb_threads = self.config.get('MAX_ANALYSES_LOT', 4)
+            with ThreadPoolExecutor(max_workers=nb_threads, thread_name_prefix='qg_lot') as pool:
+                preparees = list(pool.map(preparer, fichiers, precalcules, en_cache))
+            
+            a_sauvegarder = [p for p in preparees if not isinstance(p, Exception)]
+            self._sauvegarder_lot(a_sauvegarder)
+        
+        return [p if isinstance(p, Exception) else p[0] for p in preparees]
+    
+    def _lint_lot(
+        self,
+        fichiers: List[Dict[str, str]],
+        options: Dict[str, bool] = None
+    ) -> Tuple[List[Dict[str, List[Dict]]], List[Optional[Dict[str, List[Dict]]]]]:
+        """
+        Lance Flake8 et Bandit une seule fois pour tous les fichiers Python du lot
+        
+        Le cache est consulté une fois par fichier, et seuls les fichiers
+        absents du cache sont analysés.
+        
+        Returns:
+            Tuple de deux listes, avec une entrée par fichier:
+            - {'flake8': [...], 'bandit': [...]} déjà calculés (vide si le
+              fichier n'en a pas besoin)
+            - les résultats trouvés en cache, ou None
+        """
+        options = options or {}
+        flake8 = options.get('utiliser_flake8', True)
+        bandit = options.get('utiliser_bandit', True)
+        precalcules = [{} for _ in fichiers]
+        
+        en_cache = [
+            self.cache.lire(self._cle_cache(
+                fichier.get('contenu', ''), fichier.get('outil', 'Python'),
+                fichier.get('description', ''), options, fichier.get('lignes_modifiees')
+            ))
+            for fichier in fichiers
+        ]
+        
+        a_linter = [
+            i for i, fichier in enumerate(fichiers)
+            if fichier.get('outil', 'Python') == 'Python' and (flake8 or bandit)
+            and en_cache[i] is None
+        ]
+        
+        # Un seul fichier: le pool de travailleurs fait aussi bien
+        if len(a_linter) < 2:
+            return precalcules, en_cache
+        
+        try:
+            resultats = self.analyseur_python.analyser_lot(
+                [fichiers[i].get('contenu', '') for i in a_linter], flake8, bandit
+            )
+        except Exception as e:
+            print(f"Erreur lint du lot: {e}")
+            return precalcules, en_cache
+        
+        for i, resultat in zip(a_linter, resultats):
+            precalcules[i] = resultat
+        
+        return precalcules, en_cache
+    
+    def _preparer_analyse(
+        self,
+        nom_fichier: str,
+        outil: str,
+        contenu: str,
+        description: str = "",
+        auteur=None,
+        options: Dict[str, bool] = None,
+        precalcule: Dict[str, List[Dict]] = None,
+        lignes_modifiees: LignesModifiees = None,
+        resultats_caches: Optional[Dict[str, List[Dict]]] = _NON_LU
+    ) -> Tuple[AnalyseCode, List[Dict]]:
+        """
+        Lance les analyseurs et construit l'analyse, sans rien sauvegarder
+        
+        Args:
+            precalcule: Problèmes des étapes déjà exécutées pour tout un lot
+                ({'flake8': [...], ...}), repris tels quels
+            lignes_modifiees: Lignes modifiées par un diff: les problèmes
+                des autres lignes sont écartés
+            resultats_caches: Résultat du cache déjà lu pour ce fichier
+                (None si absent), pour ne pas le relire
+        
+        Returns:
+            Tuple (AnalyseCode non sauvegardée, liste de tous les problèmes)
+        """
         debut = time.time()
-        tous_les_problemes: List[Dict] = []
         
         # Options par défaut
         if options is None:
@@ -66,42 +335,68 @@ class QualityGateService:
                 'utiliser_ia': True
             }
         
-        # ===== ÉTAPE 1: Analyse statique (règles manuelles) =====
-        problemes_manuels = self.analyseur_statique.analyser(contenu, outil)
-        tous_les_problemes.extend(problemes_manuels)
+        # ===== ÉTAPES 1 à 3: Analyseurs (ou résultat en cache) =====
+        cle_cache = self._cle_cache(contenu, outil, description, options, lignes_modifiees)
+        resultats = resultats_caches
+        if resultats is _NON_LU:
+            resultats = self.cache.lire(cle_cache)
+        durees = {}
         
-        # ===== ÉTAPE 2: Flake8 + Bandit (Python uniquement) =====
-        problemes_flake8 = []
-        problemes_bandit = []
+        if resultats is None:
+            resultats, durees, reutilisable = self._executer_analyseurs(
+                contenu, outil, description, options, precalcule, lignes_modifiees
+            )
+            if lignes_modifiees is not None:
+                resultats = {etape: lignes_modifiees.filtrer(problemes) for etape, problemes in resultats.items()}
+            if reutilisable:
+                self.cache.ecrire(cle_cache, resultats)
         
-        if outil == 'Python':
-            if options.get('utiliser_flake8', True):
-                flake8, _ = self.analyseur_python.analyser(contenu)
-                problemes_flake8 = flake8
-                tous_les_problemes.extend(flake8)
-            if options.get('utiliser_bandit', True):
-                _, bandit = self.analyseur_python.analyser(contenu)
-                problemes_bandit = bandit
-                tous_les_problemes.extend(bandit)
+        return self._construire_analyse(
+            nom_fichier, outil, contenu, description, auteur, resultats, debut, durees
+        )
+    
+    def _construire_analyse(
+        self,
+        nom_fichier: str,
+        outil: str,
+        contenu: str,
+        description: str,
+        auteur,
+        resultats: Dict[str, List[Dict]],
+        debut: float,
+        durees: Dict[str, float] = None
+    ) -> Tuple[AnalyseCode, List[Dict]]:
+        """
+        Fusionne les problèmes par étape, calcule le score et la décision
         
-        # ===== ÉTAPE 3: Analyse IA =====
-        problemes_ia = []
-        if options.get('utiliser_ia', True):
-            problemes_ia = self.analyseur_ia.analyser(contenu, outil, description)
-            tous_les_problemes.extend(problemes_ia)
+        Args:
+            durees: Durée de chaque analyseur exécuté (vide si le résultat
+                vient du cache)
+        
+        Returns:
+            Tuple (AnalyseCode non sauvegardée, liste de tous les problèmes)
+        """
+        debut_score = time.time()
+        tous_les_problemes: List[Dict] = []
+        
+        # Fusion dans le même ordre qu'une exécution séquentielle
+        for etape in ('manuel', 'flake8', 'bandit', 'openai'):
+            tous_les_problemes.extend(resultats.get(etape, []))
         
         # ===== ÉTAPE 4: Calcul du score =====
         score = self._calculer_score(tous_les_problemes)
         
         # ===== ÉTAPE 5: Décision finale =====
-        nb_critiques = sum(1 for p in tous_les_problemes if p.get('severite') == 'critique')
+        compteurs = self._compter_problemes(tous_les_problemes)
         seuil = self.config.get('SCORE_MINIMUM', 70)
-        est_approuve = nb_critiques == 0 and score >= seuil
+        est_approuve = compteurs['critique'] == 0 and score >= seuil
+        
+        temps_etapes = {etape: round(duree, 4) for etape, duree in (durees or {}).items()}
+        temps_etapes['score'] = round(time.time() - debut_score, 4)
         
         temps_analyse = time.time() - debut
         
-        # ===== ÉTAPE 6: Sauvegarde en base de données =====
-        analyse = AnalyseCode.objects.create(
+        analyse = AnalyseCode(
             nom_fichier=nom_fichier,
             outil=outil,
             contenu_code=contenu,
@@ -109,20 +404,128 @@ class QualityGateService:
             score=score,
             est_approuve=est_approuve,
             temps_analyse=temps_analyse,
+            temps_etapes=temps_etapes,
             nb_problemes_total=len(tous_les_problemes),
-            nb_critiques=nb_critiques,
-            nb_warnings=sum(1 for p in tous_les_problemes if p.get('severite') == 'warning'),
-            nb_infos=sum(1 for p in tous_les_problemes if p.get('severite') == 'info'),
-            nb_flake8=len(problemes_flake8),
-            nb_bandit=len(problemes_bandit),
-            nb_openai=len(problemes_ia),
-            nb_manuel=len(problemes_manuels),
+            nb_critiques=compteurs['critique'],
+            nb_warnings=compteurs['warning'],
+            nb_infos=compteurs['info'],
+            nb_flake8=compteurs['flake8'],
+            nb_bandit=compteurs['bandit'],
+            nb_openai=compteurs['openai'],
+            nb_manuel=compteurs['manuel'],
             auteur=auteur
         )
         
-        # Sauvegarder chaque problème
-        for prob in tous_les_problemes:
-            Probleme.objects.create(
+        return analyse, tous_les_problemes
+    
+    def _compter_problemes(self, problemes: List[Dict]) -> Dict[str, int]:
+        """
+        Compte les problèmes par sévérité et par source en un seul parcours
+        
+        Les sévérités inconnues comptent comme 'info' et les sources inconnues
+        comme 'manuel', comme les valeurs par défaut de Probleme.
+        """
+        compteurs = {
+            'critique': 0, 'warning': 0, 'info': 0,
+            'manuel': 0, 'flake8': 0, 'bandit': 0, 'openai': 0,
+        }
+        
+        for p in problemes:
+            severite = p.get('severite', 'info')
+            source = p.get('source', 'manuel')
+            compteurs[severite if severite in ('critique', 'warning') else 'info'] += 1
+            compteurs[source if source in ('flake8', 'bandit', 'openai') else 'manuel'] += 1
+        
+        return compteurs
+    
+    def _sauvegarder(self, analyse: AnalyseCode, problemes: List[Dict]) -> AnalyseCode:
+        """
+        Enregistre l'analyse et tous ses problèmes dans une seule transaction
+        
+        Les problèmes sont insérés par lots (bulk_create) au lieu d'un INSERT
+        et d'un commit par problème. La durée de la sauvegarde est mesurée
+        à part dans temps_persistance.
+        """
+        debut = time.time()
+        
+        with transaction.atomic():
+            analyse.save()
+            
+            Probleme.objects.bulk_create(
+                self._creer_problemes(analyse, problemes),
+                batch_size=self.config.get('TAILLE_LOT_PROBLEMES', 500)
+            )
+            
+            analyse.temps_persistance = time.time() - debut
+            analyse.temps_etapes['persistance'] = round(analyse.temps_persistance, 4)
+            AnalyseCode.objects.filter(pk=analyse.pk).update(
+                temps_persistance=analyse.temps_persistance,
+                temps_etapes=analyse.temps_etapes
+            )
+        
+        self._enregistrer_metriques(analyse)
+        
+        return analyse
+    
+    def _sauvegarder_lot(self, preparees: List[Tuple[AnalyseCode, List[Dict]]]):
+        """
+        Enregistre plusieurs analyses et leurs problèmes dans une seule transaction
+        
+        temps_persistance reçoit la part de chaque analyse dans la durée
+        totale de la sauvegarde du lot.
+        """
+        if not preparees:
+            return
+        
+        debut = time.time()
+        taille_lot = self.config.get('TAILLE_LOT_PROBLEMES', 500)
+        analyses = [analyse for analyse, _ in preparees]
+        
+        with transaction.atomic():
+            if connection.features.can_return_rows_from_bulk_insert:
+                AnalyseCode.objects.bulk_create(analyses, batch_size=taille_lot)
+            else:
+                # Sans RETURNING, bulk_create ne renseigne pas les clés primaires
+                for analyse in analyses:
+                    analyse.save()
+            
+            Probleme.objects.bulk_create(
+                [
+                    probleme
+                    for analyse, problemes in preparees
+                    for probleme in self._creer_problemes(analyse, problemes)
+                ],
+                batch_size=taille_lot
+            )
+            
+            temps_persistance = (time.time() - debut) / len(analyses)
+            for analyse in analyses:
+                analyse.temps_persistance = temps_persistance
+                analyse.temps_etapes['persistance'] = round(temps_persistance, 4)
+            
+            # temps_etapes diffère d'une analyse à l'autre: une seule requête UPDATE par lot
+            AnalyseCode.objects.bulk_update(
+                analyses,
+                ['temps_persistance', 'temps_etapes'],
+                batch_size=taille_lot
+            )
+        
+        for analyse in analyses:
+            self._enregistrer_metriques(analyse)
+    
+    def _enregistrer_metriques(self, analyse: AnalyseCode):
+        """Met à jour les métriques /metrics après la sauvegarde d'une analyse"""
+        Metriques.enregistrer_analyse(
+            analyse.outil,
+            analyse.est_approuve,
+            analyse.temps_analyse,
+            analyse.temps_etapes
+        )
+    
+    def _creer_problemes(self, analyse: AnalyseCode, problemes: List[Dict]) -> List[Probleme]:
+        """Convertit les dictionnaires des analyseurs en instances Probleme"""
+        return [
+            Probleme(
                 analyse=analyse,
                 severite=prob.get('severite', 'info'),
                 categorie=prob.get('categorie', 'lisibilite'),
@@ -133,8 +536,134 @@ class QualityGateService:
                 colonne=prob.get('colonne'),
                 code_erreur=prob.get('code_erreur', '')
             )
+            for prob in problemes
+        ]
+    
+    def _executer_analyseurs(
+        self,
+        contenu: str,
+        outil: str,
+        description: str,
+        options: Dict[str, bool],
+        precalcule: Dict[str, List[Dict]] = None,
+        lignes_modifiees: LignesModifiees = None
+    ) -> Tuple[Dict[str, List[Dict]], Dict[str, float], bool]:
+        """
+        Lance les analyseurs en parallèle
         
-        return analyse
+        Returns:
+            Tuple (problèmes par étape: {'manuel': [...], 'flake8': [...], ...},
+            durée de chaque étape en secondes, vrai si le résultat peut être
+            mis en cache)
+        """
+        resultats, durees = self.executeur.executer(
+            self._etapes(contenu, outil, description, options, precalcule, lignes_modifiees)
+        )
+        resultats, reutilisable = self._separer_incident(resultats)
+        return resultats, durees, reutilisable
+    
+    async def _executer_analyseurs_async(
+        self,
+        contenu: str,
+        outil: str,
+        description: str,
+        options: Dict[str, bool]
+    ) -> Tuple[Dict[str, List[Dict]], Dict[str, float], bool]:
+        """
+        Lance les analyseurs en parallèle sur la boucle d'événements
+        
+        Mêmes étapes que _etapes(), dans le même ordre, et même résultat
+        que _executer_analyseurs.
+        """
+        # Les règles manuelles sont du calcul pur: un thread hors ORM suffit
+        etapes = {
+            'manuel': sync_to_async(self.analyseur_statique.analyser, thread_sensitive=False)(contenu, outil)
+        }
+        
+        if outil == 'Python':
+            if options.get('utiliser_flake8', True):
+                etapes['flake8'] = self.analyseur_python.analyser_flake8_async(contenu)
+            if options.get('utiliser_bandit', True):
+                etapes['bandit'] = self.analyseur_python.analyser_bandit_async(contenu)
+        
+        if options.get('utiliser_ia', True):
+            etapes['openai'] = self.analyseur_ia.analyser_detaille_async(contenu, outil, description)
+        
+        resultats, durees = await self.executeur.executer_async(etapes)
+        resultats, reutilisable = self._separer_incident(resultats)
+        return resultats, durees, reutilisable
+    
+    def _etapes(
+        self,
+        contenu: str,
+        outil: str,
+        description: str,
+        options: Dict[str, bool],
+        precalcule: Dict[str, List[Dict]] = None,
+        lignes_modifiees: LignesModifiees = None
+    ) -> Dict[str, Any]:
+        """
+        Construit les étapes à lancer selon le langage et les options
+        
+        Avec `lignes_modifiees`, les règles manuelles et l'IA ne reçoivent
+        que les parties modifiées du code.
+        """
+        # Chaque outil activé n'est exécuté qu'une seule fois
+        if lignes_modifiees is None:
+            etapes = {
+                'manuel': partial(self.analyseur_statique.analyser, contenu, outil)
+            }
+        else:
+            etapes = {
+                'manuel': partial(self.analyseur_statique.analyser_lignes, contenu, outil, lignes_modifiees)
+            }
+        precalcule = precalcule or {}
+        
+        # Flake8 + Bandit (Python uniquement), sauf s'ils ont déjà tourné sur tout le lot
+        if outil == 'Python':
+            if options.get('utiliser_flake8', True):
+                if 'flake8' in precalcule:
+                    etapes['flake8'] = partial(list, precalcule['flake8'])
+                else:
+                    etapes['flake8'] = partial(self.analyseur_python.analyser_flake8, contenu)
+            if options.get('utiliser_bandit', True):
+                if 'bandit' in precalcule:
+                    etapes['bandit'] = partial(list, precalcule['bandit'])
+                else:
+                    etapes['bandit'] = partial(self.analyseur_python.analyser_bandit, contenu)
+        
+        # Analyse IA (rend un ResultatIA, voir _separer_incident)
+        if options.get('utiliser_ia', True):
+            etapes['openai'] = partial(self.analyseur_ia.analyser_detaille, contenu, outil, description, lignes_modifiees)
+        
+        return etapes
+    
+    @staticmethod
+    def _separer_incident(resultats: Dict[str, Any]) -> Tuple[Dict[str, List[Dict]], bool]:
+        """
+        Garde les problèmes de l'étape IA et dit si le résultat peut être mis en cache
+        
+        Une IA qui n'a pas répondu ne change pas les problèmes (aucun, ou la
+        simulation), mais ce résultat ne doit pas être réutilisé.
+        """
+        ia = resultats.get('openai')
+        if ia is None:
+            return resultats, True
+        return {**resultats, 'openai': ia.problemes}, not ia.incident
+    
+    def _cle_cache(
+        self,
+        contenu: str,
+        outil: str,
+        description: str,
+        options: Dict[str, bool],
+        lignes_modifiees: LignesModifiees = None
+    ) -> str:
+        """Clé du cache, qui distingue une analyse limitée à des lignes modifiées"""
+        portee = ''
+        if lignes_modifiees is not None:
+            portee = f"{lignes_modifiees.empreinte()}+{self.config.get('DIFF_CONTEXTE', 3)}"
+        return self.cache.calculer_cle(contenu, outil, description, options, portee)
     
     def _calculer_score(self, problemes: List[Dict]) -> int:
         """
@@ -162,6 +691,61 @@ class QualityGateService:
         
         return max(0, score)
     
+    def resume_fichier(self, analyse: AnalyseCode) -> Dict[str, Any]:
+        """Résumé d'une analyse tel qu'il apparaît dans le rapport global"""
+        return {
+            'fichier': analyse.nom_fichier,
+            'score': analyse.score,
+            'approuve': analyse.est_approuve,
+            'critiques': analyse.nb_critiques,
+            'warnings': analyse.nb_warnings,
+            'infos': analyse.nb_infos,
+            'flake8': analyse.nb_flake8,
+            'bandit': analyse.nb_bandit,
+            'openai': analyse.nb_openai
+        }
+    
+    def rapport_global(self, resultats: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Verdict global d'un ensemble de fichiers
+        
+        Utilisé par le runner GitHub Actions et l'API batch:
+        - PASSED si aucun critique et score moyen >= SCORE_MINIMUM
+        - FAILED sinon
+        - ERROR si aucun fichier n'a pu être analysé
+        
+        Args:
+            resultats: Résumés produits par resume_fichier()
+        """
+        if not resultats:
+            return {
+                'status': 'ERROR',
+                'score': 0,
+                'critiques': 0,
+                'warnings': 0,
+                'infos': 0,
+                'flake8': 0,
+                'bandit': 0,
+                'openai': 0,
+                'files': []
+            }
+        
+        score_moyen = sum(r['score'] for r in resultats) // len(resultats)
+        total_critiques = sum(r['critiques'] for r in resultats)
+        seuil = self.config.get('SCORE_MINIMUM', 70)
+        
+        return {
+            'status': 'PASSED' if total_critiques == 0 and score_moyen >= seuil else 'FAILED',
+            'score': score_moyen,
+            'critiques': total_critiques,
+            'warnings': sum(r['warnings'] for r in resultats),
+            'infos': sum(r['infos'] for r in resultats),
+            'flake8': sum(r['flake8'] for r in resultats),
+            'bandit': sum(r['bandit'] for r in resultats),
+            'openai': sum(r['openai'] for r in resultats),
+            'files': resultats
+        }
+    
     def get_statistiques_globales(self) -> Dict[str, Any]:
         """
         Retourne des statistiques globales sur toutes les analyses
@@ -176,7 +760,9 @@ class QualityGateService:
                 'score_moyen': 0,
                 'taux_approbation': 0,
                 'par_outil': {},
-                'problemes_frequents': []
+                'problemes_frequents': [],
+                'temps_etapes': {'global': {}, 'par_outil': {}},
+                'cache': CacheAnalyses.get_statistiques()
             }
         
         stats = AnalyseCode.objects.aggregate(
@@ -203,7 +789,38 @@ class QualityGateService:
             'taux_approbation': round((stats['total_approuve'] / total) * 100, 1),
             'total_problemes': stats['total_problemes'] or 0,
             'par_outil': {item['outil']: item for item in par_outil},
-            'problemes_frequents': list(problemes_frequents)
+            'problemes_frequents': list(problemes_frequents),
+            'temps_etapes': self._percentiles_temps(),
+            'cache': CacheAnalyses.get_statistiques()
+        }
+    
+    def _percentiles_temps(self) -> Dict[str, Any]:
+        """
+        p50/p95/p99 de la durée de chaque étape, globalement et par outil
+        
+        Calculés sur les STATS_FENETRE_TEMPS analyses les plus récentes.
+        'total' correspond à temps_analyse.
+        """
+        fenetre = self.config.get('STATS_FENETRE_TEMPS', 1000)
+        analyses = AnalyseCode.objects.order_by('-date_creation').values_list(
+            'outil', 'temps_analyse', 'temps_etapes'
+        )[:fenetre]
+        
+        durees_global: Dict[str, List[float]] = {}
+        durees_par_outil: Dict[str, Dict[str, List[float]]] = {}
+        
+        for outil, temps_analyse, temps_etapes in analyses:
+            durees_outil = durees_par_outil.setdefault(outil, {})
+            for etape, duree in {**(temps_etapes or {}), 'total': temps_analyse}.items():
+                durees_global.setdefault(etape, []).append(duree)
+                durees_outil.setdefault(etape, []).append(duree)
+        
+        return {
+            'global': {etape: percentiles(d) for etape, d in durees_global.items()},
+            'par_outil': {
+                outil: {etape: percentiles(d) for etape, d in durees.items()}
+                for outil, durees in durees_par_outil.items()
+            },
         }
     
     def get_outils_status(self) -> Dict[str, bool]:
@@ -0,0 +1,188 @@
+"""
+Serveur OpenAI Local
+====================
+Remplaçant local de l'endpoint chat/completions d'OpenAI, pour tester
+AnalyseurIA en charge sans consommer de crédits.
+
+Contrairement à _simulation_analyse, les requêtes passent vraiment par le
+client OpenAI et le réseau. On peut régler:
+- la latence (fixe, normale, lognormale ou exponentielle)
+- un taux d'erreurs 429 (rate limit) et 500
+- le contenu renvoyé (réponse par défaut, fichier JSON, ou JSON invalide)
+
+Lancement:
+    python manage.py serveur_openai --port 8001 --latence 800 --taux-429 0.05
+puis dans QUALITY_GATE_CONFIG (ou l'environnement):
+    OPENAI_BASE_URL = 'http://127.0.0.1:8001/v1'
+"""
+
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+
+DISTRIBUTIONS = ['fixe', 'normale', 'lognormale', 'exponentielle']
+
+# Réponse renvoyée quand aucun fichier n'est fourni
+PROBLEMES_DEFAUT = {
+    'problemes': [
+        {
+            'severite': 'warning',
+            'categorie': 'performance',
+            'message': 'Réponse du serveur OpenAI local',
+            'suggestion': 'Aucune: réponse de test',
+            'ligne': None,
+        }
+    ]
+}
+
+
+class ConfigSimulateur:
+    """Comportement du serveur local (partagé par tous les threads)"""
+    
+    def __init__(
+        self,
+        latence_ms: float = 500,
+        ecart_ms: float = 150,
+        distribution: str = 'lognormale',
+        taux_429: float = 0.0,
+        taux_500: float = 0.0,
+        taux_malforme: float = 0.0,
+        reponses: Optional[List[Dict[str, Any]]] = None,
+        graine: Optional[int] = None
+    ):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Distribution inconnue: {distribution}")
+        
+        self.latence_ms = latence_ms
+        self.ecart_ms = ecart_ms
+        self.distribution = distribution
+        self.taux_429 = taux_429
+        self.taux_500 = taux_500
+        self.taux_malforme = taux_malforme
+        self.reponses = reponses or [PROBLEMES_DEFAUT]
+        self.rng = random.Random(graine)
+        self.verrou = threading.Lock()
+        self.compteurs = {'requetes': 0, '429': 0, '500': 0, 'malformees': 0}
+    
+    def tirer_latence(self) -> float:
+        """Latence de la prochaine réponse, en secondes"""
+        with self.verrou:
+            if self.distribution == 'fixe':
+                latence = self.latence_ms
+            elif self.distribution == 'normale':
+                latence = self.rng.gauss(self.latence_ms, self.ecart_ms)
+            elif self.distribution == 'exponentielle':
+                latence = self.rng.expovariate(1 / self.latence_ms) if self.latence_ms else 0
+            else:
+                latence = self._tirer_lognormale()
+        return max(0.0, latence) / 1000
+    
+    def _tirer_lognormale(self) -> float:
+        """Lognormale de moyenne latence_ms et d'écart-type ecart_ms (verrou déjà pris)"""
+        if self.latence_ms <= 0:
+            return 0.0
+        variance = math.log(1 + (self.ecart_ms / self.latence_ms) ** 2)
+        mu = math.log(self.latence_ms) - variance / 2
+        return self.rng.lognormvariate(mu, math.sqrt(variance))
+    
+    def tirer_issue(self) -> str:
+        """'429', '500', 'malformees' ou 'ok' selon les taux configurés"""
+        with self.verrou:
+            self.compteurs['requetes'] += 1
+            tirage = self.rng.random()
+            
+            for issue, taux in (('429', self.taux_429), ('500', self.taux_500), ('malformees', self.taux_malforme)):
+                if tirage < taux:
+                    self.compteurs[issue] += 1
+                    return issue
+                tirage -= taux
+            
+            return 'ok'
+    
+    def choisir_reponse(self) -> Dict[str, Any]:
+        """Une des réponses configurées, au hasard"""
+        with self.verrou:
+            return self.rng.choice(self.reponses)
+
+
+class GestionnaireOpenAI(BaseHTTPRequestHandler):
+    """Répond à POST /v1/chat/completions comme l'API OpenAI"""
+    
+    config: ConfigSimulateur = None
+    server_version = 'QualityGateOpenAILocal/1.0'
+    
+    def do_POST(self):
+        if self.path.rstrip('/') not in ('/v1/chat/completions', '/chat/completions'):
+            self._envoyer(404, {'error': {'message': f'Route inconnue: {self.path}', 'type': 'invalid_request_error'}})
+            return
+        
+        longueur = int(self.headers.get('Content-Length', 0))
+        try:
+            requete = json.loads(self.rfile.read(longueur) or b'{}')
+        except json.JSONDecodeError:
+            self._envoyer(400, {'error': {'message': 'JSON invalide', 'type': 'invalid_request_error'}})
+            return
+        
+        time.sleep(self.config.tirer_latence())
+        issue = self.config.tirer_issue()
+        
+        if issue == '429':
+            self._envoyer(
+                429,
+                {'error': {'message': 'Rate limit reached (simulé)', 'type': 'rate_limit_error'}},
+                {'Retry-After': '1'}
+            )
+        elif issue == '500':
+            self._envoyer(500, {'error': {'message': 'Erreur serveur (simulée)', 'type': 'server_error'}})
+        elif issue == 'malformees':
+            # Le modèle "oublie" le format demandé: _parser_reponse doit échouer proprement
+            self._envoyer(200, self._completion(requete, 'Voici mon analyse: {"problemes": [ ... incomplet'))
+        else:
+            contenu = json.dumps(self.config.choisir_reponse(), ensure_ascii=False)
+            self._envoyer(200, self._completion(requete, contenu))
+    
+    def _completion(self, requete: Dict[str, Any], contenu: str) -> Dict[str, Any]:
+        """Corps d'une réponse chat.completion"""
+        return {
+            'id': f'chatcmpl-local-{uuid.uuid4().hex[:12]}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': requete.get('model', 'local'),
+            'choices': [
+                {
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': contenu},
+                    'finish_reason': 'stop',
+                }
+            ],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+        }
+    
+    def _envoyer(self, statut: int, corps: Dict[str, Any], entetes: Dict[str, str] = None):
+        """Envoie une réponse JSON"""
+        donnees = json.dumps(corps, ensure_ascii=False).encode('utf-8')
+        self.send_response(statut)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(donnees)))
+        for nom, valeur in (entetes or {}).items():
+            self.send_header(nom, valeur)
+        self.end_headers()
+        self.wfile.write(donnees)
+    
+    def log_message(self, format, *args):
+        """Pas de ligne de log par requête (trop bavard en test de charge)"""
+        pass
+
+
+def creer_serveur(hote: str, port: int, config: ConfigSimulateur) -> ThreadingHTTPServer:
+    """Crée le serveur HTTP (un thread par requête, comme des appels concurrents à OpenAI)"""
+    gestionnaire = type('Gestionnaire', (GestionnaireOpenAI,), {'config': config})
+    serveur = ThreadingHTTPServer((hote, port), gestionnaire)
+    serveur.daemon_threads = True
+    return serveur
\ No newline at end of file
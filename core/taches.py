@@ -0,0 +1,112 @@
+"""
+File d'Attente des Analyses
+===========================
+Mode asynchrone de l'API: la requête HTTP dépose une tâche en base,
+un worker (`manage.py worker_analyses`) la traite plus tard.
+"""
+
+from datetime import timedelta
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import TacheAnalyse, StatutTache
+from .services import QualityGateService
+
+
+class FileTaches:
+    """
+    File FIFO adossée à la table TacheAnalyse
+    
+    La réservation d'une tâche est un UPDATE conditionnel sur le statut:
+    deux workers ne peuvent pas prendre la même tâche, même sur SQLite
+    (qui ne supporte pas SELECT ... FOR UPDATE SKIP LOCKED).
+    """
+    
+    def __init__(self):
+        self.config = settings.QUALITY_GATE_CONFIG
+    
+    def soumettre(
+        self,
+        nom_fichier: str,
+        outil: str,
+        contenu: str,
+        description: str = "",
+        auteur=None,
+        options: Dict[str, bool] = None
+    ) -> TacheAnalyse:
+        """Ajoute une analyse à la file et retourne la tâche créée"""
+        return TacheAnalyse.objects.create(
+            nom_fichier=nom_fichier,
+            outil=outil,
+            contenu=contenu,
+            description=description,
+            options=options,
+            auteur=auteur
+        )
+    
+    def reserver(self) -> Optional[TacheAnalyse]:
+        """
+        Réserve la plus ancienne tâche en attente
+        
+        Returns:
+            La tâche passée au statut 'en_cours', ou None si la file est vide
+        """
+        while True:
+            tache = TacheAnalyse.objects.filter(
+                statut=StatutTache.EN_ATTENTE
+            ).order_by('date_creation', 'pk').first()
+            
+            if tache is None:
+                return None
+            
+            maintenant = timezone.now()
+            prise = TacheAnalyse.objects.filter(
+                pk=tache.pk,
+                statut=StatutTache.EN_ATTENTE
+            ).update(statut=StatutTache.EN_COURS, date_debut=maintenant)
+            
+            if prise:
+                tache.statut = StatutTache.EN_COURS
+                tache.date_debut = maintenant
+                return tache
+            # Un autre worker l'a prise entre-temps: on essaie la suivante
+    
+    def executer(self, tache: TacheAnalyse) -> TacheAnalyse:
+        """Lance l'analyse d'une tâche réservée et enregistre son issue"""
+        try:
+            service = QualityGateService()
+            tache.analyse = service.analyser_code(
+                nom_fichier=tache.nom_fichier,
+                outil=tache.outil,
+                contenu=tache.contenu,
+                description=tache.description,
+                auteur=tache.auteur,
+                options=tache.options
+            )
+            tache.statut = StatutTache.TERMINEE
+        except Exception as e:
+            tache.statut = StatutTache.ECHEC
+            tache.erreur = str(e)
+        finally:
+            tache.date_fin = timezone.now()
+            tache.save(update_fields=['statut', 'analyse', 'erreur', 'date_fin'])
+            # Chaque thread du worker a sa propre connexion à la base
+            close_old_connections()
+        
+        return tache
+    
+    def reprendre_taches_bloquees(self) -> int:
+        """
+        Remet en attente les tâches 'en_cours' depuis trop longtemps
+        
+        Cas d'un worker arrêté brutalement au milieu d'une analyse.
+        """
+        limite = timezone.now() - timedelta(seconds=self.config.get('TACHE_DUREE_MAX', 600))
+        
+        return TacheAnalyse.objects.filter(
+            statut=StatutTache.EN_COURS,
+            date_debut__lt=limite
+        ).update(statut=StatutTache.EN_ATTENTE, date_debut=None)
\ No newline at end of file
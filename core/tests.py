@@ -1,3 +1,1410 @@
-from django.test import TestCase
+import ast
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from datetime import timedelta
+from functools import partial
+from typing import Dict, List, Tuple
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+
+from django.conf import settings
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .analyzers.ai_analyzer import AnalyseurIA, ResultatIA
+from .analyzers.bac_a_sable import Guichet, SurchargeLint, lancer
+from .analyzers.espace_travail import PREFIXE, EspaceTravail
+from .analyzers.index_lignes import IndexLignes, avancer
+from .analyzers.lexeur_sql import (
+    CHAINE, COMMENTAIRE, IDENTIFIANT, decouper_au_fil, decouper_morceaux, instructions, tokeniser
+)
+from .analyzers.lignes_modifiees import LignesModifiees, lire_diff
+from .analyzers.lint_pool import PoolLint
+from .analyzers.moteurs_lint import _Passages, creer_moteur
+from .analyzers.parseur_dax import Noeud, decouper_mesures, parser_expression
+from .analyzers.parseur_m import DecoupeurRequete, analyser_etape, cles_etapes, decouper_requete, graphe_etapes
+from .analyzers.parseur_python import arbre_python, parcourir
+from .analyzers.python_tools import AnalyseurPythonTools
+from .analyzers.regles import appliquer_regles_sql
+from .analyzers.static_analyzer import AnalyseurStatique, nb_cpu
+from .cache import CacheAnalyses
+from .executeur import ExecuteurEtapes
+from .metriques import Metriques, _labels, percentiles
+from .models import AnalyseCode, ResultatCache, StatutTache, TacheAnalyse
+from .services import QualityGateService
+from .simulateur_openai import ConfigSimulateur, creer_serveur
+from .taches import FileTaches
+
+
+CONFIG_CACHE = {**settings.QUALITY_GATE_CONFIG, 'CACHE_ACTIF': True}
+
+
+@override_settings(QUALITY_GATE_CONFIG=CONFIG_CACHE)
+class CacheAnalysesTests(TestCase):
+    """Ce qui est (ou n'est pas) gardé par le cache des résultats"""
+    
+    def setUp(self):
+        CacheAnalyses._memoire.clear()
+        self.cache = CacheAnalyses()
+        self.cle = self.cache.calculer_cle('SELECT 1', 'SQL', '', {})
+    
+    def test_resultat_normal_mis_en_cache(self):
+        resultats = {'regles': [{'code_erreur': 'SQL001', 'severite': 'warning'}], 'ia': []}
+        self.cache.ecrire(self.cle, resultats)
+        
+        self.assertEqual(self.cache.lire(self.cle), resultats)
+        self.assertTrue(ResultatCache.objects.filter(cle=self.cle).exists())
+    
+    def test_timeout_pas_mis_en_cache(self):
+        self.cache.ecrire(self.cle, {'flake8': [{'code_erreur': 'TIMEOUT', 'severite': 'warning'}]})
+        
+        self.assertIsNone(self.cache.lire(self.cle))
+    
+    def test_hit_memoire_note_en_base(self):
+        self.cache.ecrire(self.cle, {'regles': []})
+        ancienne = timezone.now() - timedelta(days=1)
+        ResultatCache.objects.filter(cle=self.cle).update(date_acces=ancienne)
+        
+        # Dans l'intervalle: pas d'écriture en base
+        self.cache.lire(self.cle)
+        self.assertEqual(ResultatCache.objects.get(cle=self.cle).date_acces, ancienne)
+        
+        # Au-delà: la date d'accès suit, l'entrée n'est plus la première évincée
+        self.cache.intervalle_acces = 0
+        self.cache.lire(self.cle)
+        self.assertGreater(ResultatCache.objects.get(cle=self.cle).date_acces, ancienne)
+    
+    def test_lot_lit_chaque_fichier_une_fois(self):
+        service = QualityGateService()
+        options = {'utiliser_flake8': False, 'utiliser_bandit': False, 'utiliser_ia': False}
+        fichiers = [
+            {'nom_fichier': 'a.sql', 'outil': 'SQL', 'contenu': 'SELECT * FROM a'},
+            {'nom_fichier': 'b.sql', 'outil': 'SQL', 'contenu': 'SELECT * FROM b'},
+        ]
+        
+        def ecarts(lancer):
+            avant = CacheAnalyses.get_statistiques()
+            lancer()
+            apres = CacheAnalyses.get_statistiques()
+            return {cle: apres[cle] - avant[cle] for cle in ('hits_memoire', 'hits_persistant', 'misses')}
+        
+        lancer = partial(service.analyser_lot, fichiers, options=options)
+        self.assertEqual(ecarts(lancer), {'hits_memoire': 0, 'hits_persistant': 0, 'misses': 2})
+        self.assertEqual(ecarts(lancer), {'hits_memoire': 2, 'hits_persistant': 0, 'misses': 0})
+        
+        # Trouvé en base: compté une fois, pas une seconde fois en mémoire
+        for fichier in fichiers:
+            self.cache.ecrire(service._cle_cache(fichier['contenu'], 'SQL', '', options), {'regles': []})
+        CacheAnalyses._memoire.clear()
+        self.assertEqual(ecarts(lancer), {'hits_memoire': 0, 'hits_persistant': 2, 'misses': 0})
+
+
+class AnalyseurIAErreursTests(TestCase):
+    """Une panne de l'IA garde le résultat d'avant mais n'est jamais mise en cache"""
+    
+    def setUp(self):
+        CacheAnalyses._memoire.clear()
+    
+    def _analyseur(self) -> AnalyseurIA:
+        """Analyseur actif dont le client OpenAI est simulé"""
+        analyseur = AnalyseurIA()
+        analyseur.actif = True
+        analyseur.erreur_initialisation = False
+        analyseur.model = 'test'
+        analyseur.client = mock.Mock()
+        analyseur.client_async = mock.Mock()
+        return analyseur
+    
+    def _reponse(self, contenu: str) -> mock.Mock:
+        reponse = mock.Mock()
+        reponse.choices = [mock.Mock(message=mock.Mock(content=contenu))]
+        return reponse
+    
+    def test_erreur_api(self):
+        analyseur = self._analyseur()
+        analyseur.client.chat.completions.create.side_effect = RuntimeError('429 Too Many Requests')
+        
+        self.assertEqual(analyseur.analyser('SELECT 1', 'SQL'), [])
+        self.assertEqual(analyseur.analyser_detaille('SELECT 1', 'SQL'), ([], True))
+    
+    def test_reponse_illisible(self):
+        analyseur = self._analyseur()
+        analyseur.client.chat.completions.create.return_value = self._reponse('pas du JSON')
+        
+        self.assertEqual(analyseur.analyser_detaille('SELECT 1', 'SQL'), ([], True))
+    
+    def test_erreur_api_async(self):
+        analyseur = self._analyseur()
+        analyseur.client_async.chat.completions.create = mock.AsyncMock(side_effect=RuntimeError('503'))
+        
+        self.assertEqual(asyncio.run(analyseur.analyser_detaille_async('SELECT 1', 'SQL')), ([], True))
+    
+    def test_initialisation_echouee(self):
+        analyseur = AnalyseurIA()
+        analyseur.erreur_initialisation = True
+        
+        # Simulation, comme sans clé, mais signalée comme incident
+        resultat = analyseur.analyser_detaille('SELECT SUM(x) FROM t', 'SQL')
+        
+        self.assertEqual(resultat.problemes, analyseur.analyser('SELECT SUM(x) FROM t', 'SQL'))
+        self.assertTrue(resultat.problemes)
+        self.assertTrue(resultat.incident)
+    
+    def test_incident_pas_mis_en_cache(self):
+        service = QualityGateService()
+        service.analyseur_ia = self._analyseur()
+        creer = service.analyseur_ia.client.chat.completions.create
+        creer.side_effect = RuntimeError('429 Too Many Requests')
+        
+        # Même score qu'avant (aucun problème IA), mais rien en cache
+        analyse = service.analyser_code('a.sql', 'SQL', 'SELECT id FROM t')
+        self.assertEqual(analyse.problemes.filter(source='openai').count(), 0)
+        self.assertFalse(ResultatCache.objects.exists())
+        
+        creer.side_effect = None
+        creer.return_value = self._reponse('{"problemes": [{"message": "a", "severite": "info"}]}')
+        service.analyser_code('a.sql', 'SQL', 'SELECT id FROM t')
+        self.assertEqual(ResultatCache.objects.count(), 1)
+    
+    def test_incident_pas_mis_en_cache_async(self):
+        service = QualityGateService()
+        service.analyseur_ia = self._analyseur()
+        service.analyseur_ia.client_async.chat.completions.create = mock.AsyncMock(side_effect=RuntimeError('503'))
+        
+        async_to_sync(service.analyser_code_async)('a.sql', 'SQL', 'SELECT id FROM t')
+        
+        self.assertFalse(ResultatCache.objects.exists())
+
+
+DIFF = """diff --git a/requete.sql b/requete.sql
+--- a/requete.sql
++++ b/requete.sql
+@@ -1,3 +1,4 @@
+ SELECT id
+-FROM t
++FROM clients
++WHERE actif = 1
+ ORDER BY id
+@@ -10 +11,0 @@
+-DELETE FROM t
+@@ -20,0 +21,2 @@
+++++ ligne ajoutée qui ressemble à un en-tête
++-- fin
+diff --git a/vieux.sql b/vieux.sql
+--- a/vieux.sql
++++ /dev/null
+@@ -1 +0,0 @@
+-SELECT 1
+"""
+
+
+class LignesModifieesTests(SimpleTestCase):
+    """Lecture des diffs, appartenance d'une ligne et filtrage des problèmes"""
+    
+    def test_lire_diff(self):
+        fichiers = lire_diff(DIFF)
+        
+        # Le contexte et les suppressions ne marquent rien, un fichier supprimé n'apparaît pas
+        self.assertEqual(list(fichiers), ['requete.sql'])
+        self.assertEqual(list(fichiers['requete.sql']), [(2, 3), (21, 22)])
+    
+    def test_intervalles_fusionnes(self):
+        lignes = LignesModifiees([(5, 6), (1, 2), (3, 3), (10, 12), (11, 15)])
+        
+        # (1, 2) et (3, 3) se touchent, (5, 6) est séparé par la ligne 4
+        self.assertEqual(list(lignes), [(1, 3), (5, 6), (10, 15)])
+        self.assertEqual(lignes.empreinte(), '1-3,5-6,10-15')
+        self.assertFalse(LignesModifiees())
+    
+    def test_appartenance(self):
+        lignes = LignesModifiees([(3, 5), (10, 10)])
+        
+        self.assertEqual([n for n in range(12) if n in lignes], [3, 4, 5, 10])
+        self.assertTrue(lignes.chevauche(6, 10))
+        self.assertFalse(lignes.chevauche(6, 9))
+    
+    def test_appartenance_numero_invalide(self):
+        lignes = LignesModifiees([(3, 5)])
+        
+        for ligne in ('4', 4.0, None, True, [4]):
+            self.assertNotIn(ligne, lignes)
+    
+    def test_filtrer(self):
+        lignes = LignesModifiees([(3, 5)])
+        problemes = [
+            {'code_erreur': 'A', 'ligne': 4},
+            {'code_erreur': 'B', 'ligne': 8},
+            {'code_erreur': 'C', 'ligne': None},
+            {'code_erreur': 'D'},
+            {'code_erreur': 'E', 'ligne': '4'},
+        ]
+        
+        self.assertEqual([p['code_erreur'] for p in lignes.filtrer(problemes)], ['A', 'C', 'D'])
+    
+    def test_extraits(self):
+        contenu = '\n'.join(f'l{n}' for n in range(1, 11))
+        
+        extraits = LignesModifiees([(2, 2), (9, 9)]).extraits(contenu, 1)
+        
+        self.assertEqual(extraits, '1| l1\n2| l2\n3| l3\n...\n8| l8\n9| l9\n10| l10')
+    
+    def test_ligne_reponse_ia(self):
+        analyseur = AnalyseurIA()
+        reponse = '{"problemes": [{"message": "a", "ligne": "12"}, {"message": "b", "ligne": "douze"}, {"message": "c", "ligne": 3}]}'
+        
+        self.assertEqual([p['ligne'] for p in analyseur._parser_reponse(reponse)], [12, None, 3])
+
+
+class LexeurSQLTests(SimpleTestCase):
+    """Chaînes, commentaires et découpage en instructions"""
+    
+    def _jetons(self, code: str, type_jeton: str):
+        return [j.valeur for j in tokeniser(code, avec_commentaires=True) if j.type == type_jeton]
+    
+    def test_chaines(self):
+        code = "SELECT 'a''b;c', N'unicode', E'it\\'s; x', E'\\\\', 'fin'"
+        
+        self.assertEqual(
+            self._jetons(code, CHAINE),
+            ["'a''b;c'", "N'unicode'", "E'it\\'s; x'", "E'\\\\'", "'fin'"]
+        )
+    
+    def test_antislash_hors_chaine_e(self):
+        # Sans préfixe E, \ n'échappe rien: la chaîne se ferme au premier '
+        self.assertEqual(self._jetons("x LIKE 'a\\' ; y", CHAINE), ["'a\\'"])
+    
+    def test_chaine_non_fermee(self):
+        self.assertEqual(self._jetons("SELECT E'ouverte\\", CHAINE), ["E'ouverte\\"])
+    
+    def test_commentaires_et_identifiants(self):
+        code = 'SELECT [a;b], "c""d", `e` -- SELECT *; fin\n/* ; */ FROM t'
+        
+        self.assertEqual(self._jetons(code, COMMENTAIRE), ['-- SELECT *; fin', '/* ; */'])
+        self.assertEqual(self._jetons(code, IDENTIFIANT), ['[a;b]', '"c""d"', '`e`'])
+        self.assertEqual(len(list(instructions(code))), 1)
+    
+    def test_instructions(self):
+        code = "SELECT 1;\nSELECT 'a;b'\nGO\nSELECT E'\\';' ;;\nGOTO x"
+        
+        self.assertEqual(
+            [' '.join(j.valeur for j in instruction) for instruction in instructions(code)],
+            ['SELECT 1', "SELECT 'a;b'", "SELECT E'\\';'", 'GOTO x']
+        )
+    
+    def test_decouper_morceaux(self):
+        code = "SELECT E'it\\'s; SELECT * FROM secrets' AS x FROM t;\nSELECT 2 AS y FROM u WHERE a = 1;"
+        
+        fin_premiere = code.index('\n')
+        
+        morceaux = decouper_morceaux(code, 1)
+        
+        self.assertEqual([m[0] for m in morceaux], [code[:fin_premiere], code[fin_premiere:]])
+        # Le second morceau commence par le saut de ligne, juste après le ;
+        self.assertEqual([m[1:] for m in morceaux], [(1, 1), (1, fin_premiere + 1)])
+    
+    def test_pas_de_regle_sur_le_texte_d_une_chaine(self):
+        code = "SELECT E'it\\'s; SELECT * FROM secrets' AS x FROM t WHERE a = 1"
+        
+        self.assertEqual(AnalyseurStatique().analyser(code, 'SQL'), [])
+
+
+class GuichetTests(SimpleTestCase):
+    """Admission des outils de lint: attente bornée, refus, annulation"""
+    
+    def test_refus_quand_file_pleine(self):
+        guichet = Guichet(max_processus=1, file_attente=0, attente_max=1)
+        guichet.acquerir()
+        
+        with self.assertRaises(SurchargeLint):
+            guichet.acquerir()
+    
+    def test_attente_async_annulee_ne_garde_pas_de_place(self):
+        guichet = Guichet(max_processus=1, file_attente=4, attente_max=5)
+        
+        async def scenario():
+            guichet.acquerir()
+            attentes = [asyncio.create_task(guichet.acquerir_async()) for _ in range(3)]
+            await asyncio.sleep(0.1)
+            self.assertEqual(guichet.en_attente, 3)
+            
+            for attente in attentes:
+                attente.cancel()
+            await asyncio.gather(*attentes, return_exceptions=True)
+            guichet.liberer()
+            
+            # La place rendue est de nouveau disponible tout de suite
+            await asyncio.wait_for(guichet.acquerir_async(), timeout=1)
+        
+        asyncio.run(scenario())
+        self.assertEqual(guichet.en_attente, 0)
+    
+    def test_attente_async_limitee(self):
+        guichet = Guichet(max_processus=1, file_attente=4, attente_max=0.2)
+        guichet.acquerir()
+        
+        with self.assertRaises(SurchargeLint):
+            asyncio.run(guichet.acquerir_async())
+    
+    def test_pool_plein_attente_limitee_au_timeout(self):
+        pool = PoolLint(taille=1)
+        pool.nb_crees = 1  # Son seul travailleur est occupé ailleurs
+        
+        debut = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            pool.executer('flake8', 'x = 1', {}, timeout=0.3)
+        self.assertLess(time.monotonic() - debut, 2)
+    
+    def test_taille_pool_suit_le_guichet(self):
+        config = settings.QUALITY_GATE_CONFIG
+        
+        self.assertGreaterEqual(config['LINT_POOL_TAILLE'], config['LINT_MAX_PROCESSUS'])
+
+
+class PassagesRuffTests(SimpleTestCase):
+    """Un lancement de Ruff partagé par les étapes flake8 et bandit d'une analyse"""
+    
+    def test_un_passage_pour_les_deux_outils(self):
+        passages = _Passages()
+        
+        passage, proprietaire = passages.prendre('code', 'flake8')
+        meme_passage, autre_proprietaire = passages.prendre('code', 'bandit')
+        
+        self.assertTrue(proprietaire)
+        self.assertFalse(autre_proprietaire)
+        self.assertIs(passage, meme_passage)
+        self.assertFalse(passages.passages)
+    
+    def test_code_resoumis(self):
+        passages = _Passages()
+        premier, _ = passages.prendre('code', 'flake8')
+        
+        # Flake8 a déjà eu sa part: une nouvelle analyse du même code relance Ruff
+        second, proprietaire = passages.prendre('code', 'flake8')
+        
+        self.assertTrue(proprietaire)
+        self.assertIsNot(premier, second)
+    
+    def test_taille_bornee(self):
+        passages = _Passages(taille=2)
+        for code in ('a', 'b', 'c'):
+            passages.prendre(code, 'flake8')
+        
+        self.assertEqual(list(passages.passages), ['b', 'c'])
+
+
+# Un cas par famille de sévérité, avec shell=True et os.system sur des commandes littérales
+# (la plus basse sévérité que Bandit leur donne)
+CODE_SECURITE = """import os
+import pickle
+import random
+import subprocess
+import telnetlib
+
+import jinja2
+import requests
+import yaml
+from cryptography.hazmat.primitives.asymmetric import dsa
+from flask import Flask
+
+password = 'secret'
+TMP = '/tmp/x'
+app = Flask(__name__)
+
+
+def f(x):
+    assert x
+    subprocess.call('ls', shell=True)
+    os.system('ls')
+    pickle.loads(x)
+    yaml.load(x)
+    exec(x)
+    eval(x)
+    random.random()
+    requests.get(x, verify=False, timeout=1)
+    jinja2.Environment(autoescape=False)
+    dsa.generate_private_key(key_size=1024)
+    try:
+        telnetlib.Telnet(x)
+    except Exception:
+        pass
+    app.run(debug=True)
+    return 'SELECT * FROM t WHERE a = %s' % x
+"""
+
+
+@skipUnless(shutil.which('ruff') and shutil.which('bandit'), 'Ruff et Bandit requis')
+class PariteMoteursLintTests(SimpleTestCase):
+    """Flake8/Bandit et Ruff donnent les mêmes sévérités, donc les mêmes scores"""
+    
+    def test_memes_severites(self):
+        issues, severites = {}, {}
+        for nom in ('flake8', 'ruff'):
+            moteur = creer_moteur(settings.QUALITY_GATE_CONFIG, nom)
+            self.assertEqual(moteur.nom, nom)
+            issues[nom] = moteur.bandit(CODE_SECURITE, 30)
+            severites[nom] = Counter(p['severite'] for p in AnalyseurPythonTools(nom).analyser_bandit(CODE_SECURITE))
+        
+        self.assertEqual(
+            sorted(i['test_id'] for i in issues['ruff']), sorted(i['test_id'] for i in issues['flake8'])
+        )
+        self.assertEqual(
+            Counter(i['issue_severity'] for i in issues['ruff']), Counter(i['issue_severity'] for i in issues['flake8'])
+        )
+        self.assertEqual(severites['ruff'], severites['flake8'])
+
+
+def _forme(noeud: Noeud) -> str:
+    """Arbre DAX en notation préfixée: (op gauche droite)"""
+    if not noeud.enfants:
+        return noeud.valeur
+    return '(' + ' '.join([noeud.valeur] + [_forme(enfant) for enfant in noeud.enfants]) + ')'
+
+
+def _codes(contenu: str, outil: str):
+    """(code, ligne) des problèmes des règles statiques"""
+    return [(p['code_erreur'], p.get('ligne')) for p in AnalyseurStatique().analyser(contenu, outil)]
+
+
+class ParseurDAXTests(SimpleTestCase):
+    """Arbre d'expression, découpage en mesures et règles DAX"""
+    
+    def test_precedence(self):
+        cas = {
+            '1 + 2 * 3 ^ 2 ^ 1': '(+ 1 (* 2 (^ 3 (^ 2 1))))',
+            '1 - 2 - 3': '(- (- 1 2) 3)',
+            'a && b || c': '(|| (&& a b) c)',
+            'a || b && c': '(|| a (&& b c))',
+            'NOT a = b': '(NOT (= a b))',
+            '-x ^ 2': '(- (^ x 2))',
+            'a & b = c': '(= (& a b) c)',
+            'a IN {1, 2} && b': '(&& (IN a ({} 1 2)) b)',
+            '(1 + 2) * 3': '(* (+ 1 2) 3)',
+        }
+        for texte, attendu in cas.items():
+            with self.subTest(texte=texte):
+                self.assertEqual(_forme(parser_expression(texte).arbre), attendu)
+    
+    def test_var_return_et_colonnes(self):
+        self.assertEqual(
+            _forme(parser_expression('VAR x = 1 VAR y = x + 1 RETURN x * y').arbre),
+            '(VAR (x 1) (y (+ x 1)) (* x y))'
+        )
+        self.assertEqual(
+            _forme(parser_expression("CALCULATE(SUM('Ventes'[Montant]), ALL(T))").arbre),
+            "(CALCULATE (SUM ([Montant] 'Ventes')) (ALL T))"
+        )
+    
+    def test_texte_mal_forme(self):
+        # Jamais d'exception: les jetons inattendus deviennent des nœuds 'erreur'
+        arbre = parser_expression('SUM(T[a])) + SUMX(T, 1').arbre
+        
+        self.assertIn('SUMX', [n.valeur for n in arbre.parcourir() if n.type == 'appel'])
+    
+    def test_commentaires(self):
+        resultat = parser_expression('SUM(T[a]) // total\n/* bloc */ + "// pas un commentaire"')
+        
+        self.assertEqual(len(resultat.commentaires), 2)
+    
+    def test_decouper_mesures(self):
+        modele = (
+            '// Total des ventes\n'
+            'Total = SUM(T[a])\n'
+            'Ratio := DIVIDE(\n'
+            '    [Total],\n'
+            'Faux = 1)\n'
+            "'Ventes'[Moy] = AVERAGEX(T, T[a])\n"
+            'MEASURE T[Tout] = "Nom = valeur"\n'
+        )
+        
+        mesures = decouper_mesures(modele)
+        
+        # "Faux =" est dans les parenthèses de DIVIDE, "Nom =" dans une chaîne
+        self.assertEqual([(m.nom, m.ligne) for m in mesures], [
+            ('Total', 1), ('Ratio', 3), ("'Ventes'[Moy]", 6), ('T[Tout]', 7)
+        ])
+        self.assertTrue(mesures[0].texte.startswith('// Total des ventes'))
+    
+    def test_expression_seule(self):
+        mesures = decouper_mesures('SUMX(T, T[a] * T[b])')
+        
+        self.assertEqual([(m.nom, m.debut_expression) for m in mesures], [(None, 0)])
+    
+    def test_dax001_calculate_sans_filtre(self):
+        self.assertEqual(_codes('Total = CALCULATE([Ventes], T[Pays] = "FR")', 'DAX'), [('DAX001', 1)])
+        self.assertEqual(_codes('Total = CALCULATE([Ventes], ALL(T))', 'DAX'), [])
+        # Le filtre peut être imbriqué; une colonne [Allocation] n'est pas ALL
+        self.assertEqual(_codes('Total = CALCULATE([Ventes], KEEPFILTERS(FILTER(T, T[x] > 1)))', 'DAX'), [])
+        self.assertEqual(_codes('Total = CALCULATE([Ventes], T[Allocation] = 1)', 'DAX'), [('DAX001', 1)])
+    
+    def test_dax002_iteratif(self):
+        self.assertEqual(_codes('A = 1\nMoy = AVERAGEX(T, T[a])', 'DAX'), [('DAX002', 2)])
+        self.assertEqual(_codes('Total = SUM(T[a]) // SUMX(T, T[a])', 'DAX'), [])
+    
+    def test_dax003_mesure_longue_sans_commentaire(self):
+        longue = 'Total = ' + ' + '.join(f'SUM(T[colonne_{i}])' for i in range(15))
+        
+        self.assertEqual(_codes(longue, 'DAX'), [('DAX003', 1)])
+        self.assertEqual(_codes('// Somme des colonnes\n' + longue, 'DAX'), [])
+        self.assertEqual(_codes(longue + ' & "// dans une chaîne"', 'DAX'), [('DAX003', 1)])
+
+
+REQUETE_M = """let
+    // Source, avec une virgule
+    Source = Csv.Document(File.Contents("C:\\data\\a, b in.csv")),
+    #"Lignes filtrées" = Table.SelectRows(Source, each [x] > 1),
+    Calcul = let a = 1, b = 2 in a + b,
+    Fin = Table.AddColumn(#"Lignes filtrées", "y", each Calcul)
+in
+    Fin"""
+
+
+def _decouper_par_morceaux(contenu: str, taille: int, taille_max=None):
+    """Étapes d'une requête lue `taille` caractères à la fois"""
+    decoupeur = DecoupeurRequete(taille_max)
+    etapes = []
+    for i in range(0, len(contenu), taille):
+        etapes.extend(decoupeur.ajouter(contenu[i:i + taille]))
+    etapes.extend(decoupeur.ajouter('', final=True))
+    return etapes, decoupeur.let_in
+
+
+class ParseurMTests(SimpleTestCase):
+    """Étapes d'un let ... in, graphe des étapes et règles Power Query"""
+    
+    def test_etapes_let_in(self):
+        requete = decouper_requete(REQUETE_M)
+        
+        self.assertTrue(requete.let_in)
+        # Virgule, `in` et `let` dans une chaîne, un commentaire ou un let imbriqué ne coupent pas
+        self.assertEqual([(e.nom, e.ligne, e.colonne) for e in requete.etapes], [
+            ('Source', 2, 5), ('Lignes filtrées', 4, 5), ('Calcul', 5, 5), ('Fin', 6, 5), (None, 8, 5)
+        ])
+        source = requete.etapes[0]
+        self.assertTrue(source.texte[source.debut_expression:].lstrip().startswith('Csv.Document('))
+        self.assertEqual(requete.etapes[2].texte, 'Calcul = let a = 1, b = 2 in a + b')
+        self.assertEqual(requete.etapes[-1].texte, 'Fin')
+    
+    def test_sans_let_in(self):
+        requete = decouper_requete('Table.FromRows({{1, 2}})')
+        
+        self.assertFalse(requete.let_in)
+        self.assertEqual([(e.nom, e.texte) for e in requete.etapes], [(None, 'Table.FromRows({{1, 2}})')])
+    
+    def test_graphe_et_cles(self):
+        requete = decouper_requete(REQUETE_M)
+        graphe = graphe_etapes(requete.etapes, [analyser_etape(e) for e in requete.etapes])
+        
+        self.assertEqual(graphe, {0: [], 1: [0], 2: [], 3: [1, 2], 4: [3]})
+        
+        # Modifier Calcul change sa clé et celles de ses dépendantes, et seulement celles-là
+        modifiee = decouper_requete(REQUETE_M.replace('a + b', 'a * b'))
+        avant = cles_etapes(requete.etapes, graphe)
+        apres = cles_etapes(modifiee.etapes, graphe_etapes(modifiee.etapes, [analyser_etape(e) for e in modifiee.etapes]))
+        self.assertEqual([a != b for a, b in zip(avant, apres)], [False, False, True, True, True])
+    
+    def test_pq001_sans_let_in(self):
+        self.assertEqual(_codes('Table.FromRows({{1, 2}})', 'PowerQuery'), [('PQ001', 1)])
+        self.assertEqual(_codes('let\n    Source = 1\nin\n    Source', 'PowerQuery'), [])
+    
+    def test_pq002_chemin_en_dur(self):
+        self.assertEqual(_codes(REQUETE_M, 'PowerQuery'), [('PQ002', 3)])
+        # Un chemin dans un commentaire n'est pas une chaîne
+        self.assertEqual(_codes('let\n    // C:\\data\n    Source = 1\nin\n    Source', 'PowerQuery'), [])
+    
+    def test_morceaux_coupant_chaines_et_commentaires(self):
+        attendu = decouper_requete(REQUETE_M)
+        
+        for taille in (1, 3, 7, 64):
+            with self.subTest(taille=taille):
+                self.assertEqual(_decouper_par_morceaux(REQUETE_M, taille), (attendu.etapes, True))
+    
+    def test_etape_trop_longue_coupee_entre_jetons(self):
+        etapes, let_in = _decouper_par_morceaux(REQUETE_M, 1, taille_max=20)
+        
+        self.assertTrue(let_in)
+        # La chaîne (plus longue que la limite) n'est jamais coupée
+        self.assertIn('"C:\\data\\a, b in.csv"', [e.texte for e in etapes])
+        for etape in etapes:
+            self.assertEqual(REQUETE_M[etape.position:etape.position + len(etape.texte)], etape.texte)
+
+
+class ParseurPythonTests(SimpleTestCase):
+    """Arbre Python en cache, parcours unique et règles PY"""
+    
+    def test_arbre_en_cache(self):
+        code = 'x = 1\n'
+        
+        self.assertIs(arbre_python(code), arbre_python(code))
+        self.assertIsNone(arbre_python('def f(:\n'))
+        self.assertEqual(_codes('def f(:\n', 'Python'), [])
+    
+    def test_parcours_dans_try(self):
+        code = (
+            'try:\n'
+            '    a()\n'
+            '    def g():\n'
+            '        b()\n'
+            'except OSError:\n'
+            '    c()\n'
+            'd()\n'
+        )
+        visiteurs = {ast.Call: [lambda noeud, dans_try: [f'{noeud.func.id}:{dans_try}']]}
+        
+        # Le corps d'une fonction définie dans le try s'exécute plus tard, hors du try
+        self.assertEqual([nom for nom, _ in parcourir(arbre_python(code), visiteurs)],
+                         ['a:True', 'b:False', 'c:False', 'd:False'])
+    
+    def test_parcours_sans_recursion(self):
+        # Plus profond que la limite de récursion par défaut (1000)
+        code = 'x = 1' + ' + 1' * 2000 + '\n'
+        visiteurs = {ast.Constant: [lambda noeud, dans_try: ['constante']]}
+        
+        self.assertEqual(sum(1 for _ in parcourir(arbre_python(code), visiteurs)), 2001)
+    
+    def test_py001_import_etoile(self):
+        self.assertEqual(_codes('from os import *\nfrom sys import *\n', 'Python'), [('PY001', 1), ('PY001', 2)])
+        self.assertEqual(_codes('from os import path\n', 'Python'), [])
+    
+    def test_py002_sans_docstring(self):
+        self.assertEqual(_codes('def f():\n    """Doc"""\n\ndef g():\n    pass\n', 'Python'), [('PY002', 4)])
+        self.assertEqual(_codes('async def f():\n    """Doc"""\n', 'Python'), [])
+    
+    def test_py003_print(self):
+        # Ni le commentaire ni la chaîne ne comptent
+        code = 'print(1)\nprint(2)\nprint(3)\n# print(4)\ns = "print(5)"\n'
+        
+        self.assertEqual(_codes(code, 'Python'), [])
+        self.assertEqual(_codes(code + 'print(6)\n', 'Python'), [('PY003', 1)])
+    
+    def test_py004_lecture_sans_try(self):
+        self.assertEqual(_codes('import pandas as pd\ndf = pd.read_csv("a")\n', 'Python'), [('PY004', 2)])
+        self.assertEqual(_codes('try:\n    open("a")\nexcept OSError:\n    pass\n', 'Python'), [])
+        # try ... finally sans except ne protège pas
+        self.assertEqual(_codes('try:\n    open("a")\nfinally:\n    pass\n', 'Python'), [('PY004', 2)])
+    
+    def test_colonne_apres_caracteres_non_ascii(self):
+        # col_offset compte des octets: la colonne doit compter des caractères
+        problemes = AnalyseurStatique().analyser('x = "éé"; from os import *\n', 'Python')
+        
+        self.assertEqual([(p['code_erreur'], p['colonne']) for p in problemes], [('PY001', 11)])
+
+
+SCRIPT_SQL = """SELECT * FROM t WHERE a = 'x; DELETE FROM t';
+-- commentaire; SELECT * FROM u
+DELETE FROM t;
+/* bloc ; */ UPDATE t SET a = E'it\\'s; ok';
+SELECT a FROM t WHERE b LIKE '%x'
+"""
+
+
+def _par_morceaux(contenu: str, taille: int):
+    """Le contenu, `taille` caractères à la fois"""
+    return [contenu[i:i + taille] for i in range(0, len(contenu), taille)]
+
+
+def _emplacements(problemes):
+    return [(p['code_erreur'], p.get('ligne'), p.get('colonne')) for p in problemes]
+
+
+class AnalyseAuFilTests(SimpleTestCase):
+    """Découpage au fil de la lecture: frontières de morceaux dans une chaîne, un commentaire, une instruction"""
+    
+    def _verifier_blocs(self, blocs):
+        """Les blocs recollés redonnent le script, chacun à son emplacement"""
+        self.assertEqual(''.join(bloc for bloc, _, _ in blocs), SCRIPT_SQL)
+        lignes = SCRIPT_SQL.split('\n')
+        for bloc, ligne, colonne in blocs:
+            self.assertTrue(lignes[ligne - 1][colonne - 1:].startswith(bloc.split('\n')[0]))
+    
+    def test_instructions_entieres(self):
+        for taille in (1, 3, 7, 1000):
+            with self.subTest(taille=taille):
+                blocs = list(decouper_au_fil(_par_morceaux(SCRIPT_SQL, taille), 10 ** 6))
+                
+                self._verifier_blocs(blocs)
+                # Les ; dans une chaîne ou un commentaire ne coupent pas
+                self.assertTrue(all(bloc.rstrip().endswith(';') for bloc, _, _ in blocs[:-1]))
+                self.assertIn("'x; DELETE FROM t';", blocs[0][0])
+    
+    def test_instruction_trop_longue_coupee_entre_jetons(self):
+        attendus = [(j.type, j.valeur) for j in tokeniser(SCRIPT_SQL, avec_commentaires=True)]
+        
+        for taille_max in (12, 30):
+            with self.subTest(taille_max=taille_max):
+                blocs = list(decouper_au_fil(_par_morceaux(SCRIPT_SQL, 1), taille_max))
+                
+                self._verifier_blocs(blocs)
+                # Jamais de coupure dans une chaîne ou un commentaire: les jetons restent les mêmes
+                jetons = [
+                    (j.type, j.valeur) for bloc, _, _ in blocs for j in tokeniser(bloc, avec_commentaires=True)
+                ]
+                self.assertEqual(jetons, attendus)
+    
+    def test_sql_identique_a_l_analyse_entiere(self):
+        analyseur = AnalyseurStatique()
+        attendus = _emplacements(analyseur.analyser(SCRIPT_SQL, 'SQL'))
+        
+        self.assertEqual(attendus, [('SQL001', 1, 1), ('SQL005', 1, 1), ('SQL005', 5, 1)])
+        for taille in (1, 3, 7):
+            with self.subTest(taille=taille):
+                self.assertEqual(_emplacements(analyseur.analyser_au_fil(_par_morceaux(SCRIPT_SQL, taille), 'SQL')), attendus)
+    
+    def test_power_query_identique_a_l_analyse_entiere(self):
+        analyseur = AnalyseurStatique()
+        
+        for requete in (REQUETE_M, 'Table.FromRows({{"C:\\\\x"}})'):
+            attendus = sorted(_emplacements(analyseur.analyser(requete, 'PowerQuery')))
+            for taille in (1, 3, 7):
+                with self.subTest(requete=requete[:10], taille=taille):
+                    # PQ001 (sans let ... in) n'est connu qu'à la fin de la lecture
+                    problemes = analyseur.analyser_au_fil(_par_morceaux(requete, taille), 'PowerQuery')
+                    self.assertEqual(sorted(_emplacements(problemes)), attendus)
+
+
+def _hors_boucle() -> bool:
+    """Vrai si l'appelant n'est pas sur le thread d'une boucle d'événements"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return True
+    return False
+
+
+class VuesAsynchronesTests(TestCase):
+    """Les vues asynchrones ne bloquent pas la boucle d'événements"""
+    
+    def test_statut_des_outils_hors_boucle(self):
+        appels = []
+        construire = QualityGateService.__init__
+        statut = QualityGateService.get_outils_status
+        
+        def init(service):
+            appels.append(('init', _hors_boucle()))
+            construire(service)
+        
+        def outils(service):
+            appels.append(('statut', _hors_boucle()))
+            return statut(service)
+        
+        with mock.patch.object(QualityGateService, '__init__', init), \
+                mock.patch.object(QualityGateService, 'get_outils_status', outils):
+            reponse = async_to_sync(self.async_client.get)(reverse('core:analyser'))
+        
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(appels, [('init', True), ('statut', True)])
+
+
+# Bloc de 4 lignes, ; dans une chaîne et un commentaire, deux instructions sur la dernière ligne
+BLOC_SQL = (
+    "SELECT * FROM ventes\n"
+    "WHERE code = 'a;b' -- fin; pas ici\n"
+    "/* ; */ AND annee = 2023;\n"
+    "UPDATE t SET a = 1 WHERE b = 2; SELECT v.id FROM v JOIN w;\n"
+)
+
+
+class AnalyseSQLParalleleTests(SimpleTestCase):
+    """Pool de processus des gros scripts SQL: mêmes problèmes, aux mêmes lignes"""
+    
+    def test_processus_bornes_par_les_cpu(self):
+        with override_settings(QUALITY_GATE_CONFIG={**settings.QUALITY_GATE_CONFIG, 'SQL_PARALLELE_PROCESSUS': 64}):
+            self.assertEqual(AnalyseurStatique().nb_processus, nb_cpu())
+        with override_settings(QUALITY_GATE_CONFIG={**settings.QUALITY_GATE_CONFIG, 'SQL_PARALLELE_PROCESSUS': None}):
+            self.assertEqual(AnalyseurStatique().nb_processus, nb_cpu())
+    
+    def test_lignes_identiques_a_l_analyse_sequentielle(self):
+        script = BLOC_SQL * 200
+        analyseur = AnalyseurStatique()
+        # Le pool est forcé, même sur une machine à un seul CPU
+        analyseur.nb_processus = 2
+        analyseur.seuil_parallele = 1024
+        self.assertGreater(len(decouper_morceaux(script, len(script) // 2 + 1)), 1)
+        
+        sequentiel = _emplacements(appliquer_regles_sql(script))
+        parallele = _emplacements(analyseur._analyser_sql_parallele(script))
+        
+        self.assertEqual(parallele, sequentiel)
+        # Chaque bloc garde ses emplacements: (code, ligne dans le bloc, colonne)
+        attendus = [
+            ('SQL001', 1, 1), ('SQL005', 1, 1), ('SQL006', 3, 21), ('SQL002', 4, 52),
+            ('SQL004', 4, 52), ('SQL005', 4, 33), ('SQL007', 4, 33),
+        ]
+        self.assertEqual(parallele, [
+            (code, ligne + 4 * i, colonne) for i in range(200) for code, ligne, colonne in attendus
+        ])
+
+def _etape(nom: str, attente: float):
+    """Étape qui attend `attente` secondes puis rend un problème à son nom"""
+    def etape():
+        time.sleep(attente)
+        return [{'code_erreur': nom}]
+    return etape
+
+
+class ExecuteurEtapesTests(SimpleTestCase):
+    """Les résultats suivent l'ordre des étapes, pas leur ordre de fin"""
+    
+    def test_resultats_dans_l_ordre_des_etapes(self):
+        etapes = {'lente': _etape('lente', 0.2), 'moyenne': _etape('moyenne', 0.1), 'rapide': _etape('rapide', 0)}
+        
+        resultats, durees = ExecuteurEtapes().executer(etapes)
+        
+        self.assertEqual(list(resultats), ['lente', 'moyenne', 'rapide'])
+        self.assertEqual(list(durees), ['lente', 'moyenne', 'rapide'])
+        self.assertEqual(resultats['lente'], [{'code_erreur': 'lente'}])
+        self.assertGreaterEqual(durees['lente'], 0.2)
+    
+    def test_resultats_async_dans_l_ordre_des_etapes(self):
+        async def etape(nom, attente):
+            await asyncio.sleep(attente)
+            return [{'code_erreur': nom}]
+        
+        async def scenario():
+            return await ExecuteurEtapes().executer_async({
+                'lente': etape('lente', 0.2), 'rapide': etape('rapide', 0)
+            })
+        
+        resultats, durees = asyncio.run(scenario())
+        
+        self.assertEqual(resultats, {'lente': [{'code_erreur': 'lente'}], 'rapide': [{'code_erreur': 'rapide'}]})
+        self.assertEqual(list(durees), ['lente', 'rapide'])
+    
+    def test_au_fil_dans_l_ordre_de_fin(self):
+        etapes = {'lente': _etape('lente', 0.3), 'rapide': _etape('rapide', 0)}
+        
+        noms = [nom for nom, _, _ in ExecuteurEtapes().executer_au_fil(etapes)]
+        
+        self.assertEqual(noms, ['rapide', 'lente'])
+
+class SauvegardeAnalyseTests(TestCase):
+    """Compteurs et problèmes enregistrés par INSERT groupés"""
+    
+    RESULTATS = {
+        'manuel': [
+            {'severite': 'critique', 'code_erreur': 'SQL001'},
+            {'severite': 'inconnue', 'code_erreur': 'SQL002'},
+        ],
+        'flake8': [{'severite': 'warning', 'source': 'flake8', 'code_erreur': f'E50{i}'} for i in range(3)],
+        'bandit': [{'severite': 'critique', 'source': 'bandit', 'code_erreur': 'B602'}],
+        'openai': [{'severite': 'info', 'source': 'openai', 'code_erreur': 'AI-001'}],
+    }
+    
+    @override_settings(QUALITY_GATE_CONFIG={**settings.QUALITY_GATE_CONFIG, 'TAILLE_LOT_PROBLEMES': 2})
+    def test_compteurs_et_insertions_groupees(self):
+        service = QualityGateService()
+        analyse, problemes = service._construire_analyse(
+            'a.py', 'Python', 'x = 1', '', None, self.RESULTATS, time.time()
+        )
+        
+        with CaptureQueriesContext(connection) as requetes:
+            analyse = service._sauvegarder(analyse, problemes)
+        
+        insertions = [r['sql'] for r in requetes if r['sql'].startswith('INSERT INTO "core_probleme"')]
+        self.assertEqual(len(insertions), 4)  # 7 problèmes par lots de 2
+        
+        analyse = AnalyseCode.objects.get(pk=analyse.pk)
+        self.assertEqual(
+            (analyse.nb_problemes_total, analyse.nb_critiques, analyse.nb_warnings, analyse.nb_infos),
+            (7, 2, 3, 2)
+        )
+        self.assertEqual(
+            (analyse.nb_manuel, analyse.nb_flake8, analyse.nb_bandit, analyse.nb_openai),
+            (2, 3, 1, 1)
+        )
+        self.assertEqual(analyse.problemes.count(), 7)
+        # Ordre d'une exécution séquentielle: manuel, flake8, bandit, openai
+        self.assertEqual(
+            list(analyse.problemes.order_by('pk').values_list('code_erreur', flat=True)),
+            ['SQL001', 'SQL002', 'E500', 'E501', 'E502', 'B602', 'AI-001']
+        )
+
+@override_settings(QUALITY_GATE_CONFIG={**settings.QUALITY_GATE_CONFIG, 'CACHE_ACTIF': False})
+class FileTachesTests(TestCase):
+    """Mode asynchrone: mise en file, réservation et suivi d'une tâche"""
+    
+    def _soumettre(self, contenu: str = 'SELECT * FROM t'):
+        return self.client.post(
+            reverse('core:api_analyser'),
+            data={'nom_fichier': 'a.sql', 'outil': 'SQL', 'contenu': contenu, 'mode': 'async'},
+            content_type='application/json'
+        )
+    
+    def test_soumission_repond_202(self):
+        reponse = self._soumettre()
+        
+        self.assertEqual(reponse.status_code, 202)
+        donnees = reponse.json()
+        self.assertEqual(donnees['statut'], StatutTache.EN_ATTENTE)
+        self.assertEqual(donnees['url'], reverse('core:api_job', args=[donnees['job_id']]))
+        
+        suivi = self.client.get(donnees['url']).json()
+        self.assertEqual(suivi['statut'], StatutTache.EN_ATTENTE)
+        self.assertIsNone(suivi['date_debut'])
+        self.assertNotIn('resultat', suivi)
+    
+    def test_reservation_fifo_une_seule_fois(self):
+        premiere = self._soumettre('SELECT 1').json()['job_id']
+        seconde = self._soumettre('SELECT 2').json()['job_id']
+        file = FileTaches()
+        
+        self.assertEqual(file.reserver().pk, premiere)
+        self.assertEqual(file.reserver().pk, seconde)
+        self.assertIsNone(file.reserver())
+        self.assertEqual(TacheAnalyse.objects.filter(statut=StatutTache.EN_COURS).count(), 2)
+    
+    def test_resultat_comme_en_mode_synchrone(self):
+        url = self._soumettre().json()['url']
+        file = FileTaches()
+        
+        file.executer(file.reserver())
+        
+        suivi = self.client.get(url).json()
+        self.assertEqual(suivi['statut'], StatutTache.TERMINEE)
+        self.assertIsNotNone(suivi['date_fin'])
+        
+        synchrone = self.client.post(
+            reverse('core:api_analyser'),
+            data={'nom_fichier': 'a.sql', 'outil': 'SQL', 'contenu': 'SELECT * FROM t'},
+            content_type='application/json'
+        ).json()
+        self.assertEqual(set(suivi['resultat']), set(synchrone))
+        self.assertEqual(
+            (suivi['resultat']['score'], suivi['resultat']['statistiques']),
+            (synchrone['score'], synchrone['statistiques'])
+        )
+    
+    def test_tache_bloquee_remise_en_attente(self):
+        self._soumettre()
+        tache = FileTaches().reserver()
+        TacheAnalyse.objects.filter(pk=tache.pk).update(date_debut=timezone.now() - timedelta(hours=1))
+        
+        self.assertEqual(FileTaches().reprendre_taches_bloquees(), 1)
+        self.assertEqual(FileTaches().reserver().pk, tache.pk)
+
+@override_settings(QUALITY_GATE_CONFIG={**settings.QUALITY_GATE_CONFIG, 'CACHE_ACTIF': False})
+class AnalyseLotVueTests(TestCase):
+    """Verdict de /api/analyser/batch/: celui de rapport_global, fichiers dans l'ordre reçu"""
+    
+    def _poster(self, fichiers):
+        return self.client.post(reverse('core:api_analyser_batch'), data=fichiers, content_type='application/json')
+    
+    def test_verdict_identique_a_rapport_global(self):
+        fichiers = [
+            {'nom_fichier': 'a.sql', 'outil': 'SQL', 'contenu': 'SELECT * FROM ventes'},
+            {'nom_fichier': 'vide.sql', 'outil': 'SQL', 'contenu': ''},
+            {'nom_fichier': 'b.sql', 'outil': 'SQL', 'contenu': 'DELETE FROM clients'},
+        ]
+        
+        donnees = self._poster(fichiers).json()
+        resultats = donnees.pop('resultats')
+        
+        self.assertEqual([r['nom_fichier'] for r in resultats], ['a.sql', 'vide.sql', 'b.sql'])
+        self.assertEqual(resultats[1], {'nom_fichier': 'vide.sql', 'error': 'Le contenu est requis'})
+        
+        service = QualityGateService()
+        attendu = service.rapport_global([
+            service.resume_fichier(AnalyseCode.objects.get(pk=resultats[i]['id'])) for i in (0, 2)
+        ])
+        self.assertEqual(donnees, json.loads(json.dumps(attendu)))
+    
+    def test_aucun_fichier_valide(self):
+        donnees = self._poster({'fichiers': [{'nom_fichier': 'vide.sql', 'contenu': ''}]}).json()
+        
+        self.assertEqual(donnees['status'], 'ERROR')
+        self.assertEqual(donnees['files'], [])
+
+def _evenements(reponse) -> List[Tuple[str, dict]]:
+    """Événements (nom, données) d'une réponse Server-Sent Events"""
+    flux = b''.join(reponse.streaming_content).decode('utf-8')
+    evenements = []
+    for bloc in flux.split('\n\n'):
+        if bloc:
+            nom, donnees = bloc.split('\n', 1)
+            evenements.append((nom.removeprefix('event: '), json.loads(donnees.removeprefix('data: '))))
+    return evenements
+
+
+@override_settings(QUALITY_GATE_CONFIG=CONFIG_CACHE)
+class AnalyseFluxVueTests(TestCase):
+    """/api/analyser/flux/: une étape par analyseur terminé, le résultat en dernier"""
+    
+    def setUp(self):
+        CacheAnalyses._memoire.clear()
+    
+    def _poster(self):
+        return self.client.post(
+            reverse('core:api_analyser_flux'),
+            data={'nom_fichier': 'a.sql', 'outil': 'SQL', 'contenu': 'SELECT * FROM t'},
+            content_type='application/json'
+        )
+    
+    def test_etapes_dans_l_ordre_de_fin_puis_resultat(self):
+        def ia_lente(*args, **kwargs):
+            time.sleep(0.2)
+            return ResultatIA([{'severite': 'info', 'source': 'openai', 'message': 'lent'}])
+        
+        with mock.patch.object(AnalyseurIA, 'analyser_detaille', ia_lente):
+            reponse = self._poster()
+            self.assertEqual(reponse['Content-Type'], 'text/event-stream')
+            evenements = _evenements(reponse)
+        
+        self.assertEqual(
+            [(nom, donnees.get('etape')) for nom, donnees in evenements],
+            [('etape', 'manuel'), ('etape', 'openai'), ('resultat', None)]
+        )
+        resultat = evenements[-1][1]
+        self.assertEqual(resultat['url'], reverse('core:resultat', args=[resultat['id']]))
+        self.assertEqual(resultat['statistiques']['total'], sum(len(d['problemes']) for _, d in evenements[:-1]))
+        
+        # Depuis le cache: mêmes étapes, dans l'ordre des étapes
+        rejoue = _evenements(self._poster())
+        self.assertEqual([d for _, d in rejoue[:-1]], [
+            {**donnees, 'duree': 0.0} for _, donnees in evenements[:-1]
+        ])
+        self.assertEqual(rejoue[-1][0], 'resultat')
+
+@override_settings(QUALITY_GATE_CONFIG=CONFIG_CACHE)
+class TempsEtapesTests(TestCase):
+    """Durée de chaque étape et de la sauvegarde, enregistrées avec l'analyse"""
+    
+    OPTIONS = {'utiliser_flake8': False, 'utiliser_bandit': False, 'utiliser_ia': False}
+    
+    def setUp(self):
+        CacheAnalyses._memoire.clear()
+    
+    def test_etapes_et_persistance_enregistrees(self):
+        service = QualityGateService()
+        
+        analyse = service.analyser_code('a.sql', 'SQL', 'SELECT * FROM t', options=self.OPTIONS)
+        analyse = AnalyseCode.objects.get(pk=analyse.pk)
+        self.assertEqual(set(analyse.temps_etapes), {'manuel', 'score', 'persistance'})
+        self.assertGreater(analyse.temps_persistance, 0)
+        self.assertEqual(analyse.temps_etapes['persistance'], round(analyse.temps_persistance, 4))
+        
+        # Depuis le cache: aucun analyseur n'a tourné
+        depuis_cache = service.analyser_code('a.sql', 'SQL', 'SELECT * FROM t', options=self.OPTIONS)
+        self.assertEqual(set(depuis_cache.temps_etapes), {'score', 'persistance'})
+    
+    def test_percentiles_par_etape_et_par_outil(self):
+        service = QualityGateService()
+        for i in range(3):
+            service.analyser_code('a.sql', 'SQL', f'SELECT {i} FROM t', options=self.OPTIONS)
+        service.analyser_code('m.pq', 'PowerQuery', 'let\n    Source = 1\nin\n    Source', options=self.OPTIONS)
+        
+        temps = service.get_statistiques_globales()['temps_etapes']
+        
+        self.assertEqual(temps['global']['total']['nb'], 4)
+        self.assertEqual(temps['par_outil']['SQL']['manuel']['nb'], 3)
+        self.assertEqual(temps['par_outil']['PowerQuery']['persistance']['nb'], 1)
+        self.assertEqual(set(temps['global']['score']), {'nb', 'p50', 'p95', 'p99'})
+    
+    def test_percentiles_rang_le_plus_proche(self):
+        self.assertEqual(
+            percentiles([i / 100 for i in range(100, 0, -1)]),
+            {'nb': 100, 'p50': 0.5, 'p95': 0.95, 'p99': 0.99}
+        )
+
+def _echantillons(texte: str) -> Dict[str, float]:
+    """Valeurs du texte de /metrics, par nom de série (labels compris)"""
+    echantillons = {}
+    for ligne in texte.splitlines():
+        if not ligne.startswith('#'):
+            serie, valeur = ligne.rsplit(' ', 1)
+            echantillons[serie] = float(valeur)
+    return echantillons
+
+
+class MetriquesTests(TestCase):
+    """Texte Prometheus de /metrics et compteurs enregistrés par le service"""
+    
+    def _scraper(self) -> Dict[str, float]:
+        with self.assertNumQueries(0):
+            reponse = self.client.get(reverse('core:metriques'))
+        self.assertTrue(reponse['Content-Type'].startswith('text/plain; version=0.0.4'))
+        return _echantillons(reponse.content.decode('utf-8'))
+    
+    def test_format_prometheus(self):
+        Metriques.enregistrer_analyse('SQL', True, 0.02, {'manuel': 0.003})
+        texte = self.client.get(reverse('core:metriques')).content.decode('utf-8')
+        
+        types = {}
+        for ligne in texte.splitlines():
+            if ligne.startswith('# TYPE '):
+                _, _, nom, type_metrique = ligne.split(' ')
+                types[nom] = type_metrique
+            elif not ligne.startswith('# HELP '):
+                self.assertRegex(ligne, r'^[a-z_]+(\{[a-z_]+="[^"]*"(,[a-z_]+="[^"]*")*\})? [0-9.e+-]+$')
+                nom = ligne.split('{')[0].split(' ')[0]
+                self.assertTrue(nom in types or nom.rsplit('_', 1)[0] in types, nom)
+        
+        self.assertEqual(types['qualitygate_analyses_total'], 'counter')
+        self.assertEqual(types['qualitygate_etape_duree_secondes'], 'histogram')
+        self.assertEqual(types['qualitygate_analyses_en_cours'], 'gauge')
+    
+    def test_compteurs(self):
+        avant = self._scraper()
+        
+        Metriques.enregistrer_analyse('SQL', True, 0.02, {'manuel': 0.003})
+        Metriques.compter_timeout('flake8')
+        Metriques.compter_erreur_openai('json')
+        with Metriques.en_cours(3):
+            pendant = self._scraper()
+        apres = self._scraper()
+        
+        def ecart(serie):
+            return round(apres.get(serie, 0) - avant.get(serie, 0), 6)
+        
+        histogramme = 'qualitygate_etape_duree_secondes'
+        self.assertEqual(ecart('qualitygate_analyses_total{outil="SQL",verdict="approuve"}'), 1)
+        self.assertEqual(ecart(f'{histogramme}_bucket{{etape="manuel",le="0.005"}}'), 1)
+        self.assertEqual(ecart(f'{histogramme}_bucket{{etape="total",le="0.01"}}'), 0)
+        self.assertEqual(ecart(f'{histogramme}_bucket{{etape="total",le="+Inf"}}'), 1)
+        self.assertEqual(ecart(f'{histogramme}_sum{{etape="manuel"}}'), 0.003)
+        self.assertEqual(ecart(f'{histogramme}_count{{etape="total"}}'), 1)
+        self.assertEqual(ecart('qualitygate_timeouts_total{outil="flake8"}'), 1)
+        self.assertEqual(ecart('qualitygate_timeouts_total{outil="bandit"}'), 0)
+        self.assertEqual(ecart('qualitygate_openai_erreurs_total{type="json"}'), 1)
+        self.assertEqual(pendant['qualitygate_analyses_en_cours'], avant['qualitygate_analyses_en_cours'] + 3)
+        self.assertEqual(apres['qualitygate_analyses_en_cours'], avant['qualitygate_analyses_en_cours'])
+    
+    def test_labels_echappes(self):
+        self.assertEqual(_labels(outil='a"b\\c\nd'), '{outil="a\\"b\\\\c\\nd"}')
+
+class SimulateurOpenAITests(SimpleTestCase):
+    """Réponses du serveur OpenAI local (manage.py serveur_openai)"""
+    
+    def _lancer(self, **parametres) -> str:
+        """Démarre le serveur sur un port libre et retourne son URL de base"""
+        serveur = creer_serveur('127.0.0.1', 0, ConfigSimulateur(latence_ms=0, distribution='fixe', **parametres))
+        threading.Thread(target=serveur.serve_forever, args=(0.05,), daemon=True).start()
+        self.addCleanup(serveur.server_close)
+        self.addCleanup(serveur.shutdown)
+        return f'http://127.0.0.1:{serveur.server_address[1]}/v1'
+    
+    def _poster(self, url: str):
+        requete = urllib.request.Request(
+            f'{url}/chat/completions',
+            data=json.dumps({'model': 'test', 'messages': []}).encode('utf-8'),
+            headers={'Content-Type': 'application/json'}
+        )
+        try:
+            with urllib.request.urlopen(requete, timeout=5) as reponse:
+                return reponse.status, reponse.headers, json.loads(reponse.read())
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers, json.loads(e.read())
+    
+    def test_completion(self):
+        reponses = [{'problemes': [{'severite': 'info', 'message': 'test'}]}]
+        statut, _, corps = self._poster(self._lancer(reponses=reponses))
+        
+        self.assertEqual(statut, 200)
+        self.assertEqual(corps['object'], 'chat.completion')
+        self.assertEqual(corps['model'], 'test')
+        self.assertEqual(json.loads(corps['choices'][0]['message']['content']), reponses[0])
+    
+    def test_erreurs_injectees(self):
+        statut, entetes, corps = self._poster(self._lancer(taux_429=1))
+        self.assertEqual((statut, entetes['Retry-After'], corps['error']['type']), (429, '1', 'rate_limit_error'))
+        
+        statut, _, corps = self._poster(self._lancer(taux_500=1))
+        self.assertEqual((statut, corps['error']['type']), (500, 'server_error'))
+        
+        statut, _, corps = self._poster(self._lancer(taux_malforme=1))
+        self.assertEqual(statut, 200)
+        with self.assertRaises(json.JSONDecodeError):
+            json.loads(corps['choices'][0]['message']['content'])
+    
+    def test_route_inconnue(self):
+        url = self._lancer()
+        requete = urllib.request.Request(url.replace('/v1', '/v2/embeddings'), data=b'{}')
+        
+        with self.assertRaises(urllib.error.HTTPError) as erreur:
+            urllib.request.urlopen(requete, timeout=5)
+        self.assertEqual(erreur.exception.code, 404)
+    
+    def test_analyseur_ia_via_le_serveur(self):
+        reponses = [{'problemes': [{'severite': 'warning', 'categorie': 'performance', 'message': 'local'}]}]
+        config = {**settings.QUALITY_GATE_CONFIG, 'OPENAI_API_KEY': '', 'OPENAI_MAX_RETRIES': 0}
+        
+        with override_settings(QUALITY_GATE_CONFIG={**config, 'OPENAI_BASE_URL': self._lancer(reponses=reponses)}):
+            resultat = AnalyseurIA().analyser_detaille('SELECT 1', 'SQL')
+        self.assertFalse(resultat.incident)
+        self.assertEqual([p['message'] for p in resultat.problemes], ['🤖 local'])
+        
+        with override_settings(QUALITY_GATE_CONFIG={**config, 'OPENAI_BASE_URL': self._lancer(taux_500=1)}):
+            self.assertEqual(AnalyseurIA().analyser_detaille('SELECT 1', 'SQL'), ([], True))
+
+class IndexLignesTests(SimpleTestCase):
+    """Positions converties en lignes et colonnes par dichotomie"""
+    
+    TEXTE = "SELECT a,\n       b\n\nFROM t\r\nWHERE x = 'é'\n"
+    
+    def _attendu(self, texte: str, position: int) -> Tuple[int, int]:
+        """Ligne et colonne en recomptant depuis le début du texte"""
+        return texte.count('\n', 0, position) + 1, position - (texte.rfind('\n', 0, position) + 1) + 1
+    
+    def test_chaque_position(self):
+        index = IndexLignes(self.TEXTE)
+        
+        for position in range(len(self.TEXTE) + 1):
+            self.assertEqual(index.ligne_colonne(position), self._attendu(self.TEXTE, position))
+            self.assertEqual(index.ligne(position), self._attendu(self.TEXTE, position)[0])
+    
+    def test_texte_et_debut_des_lignes(self):
+        index = IndexLignes(self.TEXTE)
+        
+        self.assertEqual(
+            [index.texte_ligne(ligne) for ligne in range(1, 7)],
+            ['SELECT a,', '       b', '', 'FROM t\r', "WHERE x = 'é'", '']
+        )
+        self.assertEqual(index.debut_ligne(4), self.TEXTE.index('FROM'))
+    
+    def test_morceau_commencant_au_milieu_d_une_ligne(self):
+        coupure = self.TEXTE.index('b')
+        ligne, colonne = self._attendu(self.TEXTE, coupure)
+        index = IndexLignes(self.TEXTE[coupure:], ligne, colonne)
+        
+        for position in range(len(self.TEXTE) - coupure + 1):
+            self.assertEqual(index.ligne_colonne(position), self._attendu(self.TEXTE, coupure + position))
+        self.assertEqual(index.texte_ligne(2), 'b')
+    
+    def test_avancer_comme_l_index(self):
+        index = IndexLignes(self.TEXTE)
+        ligne, colonne = 1, 1
+        debut = 0
+        
+        for fin in (3, 12, 19, 20, 28, len(self.TEXTE)):
+            ligne, colonne = avancer(self.TEXTE, debut, fin, ligne, colonne)
+            self.assertEqual((ligne, colonne), index.ligne_colonne(fin))
+            debut = fin
+
+@skipUnless(shutil.which('flake8') and shutil.which('bandit') and shutil.which('ruff'), 'Flake8, Bandit et Ruff requis')
+class LintLotTests(TestCase):
+    """Un lancement des outils pour tout un lot, sortie redistribuée à chaque fichier"""
+    
+    CONTENUS = [
+        'x = 1\n',
+        CODE_SECURITE,
+        'import os\ndef f():\n    return eval("1")  ' + '#' * 130 + '\n',
+        'x = 1\n',
+    ]
+    
+    def test_comme_fichier_par_fichier(self):
+        for nom in ('flake8', 'ruff'):
+            with self.subTest(moteur=nom):
+                outils = AnalyseurPythonTools(nom)
+                
+                lot = outils.analyser_lot(self.CONTENUS)
+                
+                self.assertEqual(lot, [
+                    {'flake8': outils.analyser_flake8(contenu), 'bandit': outils.analyser_bandit(contenu)}
+                    for contenu in self.CONTENUS
+                ])
+                self.assertEqual(lot[0], {'flake8': [], 'bandit': []})
+                self.assertTrue(lot[2]['flake8'] and lot[2]['bandit'])
+    
+    @override_settings(QUALITY_GATE_CONFIG={**settings.QUALITY_GATE_CONFIG, 'CACHE_ACTIF': False})
+    def test_service_lance_un_seul_lot(self):
+        fichiers = [{'nom_fichier': f'f{i}.py', 'contenu': contenu} for i, contenu in enumerate(self.CONTENUS)]
+        options = {'utiliser_flake8': True, 'utiliser_bandit': True, 'utiliser_ia': False}
+        service = QualityGateService()
+        
+        analyseur = service.analyseur_python
+        with mock.patch.object(analyseur, 'analyser_lot', wraps=analyseur.analyser_lot) as lot:
+            analyses = service.analyser_lot(fichiers, options=options)
+        
+        lot.assert_called_once()
+        for fichier, analyse in zip(fichiers, analyses):
+            seul = service.analyser_code(fichier['nom_fichier'], 'Python', fichier['contenu'], options=options)
+            self.assertEqual(
+                (analyse.nb_flake8, analyse.nb_bandit, analyse.score), (seul.nb_flake8, seul.nb_bandit, seul.score)
+            )
+
+class EspaceTravailTests(SimpleTestCase):
+    """Emplacements préalloués prêtés, vidés puis rendus"""
+    
+    def setUp(self):
+        self.racine = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.racine, ignore_errors=True)
+    
+    def test_emplacement_prete_vide_puis_rendu(self):
+        espace = EspaceTravail(nb_emplacements=2, dossier=self.racine)
+        
+        with espace.emplacement() as premier, espace.emplacement() as second:
+            self.assertNotEqual(premier, second)
+            self.assertEqual(os.listdir(premier), [])
+            with open(os.path.join(premier, '00000.py'), 'w') as f:
+                f.write('x = 1\n')
+            os.mkdir(os.path.join(premier, 'sous_dossier'))
+            self.assertTrue(espace.libres.empty())
+        
+        self.assertEqual(espace.libres.qsize(), 2)
+        self.assertEqual(os.listdir(premier), [])
+        
+        espace.fermer()
+        self.assertFalse(os.path.exists(espace.dossier))
+    
+    def test_attente_d_un_emplacement_libre(self):
+        espace = EspaceTravail(nb_emplacements=1, dossier=self.racine)
+        obtenus = []
+        
+        def attendre():
+            with espace.emplacement() as emplacement:
+                obtenus.append(emplacement)
+        
+        with espace.emplacement() as pris:
+            attente = threading.Thread(target=attendre)
+            attente.start()
+            attente.join(timeout=0.2)
+            self.assertEqual(obtenus, [])
+        
+        attente.join(timeout=5)
+        self.assertEqual(obtenus, [pris])
+    
+    def test_espaces_orphelins_purges(self):
+        orphelin = tempfile.mkdtemp(prefix=f'{PREFIXE}999999999_', dir=self.racine)
+        vivant = tempfile.mkdtemp(prefix=f'{PREFIXE}{os.getpid()}_', dir=self.racine)
+        
+        EspaceTravail(dossier=self.racine)
+        
+        self.assertFalse(os.path.exists(orphelin))
+        self.assertTrue(os.path.exists(vivant))
+
+
+@skipUnless(shutil.which('flake8') and shutil.which('bandit'), 'Flake8 et Bandit requis')
+class LintEntreeStandardTests(SimpleTestCase):
+    """Sans pool, une analyse seule passe le code sur stdin et n'écrit aucun fichier"""
+    
+    def test_stdin_comme_le_pool(self):
+        sans_pool = creer_moteur({**settings.QUALITY_GATE_CONFIG, 'LINT_POOL_ACTIF': False}, 'flake8')
+        avec_pool = creer_moteur({**settings.QUALITY_GATE_CONFIG, 'LINT_POOL_ACTIF': True}, 'flake8')
+        
+        with mock.patch('core.analyzers.moteurs_lint.lancer', wraps=lancer) as lancement, \
+                mock.patch.object(EspaceTravail, 'emplacement') as emplacement:
+            lignes = sans_pool.flake8(CODE_SECURITE, 30)
+            issues = sans_pool.bandit(CODE_SECURITE, 30)
+        
+        emplacement.assert_not_called()
+        self.assertEqual(lancement.call_count, 2)
+        for appel in lancement.call_args_list:
+            commande, _, _, entree = appel.args
+            self.assertEqual(commande[-1], '-')
+            self.assertEqual(entree, CODE_SECURITE)
+        
+        self.assertEqual(sorted(lignes), sorted(avec_pool.flake8(CODE_SECURITE, 30)))
+        self.assertEqual(
+            sorted((i['test_id'], i['line_number']) for i in issues),
+            sorted((i['test_id'], i['line_number']) for i in avec_pool.bandit(CODE_SECURITE, 30))
+        )
\ No newline at end of file
@@ -22,5 +22,12 @@ urlpatterns = [
     
     # API JSON
     path('api/analyser/', views.api_analyser, name='api_analyser'),
+    path('api/analyser/batch/', views.api_analyser_batch, name='api_analyser_batch'),
+    path('api/analyser/flux/', views.api_analyser_flux, name='api_analyser_flux'),
+    path('api/analyser/fichier/', views.api_analyser_fichier, name='api_analyser_fichier'),
+    path('api/jobs/<int:pk>/', views.api_job, name='api_job'),
     path('api/statistiques/', views.api_statistiques, name='api_stats'),
+    
+    # Supervision (Prometheus)
+    path('metrics', views.metriques, name='metriques'),
 ]
\ No newline at end of file
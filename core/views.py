@@ -4,16 +4,25 @@
 Les vues gèrent les requêtes HTTP et retournent les réponses.
 """
 
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.conf import settings
+from django.db.models import prefetch_related_objects
 from django.views.generic import ListView, DetailView
 from django.core.paginator import Paginator
+import codecs
 import json
 
-from .models import AnalyseCode, Probleme
+from .models import AnalyseCode, Probleme, TacheAnalyse, StatutTache
 from .forms import AnalyseCodeForm, UploadFileForm
 from .services import QualityGateService
+from .taches import FileTaches
+from .cache import CacheAnalyses
+from .metriques import Metriques
+from .analyzers.static_analyzer import AnalyseurStatique
 
 
 def home(request):
@@ -38,9 +47,17 @@ def home(request):
     return render(request, 'core/home.html', context)
 
 
-def analyser(request):
+async def _creer_service() -> QualityGateService:
+    """Construit le service hors de la boucle d'événements (les analyseurs vérifient leurs outils par sous-processus)"""
+    return await sync_to_async(QualityGateService, thread_sensitive=False)()
+
+
+async def analyser(request):
     """
     Page pour soumettre du code à analyser
+    
+    Vue asynchrone: sous ASGI, l'attente des analyseurs ne bloque pas
+    de thread du serveur.
     """
     if request.method == 'POST':
         form = AnalyseCodeForm(request.POST)
@@ -60,13 +77,14 @@ def analyser(request):
             }
             
             # Lancer l'analyse
-            service = QualityGateService()
+            service = await _creer_service()
             
             try:
                 # Récupérer l'utilisateur si connecté
-                auteur = request.user if request.user.is_authenticated else None
+                user = await request.auser()
+                auteur = user if user.is_authenticated else None
                 
-                analyse = service.analyser_code(
+                analyse = await service.analyser_code_async(
                     nom_fichier=nom_fichier,
                     outil=outil,
                     contenu=contenu,
@@ -98,15 +116,15 @@ def analyser(request):
         form = AnalyseCodeForm()
     
     # Statut des outils
-    service = QualityGateService()
-    outils_status = service.get_outils_status()
+    service = await _creer_service()
+    outils_status = await sync_to_async(service.get_outils_status, thread_sensitive=False)()
     
     context = {
         'form': form,
         'outils_status': outils_status,
     }
     
-    return render(request, 'core/analyze.html', context)
+    return await sync_to_async(render)(request, 'core/analyze.html', context)
 
 
 def resultat(request, pk):
@@ -203,7 +221,7 @@ def supprimer_analyse(request, pk):
 
 # ===== API JSON =====
 
-def api_analyser(request):
+async def api_analyser(request):
     """
     API JSON pour analyser du code (POST)
     
@@ -211,6 +229,12 @@ def api_analyser(request):
     curl -X POST http://localhost:8000/api/analyser/ \
          -H "Content-Type: application/json" \
          -d '{"nom_fichier": "test.py", "outil": "Python", "contenu": "print(1)"}'
+    
+    Mode asynchrone: ajouter "mode": "async" (ou ?mode=async).
+    La réponse est alors 202 avec l'id de la tâche à suivre sur /api/jobs/<id>/
+    
+    Vue asynchrone: en mode synchrone, les analyseurs tournent sur la
+    boucle d'événements (voir QualityGateService.analyser_code_async).
     """
     if request.method != 'POST':
         return JsonResponse({'error': 'Méthode POST requise'}, status=405)
@@ -226,40 +250,103 @@ def api_analyser(request):
         if not contenu:
             return JsonResponse({'error': 'Le contenu est requis'}, status=400)
         
-        service = QualityGateService()
-        analyse = service.analyser_code(
+        # Mode asynchrone: mise en file, réponse immédiate
+        mode = data.get('mode', request.GET.get('mode', ''))
+        if mode == 'async':
+            tache = await sync_to_async(FileTaches().soumettre)(
+                nom_fichier=nom_fichier,
+                outil=outil,
+                contenu=contenu,
+                description=description
+            )
+            return JsonResponse(
+                {
+                    'job_id': tache.pk,
+                    'statut': tache.statut,
+                    'url': reverse('core:api_job', args=[tache.pk]),
+                },
+                status=202
+            )
+        
+        service = await _creer_service()
+        analyse = await service.analyser_code_async(
             nom_fichier=nom_fichier,
             outil=outil,
             contenu=contenu,
             description=description
         )
         
-        # Construire la réponse JSON
-        response_data = {
-            'id': analyse.pk,
-            'nom_fichier': analyse.nom_fichier,
-            'outil': analyse.outil,
-            'score': analyse.score,
-            'est_approuve': analyse.est_approuve,
-            'temps_analyse': analyse.temps_analyse,
-            'statistiques': {
-                'total': analyse.nb_problemes_total,
-                'critiques': analyse.nb_critiques,
-                'warnings': analyse.nb_warnings,
-                'infos': analyse.nb_infos,
-            },
-            'problemes': [
-                {
-                    'severite': p.severite,
-                    'categorie': p.categorie,
-                    'source': p.source,
-                    'message': p.message,
-                    'suggestion': p.suggestion,
-                    'ligne': p.ligne,
-                }
-                for p in analyse.problemes.all()
-            ]
-        }
+        return JsonResponse(await sync_to_async(_serialiser_analyse)(analyse))
+    
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'JSON invalide'}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+def api_analyser_batch(request):
+    """
+    API JSON pour analyser plusieurs fichiers en une requête (POST)
+    
+    Corps: [{"nom_fichier": ..., "outil": ..., "contenu": ..., "description": ...}, ...]
+    (ou {"fichiers": [...]})
+    
+    Retourne le verdict global (même logique que le runner GitHub Actions)
+    et le résultat de chaque fichier dans 'resultats', dans l'ordre reçu.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Méthode POST requise'}, status=405)
+    
+    try:
+        data = json.loads(request.body)
+        fichiers = data.get('fichiers', []) if isinstance(data, dict) else data
+        
+        if not isinstance(fichiers, list) or not fichiers:
+            return JsonResponse({'error': 'Une liste de fichiers est requise'}, status=400)
+        
+        max_fichiers = settings.QUALITY_GATE_CONFIG.get('LOT_MAX_FICHIERS', 200)
+        if len(fichiers) > max_fichiers:
+            return JsonResponse(
+                {'error': f'Trop de fichiers (maximum {max_fichiers})'},
+                status=400
+            )
+        
+        # Les fichiers invalides sont signalés sans bloquer les autres
+        valides = []
+        for fichier in fichiers:
+            if isinstance(fichier, dict) and fichier.get('contenu'):
+                valides.append(fichier)
+        
+        service = QualityGateService()
+        analyses = iter(service.analyser_lot(valides))
+        
+        resultats = []
+        resumes = []
+        for fichier in fichiers:
+            if not isinstance(fichier, dict) or not fichier.get('contenu'):
+                nom = fichier.get('nom_fichier', '') if isinstance(fichier, dict) else ''
+                resultats.append({'nom_fichier': nom, 'error': 'Le contenu est requis'})
+                continue
+            
+            analyse = next(analyses)
+            if isinstance(analyse, Exception):
+                resultats.append({'nom_fichier': fichier.get('nom_fichier', ''), 'error': str(analyse)})
+                continue
+            
+            resultats.append(analyse)
+            resumes.append(service.resume_fichier(analyse))
+        
+        # Une seule requête pour les problèmes de toutes les analyses
+        prefetch_related_objects(
+            [r for r in resultats if isinstance(r, AnalyseCode)],
+            'problemes'
+        )
+        
+        response_data = service.rapport_global(resumes)
+        response_data['resultats'] = [
+            _serialiser_analyse(r) if isinstance(r, AnalyseCode) else r
+            for r in resultats
+        ]
         
         return JsonResponse(response_data)
     
@@ -269,16 +356,200 @@ def api_analyser(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
-def api_statistiques(request):
+def api_analyser_flux(request):
+    """
+    Analyse en streaming (Server-Sent Events, POST)
+    
+    Accepte le formulaire de la page "Analyser" ou un corps JSON comme
+    /api/analyser/. Émet un événement 'etape' par analyseur terminé
+    (manuel, flake8, bandit, openai) puis un événement 'resultat'
+    avec le score et le verdict.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Méthode POST requise'}, status=405)
+    
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body)
+        except json.JSONDecodeError:
+            return JsonResponse({'error': 'JSON invalide'}, status=400)
+        
+        nom_fichier = data.get('nom_fichier', 'code.py')
+        outil = data.get('outil', 'Python')
+        contenu = data.get('contenu', '')
+        description = data.get('description', '')
+        options = None
+        
+        if not contenu:
+            return JsonResponse({'error': 'Le contenu est requis'}, status=400)
+    else:
+        form = AnalyseCodeForm(request.POST)
+        if not form.is_valid():
+            return JsonResponse({'error': 'Formulaire invalide', 'erreurs': form.errors}, status=400)
+        
+        nom_fichier = form.cleaned_data['nom_fichier']
+        outil = form.cleaned_data['outil']
+        contenu = form.cleaned_data['contenu_code']
+        description = form.cleaned_data['description']
+        options = {
+            'utiliser_flake8': form.cleaned_data.get('utiliser_flake8', True),
+            'utiliser_bandit': form.cleaned_data.get('utiliser_bandit', True),
+            'utiliser_ia': form.cleaned_data.get('utiliser_ia', True),
+        }
+    
+    auteur = request.user if request.user.is_authenticated else None
+    
+    def evenements():
+        service = QualityGateService()
+        try:
+            for nom, donnees in service.analyser_code_au_fil(
+                nom_fichier=nom_fichier,
+                outil=outil,
+                contenu=contenu,
+                description=description,
+                auteur=auteur,
+                options=options
+            ):
+                if nom == 'resultat':
+                    donnees['url'] = reverse('core:resultat', args=[donnees['id']])
+                yield _evenement_sse(nom, donnees)
+        except Exception as e:
+            yield _evenement_sse('erreur', {'error': str(e)})
+    
+    response = StreamingHttpResponse(evenements(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Pas de mise en tampon par nginx
+    return response
+
+
+def api_analyser_fichier(request):
+    """
+    Analyse d'un fichier uploadé, problèmes en streaming (Server-Sent Events, POST)
+    
+    Champs multipart de UploadFileForm: fichier, outil (optionnel, déduit
+    de l'extension). Seules les règles statiques sont appliquées, et rien
+    n'est enregistré en base: un fichier SQL ou Power Query de plusieurs
+    centaines de Mo est lu par morceaux, sans être chargé en mémoire.
+    Émet un événement 'probleme' par problème trouvé, puis un 'resume'.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Méthode POST requise'}, status=405)
+    
+    form = UploadFileForm(request.POST, request.FILES)
+    if not form.is_valid():
+        return JsonResponse({'error': 'Formulaire invalide', 'erreurs': form.errors}, status=400)
+    
+    fichier = form.cleaned_data['fichier']
+    outil = form.cleaned_data['outil']
+    taille_morceau = settings.QUALITY_GATE_CONFIG.get('FLUX_TAILLE_MORCEAU', 1024 * 1024)
+    
+    def evenements():
+        par_severite = {}
+        try:
+            # Décodage incrémental: un caractère peut être coupé entre deux morceaux
+            morceaux = codecs.iterdecode(fichier.chunks(taille_morceau), 'utf-8-sig', errors='replace')
+            for probleme in AnalyseurStatique().analyser_au_fil(morceaux, outil):
+                par_severite[probleme['severite']] = par_severite.get(probleme['severite'], 0) + 1
+                yield _evenement_sse('probleme', probleme)
+            
+            yield _evenement_sse('resume', {
+                'nom_fichier': fichier.name,
+                'outil': outil,
+                'total_problemes': sum(par_severite.values()),
+                'par_severite': par_severite,
+            })
+        except Exception as e:
+            yield _evenement_sse('erreur', {'error': str(e)})
+    
+    response = StreamingHttpResponse(evenements(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _evenement_sse(nom: str, donnees: dict) -> str:
+    """Formate un événement Server-Sent Events"""
+    return f"event: {nom}\ndata: {json.dumps(donnees, ensure_ascii=False)}\n\n"
+
+
+def api_job(request, pk):
+    """
+    API JSON pour suivre une analyse asynchrone
+    
+    Une fois la tâche terminée, 'resultat' contient la même réponse
+    que /api/analyser/ en mode synchrone.
+    """
+    tache = get_object_or_404(TacheAnalyse, pk=pk)
+    
+    response_data = {
+        'job_id': tache.pk,
+        'statut': tache.statut,
+        'date_creation': tache.date_creation.isoformat(),
+        'date_debut': tache.date_debut.isoformat() if tache.date_debut else None,
+        'date_fin': tache.date_fin.isoformat() if tache.date_fin else None,
+    }
+    
+    if tache.statut == StatutTache.TERMINEE and tache.analyse is not None:
+        response_data['resultat'] = _serialiser_analyse(tache.analyse)
+    elif tache.statut == StatutTache.ECHEC:
+        response_data['erreur'] = tache.erreur
+    
+    return JsonResponse(response_data)
+
+
+def _serialiser_analyse(analyse: AnalyseCode) -> dict:
+    """Réponse JSON d'une analyse (commune au mode synchrone et asynchrone)"""
+    return {
+        'id': analyse.pk,
+        'nom_fichier': analyse.nom_fichier,
+        'outil': analyse.outil,
+        'score': analyse.score,
+        'est_approuve': analyse.est_approuve,
+        'temps_analyse': analyse.temps_analyse,
+        'temps_persistance': analyse.temps_persistance,
+        'temps_etapes': analyse.temps_etapes,
+        'statistiques': {
+            'total': analyse.nb_problemes_total,
+            'critiques': analyse.nb_critiques,
+            'warnings': analyse.nb_warnings,
+            'infos': analyse.nb_infos,
+        },
+        'problemes': [
+            {
+                'severite': p.severite,
+                'categorie': p.categorie,
+                'source': p.source,
+                'message': p.message,
+                'suggestion': p.suggestion,
+                'ligne': p.ligne,
+            }
+            for p in analyse.problemes.all()
+        ]
+    }
+
+
+async def api_statistiques(request):
     """
     API JSON pour les statistiques globales
     """
-    service = QualityGateService()
-    stats = service.get_statistiques_globales()
+    service = await _creer_service()
+    stats = await sync_to_async(service.get_statistiques_globales)()
     
     return JsonResponse(stats)
 
 
+def metriques(request):
+    """
+    Métriques au format texte de Prometheus (scrape sur /metrics)
+    
+    Lit uniquement les compteurs en mémoire du processus, jamais la base.
+    """
+    return HttpResponse(
+        Metriques.exporter(CacheAnalyses.get_statistiques()),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
 def exporter_rapport(request, pk, format='json'):
     """
     Exporte un rapport en JSON ou HTML
@@ -300,6 +571,8 @@ def exporter_rapport(request, pk, format='json'):
                 'score': analyse.score,
                 'est_approuve': analyse.est_approuve,
                 'temps_analyse': analyse.temps_analyse,
+                'temps_persistance': analyse.temps_persistance,
+                'temps_etapes': analyse.temps_etapes,
             },
             'statistiques': {
                 'total': analyse.nb_problemes_total,
@@ -3,11 +3,19 @@ Script d'analyse pour GitHub Actions
 ====================================
 Analyse les fichiers Python modifiés dans un commit/PR
 et génère un rapport JSON pour GitHub Actions.
+
+Usage:
+    python scripts/github_actions_runner.py
+    python scripts/github_actions_runner.py --incremental --plage origin/main...HEAD
+
+Avec --incremental, seuls les problèmes des lignes modifiées comptent:
+les défauts déjà présents dans un vieux fichier ne font pas échouer la PR.
 """
 
 import os
 import sys
 import json
+import argparse
 import subprocess
 from pathlib import Path
 
@@ -20,17 +28,18 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bi_quality_gate.settings')
 import django
 django.setup()
 
+from core.analyzers.lignes_modifiees import diff_git
 from core.services import QualityGateService
 
 
-def get_modified_python_files():
+def get_modified_python_files(plage: str = 'HEAD~1..HEAD'):
     """
     Récupère la liste des fichiers Python modifiés
     """
     try:
-        # Récupérer les fichiers modifiés depuis le dernier commit
+        # Récupérer les fichiers modifiés par la plage de commits
         result = subprocess.run(
-            ['git', 'diff', '--name-only', 'HEAD~1', 'HEAD'],
+            ['git', 'diff', '--name-only', plage],
             capture_output=True,
             text=True,
             check=True
@@ -48,47 +57,82 @@ def get_modified_python_files():
         return []
 
 
-def analyze_file(filepath: str, service: QualityGateService):
+def get_modified_lines(plage: str, filepaths):
     """
-    Analyse un fichier avec le Quality Gate
+    Récupère les lignes modifiées de chaque fichier ({chemin: LignesModifiees})
     """
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            contenu = f.read()
-        
-        # Analyser avec le service
-        analyse = service.analyser_code(
-            nom_fichier=filepath,
-            outil='Python',
-            contenu=contenu,
-            description=f"Analyse automatique GitHub Actions"
-        )
+        return diff_git(plage, filepaths)
+    except subprocess.CalledProcessError:
+        print("⚠️ Impossible de récupérer les lignes modifiées")
+        return None
+
+
+def analyze_files(filepaths, service: QualityGateService, lignes_modifiees=None):
+    """
+    Analyse tous les fichiers en un seul lot
+    
+    Flake8 et Bandit ne sont lancés qu'une fois pour l'ensemble des fichiers.
+    Avec `lignes_modifiees`, seules ces lignes de chaque fichier sont analysées.
+    """
+    fichiers = []
+    for filepath in filepaths:
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                contenu = f.read()
+        except Exception as e:
+            print(f"❌ Erreur lors de la lecture de {filepath}: {e}")
+            continue
         
-        return {
-            'fichier': filepath,
-            'score': analyse.score,
-            'approuve': analyse.est_approuve,
-            'critiques': analyse.nb_critiques,
-            'warnings': analyse.nb_warnings,
-            'infos': analyse.nb_infos,
-            'flake8': analyse.nb_flake8,
-            'bandit': analyse.nb_bandit,
-            'openai': analyse.nb_openai
+        fichier = {
+            'nom_fichier': filepath,
+            'outil': 'Python',
+            'contenu': contenu,
+            'description': "Analyse automatique GitHub Actions"
         }
-    except Exception as e:
-        print(f"❌ Erreur lors de l'analyse de {filepath}: {e}")
-        return None
+        if lignes_modifiees is not None:
+            fichier['lignes_modifiees'] = lignes_modifiees.get(filepath)
+            if not fichier['lignes_modifiees']:
+                print(f"ℹ️ {filepath}: aucune ligne ajoutée ou modifiée")
+                continue
+        fichiers.append(fichier)
+    
+    resultats = []
+    for fichier, analyse in zip(fichiers, service.analyser_lot(fichiers)):
+        if isinstance(analyse, Exception):
+            print(f"❌ Erreur lors de l'analyse de {fichier['nom_fichier']}: {analyse}")
+            continue
+        
+        resultat = service.resume_fichier(analyse)
+        resultats.append(resultat)
+        print(f"\n🔍 {fichier['nom_fichier']}")
+        print(f"   Score: {resultat['score']}/100")
+    
+    return resultats
 
 
 def main():
     """
     Point d'entrée principal
     """
+    parser = argparse.ArgumentParser(description="Quality Gate des fichiers Python modifiés")
+    parser.add_argument(
+        '--plage',
+        default='HEAD~1..HEAD',
+        help="Commits comparés (ex: origin/main...HEAD)"
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help="Ne garder que les problèmes des lignes modifiées"
+    )
+    args = parser.parse_args()
+    
     print("🚀 Quality Gate - GitHub Actions Runner")
     print("=" * 60)
     
     # Récupérer les fichiers modifiés
-    fichiers = get_modified_python_files()
+    fichiers = get_modified_python_files(args.plage)
     
     if not fichiers:
         print("ℹ️ Aucun fichier Python modifié")
@@ -112,45 +156,14 @@ def main():
         # Créer le service
         service = QualityGateService()
         
-        # Analyser chaque fichier
-        resultats = []
-        for fichier in fichiers:
-            print(f"\n🔍 Analyse de {fichier}...")
-            resultat = analyze_file(fichier, service)
-            if resultat:
-                resultats.append(resultat)
-                print(f"   Score: {resultat['score']}/100")
+        # Lignes modifiées (mode incrémental; tout le fichier si le diff est illisible)
+        lignes_modifiees = get_modified_lines(args.plage, fichiers) if args.incremental else None
+        
+        # Analyser tous les fichiers en un lot
+        resultats = analyze_files(fichiers, service, lignes_modifiees)
         
         # Calculer les statistiques globales
-        if resultats:
-            score_moyen = sum(r['score'] for r in resultats) // len(resultats)
-            total_critiques = sum(r['critiques'] for r in resultats)
-            total_warnings = sum(r['warnings'] for r in resultats)
-            total_infos = sum(r['infos'] for r in resultats)
-            
-            rapport = {
-                'status': 'PASSED' if total_critiques == 0 and score_moyen >= 70 else 'FAILED',
-                'score': score_moyen,
-                'critiques': total_critiques,
-                'warnings': total_warnings,
-                'infos': total_infos,
-                'flake8': sum(r['flake8'] for r in resultats),
-                'bandit': sum(r['bandit'] for r in resultats),
-                'openai': sum(r['openai'] for r in resultats),
-                'files': resultats
-            }
-        else:
-            rapport = {
-                'status': 'ERROR',
-                'score': 0,
-                'critiques': 0,
-                'warnings': 0,
-                'infos': 0,
-                'flake8': 0,
-                'bandit': 0,
-                'openai': 0,
-                'files': []
-            }
+        rapport = service.rapport_global(resultats)
     
     # Sauvegarder le rapport
     with open('quality_report.json', 'w') as f: